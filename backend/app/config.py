@@ -0,0 +1,97 @@
+"""
+Runtime configuration read from environment variables.
+"""
+import os
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_list(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _env_int_list(name, default):
+    return [int(item) for item in _env_list(name, default)]
+
+
+class Settings:
+    """Backend settings; one instance (`settings`) is shared by the whole app."""
+
+    def __init__(self):
+        # --- Serving ---
+        # directory with read-only model artifacts (scaler, autoencoder, indexes)
+        self.artifacts_dir = os.environ.get(
+            "ARTIFACTS_DIR", os.path.normpath(os.path.join(APP_DIR, "..", "..", "models")))
+        # MediaPipe Pose detectors per worker process (= concurrent videos per worker)
+        self.pose_pool_size = _env_int("POSE_POOL_SIZE", 1)
+        # quality tier used when a request does not ask for one (fast/balanced/accurate/auto)
+        self.default_quality = os.environ.get("QUALITY", "accurate")
+        # queue depths (requests / batch clips already queued, the new request not counted)
+        # at which requests are served one more tier cheaper ("" disables)
+        self.quality_degrade_depths = _env_int_list("QUALITY_DEGRADE_DEPTHS", [4, 8])
+        # tiers whose pose models are warmed up at startup
+        self.warmup_qualities = _env_list("WARMUP_QUALITIES", [self.default_quality])
+        # auto tier: mean landmark visibility below which the heavy model takes over
+        self.auto_min_visibility = _env_float("AUTO_MIN_VISIBILITY", 0.6)
+        # crop frames around the tracked athlete before pose inference
+        self.roi_tracking = _env_bool("ROI_TRACKING", True)
+        # margin around the landmark box (fraction of its size)
+        self.roi_padding = _env_float("ROI_PADDING", 0.25)
+        # crops are downscaled to this longer side (px) before inference
+        self.roi_max_side = _env_int("ROI_MAX_SIDE", 512)
+        # max clips accepted by POST /assessment/batch
+        self.batch_max_clips = _env_int("BATCH_MAX_CLIPS", 20)
+        # max landmark frames in one message of a live session (WS /assessment/live)
+        self.live_max_frames_per_message = _env_int("LIVE_MAX_FRAMES_PER_MESSAGE", 300)
+
+        # --- Scoring ---
+        # frames whose required joints are less visible than this are not scored
+        self.min_joint_visibility = _env_float("MIN_JOINT_VISIBILITY", 0.5)
+        # automatic exercise recognition: sampled frames per second and shortest exercise segment
+        self.exercise_sample_fps = _env_float("EXERCISE_SAMPLE_FPS", 5.0)
+        self.exercise_min_segment_seconds = _env_float("EXERCISE_MIN_SEGMENT_SECONDS", 3.0)
+        # smallest k-NN vote share of a recognized exercise; below it the segment is "unknown"
+        self.exercise_min_confidence = _env_float("EXERCISE_MIN_CONFIDENCE", 0.6)
+        # autoencoder validation: "window" (sequence windows, falls back to frames), "frame" or "off"
+        self.ml_validation = os.environ.get("ML_VALIDATION", "window")
+        # frames between the starts of scored windows (1 = every window)
+        self.ml_window_stride = _env_int("ML_WINDOW_STRIDE", 1)
+
+        # --- Profiling of slow assessment requests ---
+        # profiling is opt-in: nothing is sampled unless PROFILE_ENABLED is set
+        self.profile_enabled = _env_bool("PROFILE_ENABLED", False)
+        # share of requests profiled without the X-Profile header (0..1)
+        self.profile_sample_rate = _env_float("PROFILE_SAMPLE_RATE", 0.0)
+        # stack sampling interval of the profiler
+        self.profile_interval_s = _env_float("PROFILE_INTERVAL_MS", 5.0) / 1000
+        # only requests slower than this are stored
+        self.profile_min_seconds = _env_float("PROFILE_MIN_SECONDS", 10.0)
+        self.profile_dir = os.environ.get("PROFILE_DIR", "/tmp/assessment_profiles")
+        self.profile_max_files = _env_int("PROFILE_MAX_FILES", 50)
+
+        # --- Admin endpoints ---
+        # /admin routes require this value in the X-Admin-Token header (unset: /admin is disabled)
+        self.admin_token = os.environ.get("ADMIN_TOKEN") or None
+
+
+settings = Settings()
@@ -0,0 +1,68 @@
+"""
+Production server: gunicorn master + N uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+- WEB_CONCURRENCY: number of worker processes (default: CPU count)
+- POSE_POOL_SIZE: MediaPipe Pose detectors per worker (see config.py)
+- METRICS_MULTIPROC_DIR: where workers share metric snapshots so /metrics covers
+  all of them (default: a fresh directory under the system temp dir)
+- METRICS_FLUSH_SECONDS: how often each worker writes its snapshot (default: 5)
+
+Read-only artifacts (DTW templates, autoencoder weights, reference poses) are
+loaded once in the master before forking, so workers share them copy-on-write. MediaPipe Pose is
+not fork-safe and is created per worker after fork (warmup in main.lifespan).
+"""
+import gc
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# long videos: allow slow requests, recycle workers now and then
+timeout = int(os.environ.get("WORKER_TIMEOUT", 300))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get("MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+# set before the app is preloaded so every worker inherits it (services/metrics.py)
+os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), f"assessment-metrics-{os.getpid()}")
+)
+metrics_flush_seconds = float(os.environ.get("METRICS_FLUSH_SECONDS", 5.0))
+
+
+def on_starting(server):
+    from services import artifacts
+
+    # snapshots of a previous run would be summed into this one's counters
+    metrics_dir = os.environ["METRICS_MULTIPROC_DIR"]
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+        os.remove(path)
+
+    artifacts.preload()
+    # keep preloaded objects out of the cyclic GC so workers do not touch (and copy) their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # pose pools are also reset by os.register_at_fork; this keeps it explicit for gunicorn
+    from services import pose_pool
+    from services.metrics import REGISTRY
+
+    pose_pool.reset_after_fork()
+    REGISTRY.start_snapshot_writer(metrics_flush_seconds)
+    server.log.info("Worker %s ready for per-process pose pool", worker.pid)
+
+
+def worker_exit(server, worker):
+    # last snapshot, so the counters of a recycled worker stay in the totals
+    from services.metrics import REGISTRY
+
+    REGISTRY.write_snapshot()
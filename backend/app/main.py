@@ -1,11 +1,34 @@
+from services import lifecycle  # first import: starts the cold-start clock
+
+import os
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import assessment, health
+# routers only import light modules; the pipeline is loaded by the warmup hook
+from routes import admin, assessment, health, metrics
+
+# --- LOGGING ---
+# pipeline logs are leveled; per-frame progress is only emitted with LOG_LEVEL=DEBUG
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
+# --- STARTUP ---
+@asynccontextmanager
+async def lifespan(_app):
+    # load mediapipe / pipeline in the background; /api/health reports readiness
+    if os.environ.get("WARMUP_ON_STARTUP", "1") != "0":
+        lifecycle.start_background_warmup()
+    yield
+
 
 core_app = FastAPI(
     title="Workout Technique Assessment API",
     description="Backend API for video-based exercise analysis using rule-based evaluation and autoencoder models.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- CORS ---
@@ -20,6 +43,8 @@ core_app.add_middleware(
 # --- ROUTES REGISTRATION ---
 core_app.include_router(health.router)
 core_app.include_router(assessment.router)
+core_app.include_router(metrics.router)
+core_app.include_router(admin.router)
 
 # --- ROOT ROUTE ---
 @core_app.get("/", tags=["Root"])
@@ -29,6 +54,7 @@ def root():
 
 # --- ENTRY POINT ---
 app = core_app  # uvicorn expects variable "app"
+lifecycle.mark_app_loaded()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,133 @@
+"""
+Batched geometric augmentation of (B, 33, 3|4) landmark batches.
+
+Every pose of a batch gets its own random mirror, in-plane rotation, small yaw,
+anisotropic scale and jitter. All of them are applied with a few vectorized ops
+over the whole batch, fast enough to augment on the fly while training instead
+of writing augmented copies to disk. Mirroring flips x and swaps left / right
+landmarks, so the "left_knee" column still describes the left knee. A
+visibility channel is carried along (and swapped) unchanged.
+"""
+import numpy as np
+
+from models.feature_extractor import FeatureExtractor
+
+# the 33 MediaPipe Pose landmarks in index order
+LANDMARK_NAMES = (
+    "nose", "left_eye_inner", "left_eye", "left_eye_outer", "right_eye_inner", "right_eye",
+    "right_eye_outer", "left_ear", "right_ear", "mouth_left", "mouth_right",
+    "left_shoulder", "right_shoulder", "left_elbow", "right_elbow", "left_wrist", "right_wrist",
+    "left_pinky", "right_pinky", "left_index", "right_index", "left_thumb", "right_thumb",
+    "left_hip", "right_hip", "left_knee", "right_knee", "left_ankle", "right_ankle",
+    "left_heel", "right_heel", "left_foot_index", "right_foot_index",
+)
+
+
+def _mirror_name(name):
+    for a, b in (("left", "right"), ("right", "left")):
+        if name.startswith(f"{a}_"):
+            return f"{b}_{name[len(a) + 1:]}"
+        if name.endswith(f"_{a}"):
+            return f"{name[:-len(a)]}{b}"
+    return name
+
+
+def mirror_index(keypoints=None):
+    """
+    Landmark permutation swapping left and right (e.g. 25 <-> 26 for the knees).
+    Checked against FeatureExtractor.KEYPOINTS so the feature columns stay consistent.
+    """
+    keypoints = keypoints or FeatureExtractor().KEYPOINTS
+    for name, i in keypoints.items():
+        if LANDMARK_NAMES[i] != name:
+            raise ValueError(f"KEYPOINTS[{name!r}] = {i} does not match the MediaPipe landmark {LANDMARK_NAMES[i]!r}")
+    position = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+    return np.array([position[_mirror_name(name)] for name in LANDMARK_NAMES])
+
+
+class PoseAugmenter:
+    """Random per-pose geometric transforms of landmark batches."""
+
+    def __init__(self, mirror_prob=0.5, max_rotation_deg=15.0, max_yaw_deg=10.0, scale_range=(0.9, 1.1),
+                 aspect_range=(0.9, 1.1), jitter=0.02, seed=None):
+        """
+        Args:
+            mirror_prob: probability of a left/right mirrored pose
+            max_rotation_deg: in-plane (camera roll) rotation range, +-degrees
+            max_yaw_deg: rotation range about the vertical axis, +-degrees
+            scale_range: overall scale range
+            aspect_range: extra x scale relative to y (camera aspect / lens distortion)
+            jitter: std of per-landmark noise, as a fraction of the torso length
+        """
+        self.mirror_prob = mirror_prob
+        self.max_rotation = np.radians(max_rotation_deg)
+        self.max_yaw = np.radians(max_yaw_deg)
+        self.scale_range = scale_range
+        self.aspect_range = aspect_range
+        self.jitter = jitter
+        self.rng = np.random.default_rng(seed)
+        self.mirror = mirror_index()
+        k = FeatureExtractor().KEYPOINTS
+        self._hips = [k["left_hip"], k["right_hip"]]
+        self._shoulders = [k["left_shoulder"], k["right_shoulder"]]
+
+    def augment(self, batch):
+        """
+        Returns:
+            np.ndarray: transformed float32 copy of a (B, 33, C) batch, C = 3 or 4
+        """
+        batch = np.array(batch, dtype=np.float32)
+        if batch.ndim == 2:
+            batch = batch[None]
+        n = len(batch)
+        xyz = batch[..., :3]
+        rng = self.rng
+
+        # left/right mirror: swap landmarks, flip x about the hip center
+        flip = rng.random(n) < self.mirror_prob
+        if flip.any():
+            batch[flip] = batch[flip][:, self.mirror]
+
+        center = xyz[:, self._hips].mean(axis=1, keepdims=True)              # (B, 1, 3)
+        torso = np.linalg.norm(xyz[:, self._shoulders].mean(axis=1) - center[:, 0], axis=-1)  # (B,)
+        local = xyz - center
+
+        # rotation: roll about the camera axis (z), then yaw about the vertical axis (y)
+        roll = rng.uniform(-self.max_rotation, self.max_rotation, n)
+        yaw = rng.uniform(-self.max_yaw, self.max_yaw, n)
+        cr, sr, cy, sy = np.cos(roll), np.sin(roll), np.cos(yaw), np.sin(yaw)
+        zeros, ones = np.zeros(n), np.ones(n)
+        rz = np.stack([np.stack([cr, -sr, zeros], -1), np.stack([sr, cr, zeros], -1),
+                       np.stack([zeros, zeros, ones], -1)], 1)
+        ry = np.stack([np.stack([cy, zeros, sy], -1), np.stack([zeros, ones, zeros], -1),
+                       np.stack([-sy, zeros, cy], -1)], 1)
+        # per-axis scale: x gets the aspect factor, mirrored poses get x -> -x
+        scale = rng.uniform(*self.scale_range, n)
+        sx = scale * rng.uniform(*self.aspect_range, n) * np.where(flip, -1.0, 1.0)
+        transform = np.einsum("bij,bjk->bik", rz, ry) * np.stack([sx, scale, scale], -1)[:, None, :]
+        local = np.einsum("blj,bij->bli", local, transform.astype(np.float32))
+
+        if self.jitter:
+            noise = rng.normal(0.0, 1.0, local.shape).astype(np.float32)
+            local += noise * (self.jitter * torso)[:, None, None]
+        xyz[...] = local + center
+        return batch
+
+    def batches(self, points, batch_size=256, labels=None):
+        """
+        Endless stream of augmented batches drawn (with replacement) from a
+        (N, 33, C) pose array; yields (batch, labels) when labels are given.
+        """
+        points = np.asarray(points)
+        while True:
+            idx = self.rng.integers(len(points), size=batch_size)
+            batch = self.augment(points[idx])
+            yield batch if labels is None else (batch, np.asarray(labels)[idx])
+
+    def feature_batches(self, points, extractor, view, batch_size=256, labels=None):
+        """Augmented batches fed straight through the batched featurizer: yields (matrix, names[, labels])."""
+        for item in self.batches(points, batch_size, labels):
+            batch, batch_labels = (item, None) if labels is None else item
+            # the augmented batch is a private copy, so it may be normalized in place
+            matrix, names = extractor.build_feature_matrix(batch, view=view, inplace=True)
+            yield (matrix, names) if labels is None else (matrix, names, batch_labels)
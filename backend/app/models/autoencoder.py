@@ -0,0 +1,240 @@
+"""
+Dense autoencoder in plain NumPy: inference for serving and the gradients used
+by scripts/train_autoencoder.py.
+
+A model file (autoencoder_<view>.npz) is self-contained: layer weights and
+activations, the standardization (mean / scale) and column names of its input
+features, the camera view and extractor version it was trained for, and the
+anomaly threshold on the per-frame reconstruction error. Serving needs neither
+TensorFlow nor pickles.
+
+A window model (window > 1) reconstructs `window` consecutive frames at once, so
+it also sees how a pose changes over time (tempo, jerky motion). Its input rows
+are the concatenated standardized frames of a window; score_windows() builds all
+sliding windows of a clip as strided views into one matrix and scores them in a
+single batched forward pass. score_clip() first resamples a clip by its
+timestamps to the frame rate the windows were trained at. The threshold of a
+window model is calibrated on the same per-frame errors score_clip() returns.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+ACTIVATIONS = ("relu", "linear")
+
+
+class DenseAutoencoder:
+    """Stack of dense layers; input and output are standardized feature vectors."""
+
+    def __init__(self, weights, biases, activations, mean, scale, feature_names, view=None,
+                 extractor_version=None, threshold=None, window=1, fps=None):
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = [str(a) for a in activations]
+        unknown = set(self.activations) - set(ACTIVATIONS)
+        if unknown:
+            raise ValueError(f"Unsupported activations: {', '.join(sorted(unknown))}")
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.feature_names = [str(n) for n in feature_names]
+        self.view = view
+        self.extractor_version = extractor_version
+        self.threshold = threshold
+        # frames per input row, and the frame rate the windows were trained at
+        self.window = int(window)
+        self.fps = fps
+        if self.weights[0].shape[0] != self.window * len(self.feature_names):
+            raise ValueError(f"Input size {self.weights[0].shape[0]} does not match {self.window} frames "
+                             f"of {len(self.feature_names)} features")
+
+    @classmethod
+    def initialize(cls, layer_sizes, mean, scale, feature_names, rng, **kwargs):
+        """He-initialized ReLU layers with a linear output layer, e.g. layer_sizes=[20, 64, 8, 64, 20]."""
+        weights, biases = [], []
+        for fan_in, fan_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+            weights.append(rng.normal(0.0, np.sqrt(2.0 / fan_in), size=(fan_in, fan_out)))
+            biases.append(np.zeros(fan_out))
+        activations = ["relu"] * (len(weights) - 1) + ["linear"]
+        return cls(weights, biases, activations, mean, scale, feature_names, **kwargs)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            n = int(data["n_layers"])
+            threshold = float(data["threshold"]) if "threshold" in data else None
+            return cls([data[f"W{i}"] for i in range(n)], [data[f"b{i}"] for i in range(n)],
+                       data["activations"].tolist(), data["mean"], data["scale"], data["feature_names"].tolist(),
+                       view=str(data["view"]) if "view" in data else None,
+                       extractor_version=str(data["extractor_version"]) if "extractor_version" in data else None,
+                       threshold=threshold,
+                       window=int(data["window"]) if "window" in data else 1,
+                       fps=float(data["fps"]) if "fps" in data else None)
+
+    def save(self, path):
+        arrays = {f"W{i}": w for i, w in enumerate(self.weights)}
+        arrays.update({f"b{i}": b for i, b in enumerate(self.biases)})
+        arrays.update(n_layers=np.int64(len(self.weights)), activations=np.asarray(self.activations),
+                      mean=self.mean, scale=self.scale, feature_names=np.asarray(self.feature_names),
+                      window=np.int64(self.window))
+        if self.view is not None:
+            arrays["view"] = np.asarray(self.view)
+        if self.extractor_version is not None:
+            arrays["extractor_version"] = np.asarray(self.extractor_version)
+        if self.threshold is not None:
+            arrays["threshold"] = np.float64(self.threshold)
+        if self.fps is not None:
+            arrays["fps"] = np.float64(self.fps)
+        np.savez(path, **arrays)
+
+    @property
+    def input_dim(self):
+        return self.weights[0].shape[0]
+
+    # ===============================
+    # Inference
+    # ===============================
+    def standardize(self, matrix, names=None):
+        """(N, F) standardized model inputs; with `names` the model's columns are picked by name."""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if names is not None:
+            matrix = matrix[:, [list(names).index(n) for n in self.feature_names]]
+        return (np.nan_to_num(matrix) - self.mean) / self.scale
+
+    def forward(self, x, cache=False):
+        """Reconstruction of standardized (N, F) inputs (plus layer inputs / pre-activations with cache)."""
+        h = np.asarray(x, dtype=np.float32)
+        inputs, pre = [], []
+        for w, b, activation in zip(self.weights, self.biases, self.activations):
+            inputs.append(h)
+            z = h @ w + b
+            pre.append(z)
+            h = np.maximum(z, 0.0) if activation == "relu" else z
+        return (h, inputs, pre) if cache else h
+
+    def reconstruction_errors(self, x):
+        """Per-row mean squared reconstruction error of standardized inputs."""
+        diff = self.forward(x) - x
+        return np.einsum("ij,ij->i", diff, diff) / diff.shape[1]
+
+    def score(self, matrix, names):
+        """Per-frame reconstruction errors of a feature matrix (columns matched by name)."""
+        return self.reconstruction_errors(self.standardize(matrix, names))
+
+    def windows(self, x, stride=1):
+        """
+        (N, window * F) sliding windows of standardized (T, F) frames, every `stride` frames.
+
+        Consecutive rows of a C-contiguous matrix are adjacent in memory, so each
+        window is one contiguous run and the result is a read-only view into `x`
+        (nothing is copied).
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n = max((len(x) - self.window) // stride + 1, 0)
+        return as_strided(x, shape=(n, self.window * x.shape[1]), strides=(stride * x.strides[0], x.strides[1]),
+                          writeable=False)
+
+    def score_windows(self, matrix, names, stride=1):
+        """
+        Reconstruction errors of the sliding windows of a (T, F) feature matrix, from
+        one batched forward pass, and the per-frame errors: the mean error of a frame
+        over all windows containing it. Linear in T.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (N,) window errors and (T,) frame errors
+        """
+        if not 1 <= stride <= self.window:
+            raise ValueError(f"stride must be between 1 and the window ({self.window}), got {stride}")
+        x = self.standardize(matrix, names)
+        t, f = x.shape
+        if t == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        if t < self.window:  # shorter than one window: hold the last frame
+            x = np.pad(x, ((0, self.window - t), (0, 0)), mode="edge")
+        windows = self.windows(x, stride)
+        diff = (self.forward(windows) - windows).reshape(len(windows), self.window, f)
+        # (N, window): error of every frame of every window
+        errors = np.einsum("nwf,nwf->nw", diff, diff) / f
+
+        # overlap-add the window frames back onto the clip's frames
+        total = np.zeros(len(x), dtype=np.float32)
+        count = np.zeros(len(x), dtype=np.int32)
+        span = (len(windows) - 1) * stride + 1
+        for k in range(self.window):
+            total[k:k + span:stride] += errors[:, k]
+            count[k:k + span:stride] += 1
+        covered = (len(windows) - 1) * stride + self.window
+        frame_errors = total[:covered] / count[:covered]
+        # frames after the last full window (stride > 1) take the error of the last covered frame
+        frame_errors = np.concatenate([frame_errors, np.full(len(x) - covered, frame_errors[-1], np.float32)])
+        return errors.mean(axis=1), frame_errors[:t]
+
+    def score_clip(self, matrix, names, timestamps, stride=1):
+        """
+        (T,) per-frame reconstruction errors of a clip, comparable with `threshold`.
+
+        A window model scores the clip resampled by `timestamps` (seconds, increasing,
+        gaps from dropped frames included) to a uniform grid at self.fps, and the grid
+        errors are interpolated back to the clip's frames.
+        """
+        if self.window == 1:
+            return self.score(matrix, names)
+        matrix = np.asarray(matrix, dtype=np.float32)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(matrix) < 2 or not self.fps:
+            return self.score_windows(matrix, names, stride)[1]
+        grid = np.arange(timestamps[0], timestamps[-1] + 0.5 / self.fps, 1.0 / self.fps)
+        # linear interpolation of all columns at once: grid[i] lies between frames hi - 1 and hi
+        hi = np.clip(np.searchsorted(timestamps, grid, side="right"), 1, len(timestamps) - 1)
+        lo = hi - 1
+        weight = np.clip((grid - timestamps[lo]) / np.maximum(timestamps[hi] - timestamps[lo], 1e-9), 0.0, 1.0)
+        weight = weight.astype(np.float32)[:, None]
+        resampled = matrix[lo] * (1 - weight) + matrix[hi] * weight
+        _, grid_errors = self.score_windows(resampled, names, stride)
+        return np.interp(timestamps, grid, grid_errors).astype(np.float32)
+
+    # ===============================
+    # Training
+    # ===============================
+    def gradients(self, x):
+        """
+        Mean squared error of a standardized batch and its gradients.
+
+        Returns:
+            tuple[float, list[np.ndarray], list[np.ndarray]]: loss, weight and bias gradients
+        """
+        out, inputs, pre = self.forward(x, cache=True)
+        diff = out - x
+        loss = float(np.mean(diff * diff))
+        grad = (2.0 / diff.size) * diff
+        grad_w, grad_b = [None] * len(self.weights), [None] * len(self.weights)
+        for i in reversed(range(len(self.weights))):
+            if self.activations[i] == "relu":
+                grad = grad * (pre[i] > 0)
+            grad_w[i] = inputs[i].T @ grad
+            grad_b[i] = grad.sum(axis=0)
+            if i:
+                grad = grad @ self.weights[i].T
+        return loss, grad_w, grad_b
+
+    def parameters(self):
+        return self.weights + self.biases
+
+
+class Adam:
+    """Adam optimizer updating a list of float32 arrays in place."""
+
+    def __init__(self, params, lr=1e-3, beta1=0.9, beta2=0.999, eps=1e-7):
+        self.params = params
+        self.lr, self.beta1, self.beta2, self.eps = lr, beta1, beta2, eps
+        self.m = [np.zeros_like(p) for p in params]
+        self.v = [np.zeros_like(p) for p in params]
+        self.t = 0
+
+    def step(self, grads):
+        self.t += 1
+        correction = np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for p, g, m, v in zip(self.params, grads, self.m, self.v):
+            m *= self.beta1
+            m += (1 - self.beta1) * g
+            v *= self.beta2
+            v += (1 - self.beta2) * g * g
+            p -= (self.lr * correction) * m / (np.sqrt(v) + self.eps)
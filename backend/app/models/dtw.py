@@ -0,0 +1,207 @@
+"""
+Dynamic time warping of joint-angle trajectories against a library of reference reps.
+
+Every rep (user rep or template) is resampled to a fixed length, so one banded
+(Sakoe-Chiba) DTW kernel compares a query against many templates at once. The DP
+runs over anti-diagonals, vectorized over templates. LB_Keogh lower bounds,
+computed from per-template envelopes stored in the index, rank the candidates
+first. Only the ones whose bound beats the best distance so far get the full DTW.
+
+Angles are compared in degrees and are not z-normalized: how deep a rep goes is
+part of the technique being judged.
+"""
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def resample(series, length):
+    """Linearly resamples a (T, K) trajectory to (length, K)."""
+    series = np.asarray(series, dtype=np.float64)
+    if series.ndim == 1:
+        series = series[:, None]
+    if len(series) == 1:
+        return np.repeat(series, length, axis=0)
+    src = np.linspace(0.0, 1.0, len(series))
+    dst = np.linspace(0.0, 1.0, length)
+    return np.column_stack([np.interp(dst, src, series[:, k]) for k in range(series.shape[1])])
+
+
+def envelope(series, band):
+    """
+    Upper / lower LB_Keogh envelopes: running max / min over +-band steps.
+
+    Args:
+        series: (..., L, K) trajectories
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: upper and lower envelopes, same shape as series
+    """
+    series = np.asarray(series)
+    axis = series.ndim - 2
+    pad = [(0, 0)] * series.ndim
+    pad[axis] = (band, band)
+    # edge padding leaves the max / min of the clipped windows unchanged
+    windows = sliding_window_view(np.pad(series, pad, mode="edge"), 2 * band + 1, axis=axis)
+    return windows.max(axis=-1), windows.min(axis=-1)
+
+
+def lb_keogh(query, upper, lower):
+    """
+    LB_Keogh lower bound of the banded squared-error DTW cost.
+
+    Args:
+        query: (L, K) trajectory
+        upper, lower: (N, L, K) template envelopes
+
+    Returns:
+        np.ndarray: (N,) lower bounds
+    """
+    above = np.maximum(query - upper, 0.0)
+    below = np.maximum(lower - query, 0.0)
+    return (above * above + below * below).sum(axis=(1, 2))
+
+
+@lru_cache(maxsize=16)
+def _band_diagonals(length, band):
+    """(i, j) cell indices (1-based DP coordinates) of each anti-diagonal inside the band."""
+    diagonals = []
+    for d in range(2, 2 * length + 1):
+        i = np.arange(max(1, d - length), min(length, d - 1) + 1)
+        j = d - i
+        inside = np.abs(i - j) <= band
+        diagonals.append((i[inside], j[inside]))
+    return diagonals
+
+
+def banded_dtw(query, templates, band):
+    """
+    Squared-error DTW cost of one query against N templates of the same length,
+    restricted to a Sakoe-Chiba band of +-band steps.
+
+    Args:
+        query: (L, K) trajectory
+        templates: (N, L, K) trajectories
+
+    Returns:
+        np.ndarray: (N,) accumulated costs
+    """
+    query = np.asarray(query, dtype=np.float64)
+    templates = np.asarray(templates, dtype=np.float64)
+    n, length = len(templates), len(query)
+    # pairwise squared distances (N, L, L) in one shot
+    cost = ((query * query).sum(-1)[None, :, None]
+            + (templates * templates).sum(-1)[:, None, :]
+            - 2.0 * np.einsum("ik,njk->nij", query, templates))
+    np.maximum(cost, 0.0, out=cost)
+
+    acc = np.full((n, length + 1, length + 1), np.inf)
+    acc[:, 0, 0] = 0.0
+    for i, j in _band_diagonals(length, band):
+        best = np.minimum(np.minimum(acc[:, i - 1, j - 1], acc[:, i - 1, j]), acc[:, i, j - 1])
+        acc[:, i, j] = cost[:, i - 1, j - 1] + best
+    return acc[:, length, length]
+
+
+class TemplateIndex:
+    """
+    Reference reps of every exercise with their precomputed LB_Keogh envelopes.
+    Templates are stored grouped by exercise, so each exercise is one contiguous slice.
+    """
+
+    # joint angles present in both camera views' feature matrices
+    CHANNELS = (
+        "left_knee", "right_knee", "left_elbow", "right_elbow", "torso",
+        "torso_angle_from_vertical", "left_arm_lift_angle", "right_arm_lift_angle",
+    )
+
+    def __init__(self, templates, exercises, channels=CHANNELS, band=5):
+        """
+        Args:
+            templates: (N, L, K) resampled angle trajectories
+            exercises: (N,) exercise key of every template
+            channels: feature names of the K angle channels
+            band: Sakoe-Chiba half-width in resampled steps
+        """
+        exercises = np.asarray(exercises).astype(str)
+        order = np.argsort(exercises, kind="stable")
+        self.templates = np.ascontiguousarray(np.asarray(templates, dtype=np.float32)[order])
+        self.exercises = exercises[order]
+        self.channels = tuple(str(c) for c in channels)
+        self.band = int(band)
+        self.length = self.templates.shape[1]
+        self.upper, self.lower = envelope(self.templates, self.band)
+
+        names, starts, counts = np.unique(self.exercises, return_index=True, return_counts=True)
+        self._slices = {str(name): slice(s, s + c) for name, s, c in zip(names, starts, counts)}
+
+    @classmethod
+    def from_trajectories(cls, trajectories, exercises, channels=CHANNELS, length=50, band_ratio=0.1):
+        """Builds an index from variable-length (T, K) trajectories."""
+        templates = np.stack([resample(t, length) for t in trajectories])
+        return cls(templates, exercises, channels=channels, band=max(int(round(length * band_ratio)), 1))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["templates"], data["exercises"], channels=data["channels"], band=int(data["band"]))
+
+    def save(self, path):
+        np.savez_compressed(path, templates=self.templates, exercises=self.exercises,
+                            channels=np.asarray(self.channels), band=np.int64(self.band))
+
+    def exercises_indexed(self):
+        return list(self._slices)
+
+    def count(self, exercise):
+        sl = self._slices.get(exercise)
+        return 0 if sl is None else sl.stop - sl.start
+
+    def trajectory(self, matrix, names):
+        """(T, K) angle channels of a (T, F) feature matrix, in index channel order."""
+        columns = [names.index(c) for c in self.channels]
+        return np.nan_to_num(np.asarray(matrix, dtype=np.float64)[:, columns])
+
+    def match(self, trajectory, exercise, batch=32):
+        """
+        Nearest template of `exercise` to a (T, K) rep trajectory.
+
+        Candidates are visited in increasing LB_Keogh order, in batches; the search
+        stops once no remaining bound beats the best DTW cost found.
+
+        Returns:
+            dict | None: {"template", "distance_deg", "pruned"} where distance_deg is the
+            RMS angle deviation along the warping path; None without templates
+        """
+        sl = self._slices.get(exercise)
+        if sl is None:
+            return None
+        query = resample(trajectory, self.length)
+        upper, lower, templates = self.upper[sl], self.lower[sl], self.templates[sl]
+
+        bounds = lb_keogh(query, upper, lower)
+        order = np.argsort(bounds)
+        best_cost, best_idx, computed = np.inf, -1, 0
+        for start in range(0, len(order), batch):
+            candidates = order[start:start + batch]
+            candidates = candidates[bounds[candidates] < best_cost]
+            if len(candidates) == 0:
+                break  # bounds are sorted: every later candidate is pruned too
+            costs = banded_dtw(query, templates[candidates], self.band)
+            computed += len(candidates)
+            i = int(np.argmin(costs))
+            if costs[i] < best_cost:
+                best_cost, best_idx = float(costs[i]), int(candidates[i])
+
+        return {
+            "template": sl.start + best_idx,
+            # per-step cost summed over channels -> RMS deviation of one angle
+            "distance_deg": float(np.sqrt(best_cost / (self.length * len(self.channels)))),
+            "pruned": len(order) - computed,
+        }
+
+    @staticmethod
+    def similarity(distance_deg, tolerance_deg=30.0):
+        """Maps an RMS angle deviation to a 0..100 similarity (0 at `tolerance_deg`)."""
+        return float(np.clip(100.0 * (1.0 - distance_deg / tolerance_deg), 0.0, 100.0))
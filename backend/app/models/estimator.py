@@ -2,9 +2,21 @@ from abc import ABC, abstractmethod
 import numpy as np
 from scipy.signal import find_peaks
 from statistics import mean
+from models.temporal_features import TemporalFeatureExtractor
+
+# front-view stand-ins of the side-view primary angles
+PRIMARY_ANGLE_FALLBACK = {"knee_angle": "left_knee", "elbow_angle": "left_elbow"}
+
 
 class BaseRuleEvaluator(ABC):
     """Base class for all rule-based evaluators."""
+    # angle that drives the rep cycle (None = no tempo analysis)
+    PRIMARY_ANGLE = None
+    # -1: angle decreases while lowering (eccentric), +1: angle increases
+    ECCENTRIC_SIGN = -1
+    # joints that must be visible for a frame to be scored ("knee" = better of left/right)
+    REQUIRED_JOINTS = ("shoulder", "hip")
+
     def __init__(self):
         self.score = 100
         self.feedback = []
@@ -14,8 +26,13 @@ class BaseRuleEvaluator(ABC):
         """Evaluates one exercise and gives a score and feedback."""
         pass
 
-    def evaluate_sequence(self, feature_sequence, every_n=10):
-        """Sequence of exercises evaluation."""
+    def evaluate_sequence(self, feature_sequence, every_n=10, weights=None):
+        """Sequence of exercises evaluation.
+
+        Args:
+            weights: optional per-frame confidences; frame scores are averaged with
+                     these weights so poorly visible frames count less
+        """
         scores = []
         feedbacks = []
         for i, f in enumerate(feature_sequence[::every_n]):
@@ -24,6 +41,10 @@ class BaseRuleEvaluator(ABC):
             self.evaluate(f)
             scores.append(self.score)
             feedbacks.extend(self.feedback)
+        if weights is not None:
+            w = np.asarray(weights, dtype=np.float64)[::every_n]
+            if w.sum() > 0:
+                return {"mean_score": np.average(scores, weights=w), "feedback": list(set(feedbacks))}
         return {"mean_score": np.mean(scores), "feedback": list(set(feedbacks))}
     
     def phase_analysis(self, feature_sequence, every_n=10):
@@ -37,7 +58,33 @@ class BaseRuleEvaluator(ABC):
         """
         return {"phase_score": 100.0, "phase_feedback": []}
 
-    def evaluate_unified(self, feature_sequence, every_n=10, alpha=0.6, beta=0.4):
+    def primary_column(self, names):
+        """Index of PRIMARY_ANGLE in a feature matrix's column names (None if it has no column)."""
+        key = self.PRIMARY_ANGLE
+        if key is None:
+            return None
+        if key not in names:
+            # side-view primary angles have no column in front-view features
+            key = PRIMARY_ANGLE_FALLBACK.get(key)
+        return names.index(key) if key in names else None
+
+    def tempo_analysis(self, feature_sequence, fps=30.0, timestamps=None):
+        """
+        Rep count, eccentric/concentric tempo and time-under-tension of PRIMARY_ANGLE
+        (or its front-view stand-in, the same column primary_column() picks for rep segmentation).
+        """
+        if self.PRIMARY_ANGLE is None or not feature_sequence:
+            return None
+        names = list(feature_sequence[0])
+        column = self.primary_column(names)
+        if column is None:
+            return None
+        temporal = TemporalFeatureExtractor(fps=fps)
+        signal = temporal.feature_columns(feature_sequence, [names[column]])[names[column]]
+        return temporal.tempo(signal, timestamps=timestamps, eccentric_sign=self.ECCENTRIC_SIGN)
+
+    def evaluate_unified(self, feature_sequence, every_n=10, alpha=0.6, beta=0.4, fps=30.0, timestamps=None,
+                         weights=None):
         """Unified evaluation combining frame-level quality and phase-level analysis.
 
         Args:
@@ -45,17 +92,21 @@ class BaseRuleEvaluator(ABC):
             every_n: sampling step for frame-level evaluation
             alpha: weight for frame-level score
             beta: weight for phase-level score (alpha+beta should be 1.0 ideally)
+            fps: frame rate used for tempo analysis when timestamps are not given
+            timestamps: optional per-frame times in seconds
+            weights: optional per-frame confidences for the frame-level score
 
         Returns:
             dict: {
                "score": float,
                "frame_score": float,
                "phase_score": float,
-               "feedback": [str,...]
+               "feedback": [str,...],
+               "tempo": dict | None
             }
         """
         # Frame-level aggregated result
-        frame_res = self.evaluate_sequence(feature_sequence, every_n=every_n)
+        frame_res = self.evaluate_sequence(feature_sequence, every_n=every_n, weights=weights)
         frame_score = frame_res["mean_score"]
         frame_feedback = frame_res["feedback"]
 
@@ -72,7 +123,8 @@ class BaseRuleEvaluator(ABC):
             "score": round(final_score, 1),
             "frame_score": round(frame_score, 1),
             "phase_score": round(phase_score, 1),
-            "feedback": combined_feedback
+            "feedback": combined_feedback,
+            "tempo": self.tempo_analysis(feature_sequence, fps=fps, timestamps=timestamps)
         }
 
     def _penalize(self, condition, message, penalty):
@@ -86,6 +138,9 @@ class BaseRuleEvaluator(ABC):
 
 
 class PushupEvaluator(BaseRuleEvaluator):
+    PRIMARY_ANGLE = "elbow_angle"
+    REQUIRED_JOINTS = ("shoulder", "elbow", "wrist", "hip")
+
     def evaluate(self, features):
         """Frame-level evaluation for a single pose."""
         elbow_angle = features.get("elbow_angle", 180)
@@ -151,6 +206,9 @@ class PushupEvaluator(BaseRuleEvaluator):
 
 class PullupEvaluator(BaseRuleEvaluator):
     """Rule-based evaluator for Pull-ups (up and down phases)."""
+    PRIMARY_ANGLE = "elbow_angle"
+    ECCENTRIC_SIGN = 1
+    REQUIRED_JOINTS = ("shoulder", "elbow", "wrist")
     
     def evaluate(self, f):
         elbow_angle = f.get("elbow_angle", 180)
@@ -195,6 +253,9 @@ class PullupEvaluator(BaseRuleEvaluator):
 
 class SitupEvaluator(BaseRuleEvaluator):
     """Rule-based evaluator for Sit-ups."""
+    PRIMARY_ANGLE = "torso_angle_from_vertical"
+    ECCENTRIC_SIGN = 1
+    REQUIRED_JOINTS = ("shoulder", "hip", "knee")
     
     def evaluate(self, f):
         torso_angle = f.get("torso_angle_from_vertical", 90)
@@ -231,6 +292,8 @@ class SitupEvaluator(BaseRuleEvaluator):
 
 class JumpingJackEvaluator(BaseRuleEvaluator):
     """Rule-based evaluator for Jumping Jacks."""
+    PRIMARY_ANGLE = "left_arm_lift_angle"
+    REQUIRED_JOINTS = ("shoulder", "elbow", "wrist", "hip", "ankle")
 
     def evaluate(self, f):
         arm_angle = f.get("left_arm_lift_angle", 0)
@@ -267,6 +330,8 @@ class JumpingJackEvaluator(BaseRuleEvaluator):
 
 class SquatEvaluator(BaseRuleEvaluator):
     """Rule-based evaluator for Squats."""
+    PRIMARY_ANGLE = "knee_angle"
+    REQUIRED_JOINTS = ("shoulder", "hip", "knee", "ankle")
 
     def evaluate(self, f):
         knee_angle = f.get("knee_angle", 180)
@@ -316,7 +381,8 @@ class ExerciseEvaluator:
             "squat": SquatEvaluator(),
         }
 
-    def evaluate(self, exercise_type, features, every_n=10, alpha=0.6, beta=0.4):
+    def evaluate(self, exercise_type, features, every_n=10, alpha=0.6, beta=0.4, fps=30.0, timestamps=None,
+                 weights=None):
         """
         Evaluate either a single frame (features is a dict) or a sequence (features is a list of dicts).
         Returns unified result for sequences or frame-level result for single frames.
@@ -327,7 +393,8 @@ class ExerciseEvaluator:
         evaluator = self.evaluators[exercise_type]
 
         if isinstance(features, list):
-            return evaluator.evaluate_unified(features, every_n=every_n, alpha=alpha, beta=beta)
+            return evaluator.evaluate_unified(features, every_n=every_n, alpha=alpha, beta=beta,
+                                              fps=fps, timestamps=timestamps, weights=weights)
         else:
             evaluator.score = 100.0
             evaluator.feedback = []
@@ -0,0 +1,120 @@
+"""
+Exercise recognition by k-NN voting over the reference pose index.
+
+Each sampled frame votes with the exercise labels of its k nearest dataset
+poses (all exercises, models/reference_index.py). Votes are averaged over the
+whole clip to pick one exercise. A rolling average over a few seconds, split
+into runs, gives per-segment exercises for clips that mix several exercises.
+Single frames are ambiguous (a standing squat top looks like a jumping jack
+start), so decisions are always made over many frames. Clips or segments whose
+winning exercise gets too small a share of the votes are labelled "unknown"
+rather than assessed against the wrong exercise.
+"""
+import numpy as np
+
+from models.temporal_features import TemporalFeatureExtractor
+
+# label of clips / segments no exercise is confidently recognized in
+UNKNOWN_EXERCISE = "unknown"
+
+
+class ExerciseClassifier:
+    """Clip- and segment-level exercise labels from per-frame k-NN votes."""
+
+    def __init__(self, index, k=7, window_seconds=2.0, min_segment_seconds=3.0, min_confidence=0.0):
+        """
+        Args:
+            index: ReferencePoseIndex
+            k: neighbours voting for every frame
+            window_seconds: rolling window the votes are averaged over before segmenting
+            min_segment_seconds: shorter segments are merged into a neighbour
+            min_confidence: smallest vote share of a recognized exercise (below: UNKNOWN_EXERCISE)
+        """
+        self.index = index
+        self.k = k
+        self.window_seconds = window_seconds
+        self.min_segment_seconds = min_segment_seconds
+        self.min_confidence = min_confidence
+
+    def exercises(self, view):
+        return sorted(self.index.views[view]["trees"].keys() - {None})
+
+    def frame_votes(self, matrix, names, view):
+        """
+        Returns:
+            tuple[np.ndarray, list[str]]: (T, E) fraction of the k neighbours of every
+            row that belong to each of the E exercises, and the exercise names
+        """
+        found = self.index.query(matrix, names, view, k=self.k)
+        if found is None:
+            raise ValueError(f"No reference poses for the {view} view")
+        exercises = self.exercises(view)
+        labels = self.index.views[view]["exercises"][found[1]]        # (T, k)
+        votes = (labels[..., None] == np.asarray(exercises)).mean(axis=1)
+        return votes, exercises
+
+    def classify(self, matrix, names, view):
+        """Most voted exercise over all rows (or UNKNOWN_EXERCISE) and its share of the votes."""
+        votes, exercises = self.frame_votes(matrix, names, view)
+        mean = votes.mean(axis=0)
+        best = int(np.argmax(mean))
+        return self._label(exercises[best], mean[best]), float(mean[best])
+
+    def _label(self, exercise, confidence):
+        return exercise if confidence >= self.min_confidence else UNKNOWN_EXERCISE
+
+    def segment(self, matrix, names, view, timestamps):
+        """
+        Splits rows into runs of one exercise.
+
+        Args:
+            timestamps: (T,) times of the rows in seconds (rows may be sampled sparsely)
+
+        Returns:
+            list[tuple[int, int, str, float]]: (start, end) row ranges (end exclusive),
+            exercise (or UNKNOWN_EXERCISE) and mean vote share, covering all rows in order
+        """
+        votes, exercises = self.frame_votes(matrix, names, view)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        rate = (len(timestamps) - 1) / max(timestamps[-1] - timestamps[0], 1e-6) if len(timestamps) > 1 else 1.0
+        window = max(int(round(self.window_seconds * rate)), 1)
+        smoothed = TemporalFeatureExtractor.rolling_mean(votes, window)
+        labels = np.argmax(smoothed, axis=1)
+
+        # runs of equal labels: [start, end) boundaries
+        cuts = np.flatnonzero(np.diff(labels)) + 1
+        runs = [[s, e, labels[s]] for s, e in zip(np.r_[0, cuts], np.r_[cuts, len(labels)])]
+        # merge too short runs into the longer neighbour until all are long enough
+        while len(runs) > 1:
+            durations = [timestamps[e - 1] - timestamps[s] for s, e, _ in runs]
+            i = int(np.argmin(durations))
+            if durations[i] >= self.min_segment_seconds:
+                break
+            if i == 0:
+                j = 1
+            elif i == len(runs) - 1:
+                j = i - 1
+            else:
+                j = i - 1 if durations[i - 1] >= durations[i + 1] else i + 1
+            lo, hi = min(i, j), max(i, j)
+            runs[lo:hi + 1] = [[runs[lo][0], runs[hi][1], runs[j][2]]]
+            # neighbours that now share a label become one run
+            merged = [runs[0]]
+            for run in runs[1:]:
+                if run[2] == merged[-1][2]:
+                    merged[-1][1] = run[1]
+                else:
+                    merged.append(run)
+            runs = merged
+
+        segments = []
+        for s, e, label in runs:
+            confidence = float(votes[s:e, label].mean())
+            exercise = self._label(exercises[label], confidence)
+            if segments and exercise == UNKNOWN_EXERCISE and segments[-1][2] == UNKNOWN_EXERCISE:
+                # one unknown segment instead of several; its confidence is the row-weighted mean
+                first, end, _, previous = segments.pop()
+                confidence = (previous * (end - first) + confidence * (e - s)) / (e - first)
+                s = first
+            segments.append((int(s), int(e), exercise, confidence))
+        return segments
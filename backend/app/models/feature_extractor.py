@@ -1,11 +1,18 @@
 import numpy as np
+from models import geometry_kernels as gk
 
 class FeatureExtractor:
     """
     Full biomechanical feature extractor for pose analysis (front & side views).
     Generates comprehensive features for both ML and rule-based analysis.
+    Every feature is defined once, in build_feature_matrix (single frames go through it too).
     """
 
+    # view_score below this value is treated as a frontal camera
+    VIEW_THRESHOLD = 0.15
+    # bump when feature definitions or column order change (stored in feature stores)
+    VERSION = "1"
+
     def __init__(self, keypoints=None):
         # MediaPipe keypoint indices
         self.KEYPOINTS = keypoints or {
@@ -37,202 +44,47 @@ class FeatureExtractor:
     # ===============================
     def angle_between_points(self, a, b, c):
         """Compute an angle (in degrees) between three points: a-b-c"""
-        a, b, c = np.array(a), np.array(b), np.array(c)
-        ba = a - b
-        bc = c - b
-        cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-        cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
-        return np.degrees(np.arccos(cosine_angle))
+        return gk.angles(a, b, c)
 
     def distance(self, p1, p2):
-        return np.linalg.norm(np.array(p1) - np.array(p2))
+        return gk.distances(p1, p2)
 
     def midpoint(self, p1, p2):
-        return (np.array(p1) + np.array(p2)) / 2
+        return gk.midpoints(p1, p2)
 
     # ===============================
     # Pose normalization
     # ===============================
     def normalize_pose(self, points):
         """Centers the pose and scales by hip distance."""
-        left_hip = points[self.KEYPOINTS['left_hip']]
-        right_hip = points[self.KEYPOINTS['right_hip']]
-        center = self.midpoint(left_hip, right_hip)
-        scale = self.distance(left_hip, right_hip)
-        if scale == 0:
-            scale = 1.0
-        normalized = [(np.array(p) - center) / scale for p in points]
-        return normalized
-
-    # ===============================
-    # Universal features
-    # ===============================
-    def extract_joint_angles(self, points):
-        """Knee, elbow, and torso angles."""
-        angles = {}
-        neck = self.midpoint(points[self.KEYPOINTS['left_shoulder']], points[self.KEYPOINTS['right_shoulder']])
-
-        angles['left_knee'] = self.angle_between_points(points[self.KEYPOINTS['left_hip']],
-                                                        points[self.KEYPOINTS['left_knee']],
-                                                        points[self.KEYPOINTS['left_ankle']])
-        angles['right_knee'] = self.angle_between_points(points[self.KEYPOINTS['right_hip']],
-                                                         points[self.KEYPOINTS['right_knee']],
-                                                         points[self.KEYPOINTS['right_ankle']])
-        angles['left_elbow'] = self.angle_between_points(points[self.KEYPOINTS['left_shoulder']],
-                                                         points[self.KEYPOINTS['left_elbow']],
-                                                         points[self.KEYPOINTS['left_wrist']])
-        angles['right_elbow'] = self.angle_between_points(points[self.KEYPOINTS['right_shoulder']],
-                                                          points[self.KEYPOINTS['right_elbow']],
-                                                          points[self.KEYPOINTS['right_wrist']])
-        angles['torso'] = self.angle_between_points(neck,
-                                                    points[self.KEYPOINTS['left_hip']],
-                                                    points[self.KEYPOINTS['left_knee']])
-        return angles
-
-    def extract_symmetry_features(self, points):
-        """Estimates shoulder and hip symmetry."""
-        features = {}
-        left_shoulder = points[self.KEYPOINTS['left_shoulder']]
-        right_shoulder = points[self.KEYPOINTS['right_shoulder']]
-        left_hip = points[self.KEYPOINTS['left_hip']]
-        right_hip = points[self.KEYPOINTS['right_hip']]
-
-        features['shoulder_width'] = self.distance(left_shoulder, right_shoulder)
-        features['hip_width'] = self.distance(left_hip, right_hip)
-        features['shoulders_hips_ratio'] = features['shoulder_width'] / features['hip_width'] if features['hip_width'] > 0 else 0
-        features['shoulder_tilt'] = abs(left_shoulder[1] - right_shoulder[1])
-        features['hip_tilt'] = abs(left_hip[1] - right_hip[1])
-        return features
-
-    def extract_posture_features(self, points):
-        """Body vertical alignment (spine tilt)."""
-        features = {}
-        neck = self.midpoint(points[self.KEYPOINTS['left_shoulder']], points[self.KEYPOINTS['right_shoulder']])
-        mid_hip = self.midpoint(points[self.KEYPOINTS['left_hip']], points[self.KEYPOINTS['right_hip']])
-        torso_vec = np.array(neck) - np.array(mid_hip)
-        vertical = np.array([0, -1, 0])
-        cosine = np.dot(torso_vec, vertical) / (np.linalg.norm(torso_vec) * np.linalg.norm(vertical))
-        features['torso_angle_from_vertical'] = np.degrees(np.arccos(np.clip(cosine, -1, 1)))
-        return features
-
-    def extract_balance_features(self, points):
-        """Center of mass balance (projected along x and y)."""
-        left_ankle = points[self.KEYPOINTS['left_ankle']]
-        right_ankle = points[self.KEYPOINTS['right_ankle']]
-        left_hip = points[self.KEYPOINTS['left_hip']]
-        right_hip = points[self.KEYPOINTS['right_hip']]
-
-        base_center = self.midpoint(left_ankle, right_ankle)
-        hip_center = self.midpoint(left_hip, right_hip)
-        balance_x = abs(base_center[0] - hip_center[0])
-        balance_y = abs(base_center[1] - hip_center[1])
-        return {'balance_x': balance_x, 'balance_y': balance_y}
+        return self.normalize_sequence(np.asarray(points)[None])[0]
 
-    # ===============================
-    # Front-view specific
-    # ===============================
-    def extract_front_symmetry_features(self, points):
-        """Front-view: symmetry around vertical center."""
-        features = {}
-        left_shoulder = points[self.KEYPOINTS['left_shoulder']]
-        right_shoulder = points[self.KEYPOINTS['right_shoulder']]
-        left_knee = points[self.KEYPOINTS['left_knee']]
-        right_knee = points[self.KEYPOINTS['right_knee']]
-        left_hip = points[self.KEYPOINTS['left_hip']]
-        right_hip = points[self.KEYPOINTS['right_hip']]
-        center_x = (left_hip[0] + right_hip[0]) / 2
-        features['shoulder_x_sym'] = abs(left_shoulder[0] - (2 * center_x - right_shoulder[0]))
-        features['knee_x_sym'] = abs(left_knee[0] - (2 * center_x - right_knee[0]))
-        features['hip_x_sym'] = abs(left_hip[0] - (2 * center_x - right_hip[0]))
-        features['shoulder_y_tilt'] = abs(left_shoulder[1] - right_shoulder[1])
-        features['hip_y_tilt'] = abs(left_hip[1] - right_hip[1])
-        return features
-
-    def extract_front_alignment_features(self, points):
-        """Front-view: body tilt and vertical alignment."""
-        features = {}
-        neck = self.midpoint(points[self.KEYPOINTS['left_shoulder']], points[self.KEYPOINTS['right_shoulder']])
-        mid_hip = self.midpoint(points[self.KEYPOINTS['left_hip']], points[self.KEYPOINTS['right_hip']])
-        torso_vec = np.array(neck) - np.array(mid_hip)
-        vertical = np.array([0, -1, 0])
-        cosine = np.dot(torso_vec, vertical) / (np.linalg.norm(torso_vec) * np.linalg.norm(vertical))
-        features['body_tilt_angle'] = np.degrees(np.arccos(np.clip(cosine, -1, 1)))
-        return features
-    
-    def left_arm_lift_angle(self, points):
-        """
-        Compute angle of left arm lift (shoulder-elbow-wrist)
-        Useful для Front Raise
+    def normalize_sequence(self, points_sequence, inplace=False):
         """
-        a = points[self.KEYPOINTS['left_shoulder']]
-        b = points[self.KEYPOINTS['left_elbow']]
-        c = points[self.KEYPOINTS['left_wrist']]
-
-        ba = np.array(a) - np.array(b)
-        bc = np.array(c) - np.array(b)
-        cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-        cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
-        return np.degrees(np.arccos(cosine_angle))
-
-    def right_arm_lift_angle(self, points):
+        Batched normalize_pose for a (T, 33, 3) array.
+        A 4th (visibility) channel is ignored: only x, y, z are returned.
+        With inplace=True a float array is normalized in its own buffer (no copy).
         """
-        Compute angle of right arm lift (shoulder-elbow-wrist)
-        """
-        a = points[self.KEYPOINTS['right_shoulder']]
-        b = points[self.KEYPOINTS['right_elbow']]
-        c = points[self.KEYPOINTS['right_wrist']]
-
-        ba = np.array(a) - np.array(b)
-        bc = np.array(c) - np.array(b)
-        cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-        cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
-        return np.degrees(np.arccos(cosine_angle))
-
-    def extract_arm_lift_angle(self, points):
-        "Extracts arm lift angles for both left and right sides"
-        features = {}
-
-        features['left_arm_lift_angle'] = self.left_arm_lift_angle(points)
-        features['right_arm_lift_angle'] = self.right_arm_lift_angle(points)
-
-        return features
-
-    # ===============================
-    # Side-view specific
-    # ===============================
-    def extract_side_motion_features(self, points):
-        """Side-view: dynamic pose depth and angles."""
-        features = {}
-        left_hip = points[self.KEYPOINTS['left_hip']]
-        left_knee = points[self.KEYPOINTS['left_knee']]
-        left_ankle = points[self.KEYPOINTS['left_ankle']]
-        left_shoulder = points[self.KEYPOINTS['left_shoulder']]
-
-        features['squat_depth'] = left_hip[1] - left_knee[1]
-        features['back_tilt_angle'] = self.angle_between_points(left_shoulder, left_hip, left_knee)
-        return features
-
-    def extract_side_arm_leg_angles(self, points):
-        """Side-view: elbow, knee, and hip angles."""
-        features = {}
-        features['knee_angle'] = self.angle_between_points(points[self.KEYPOINTS['left_hip']],
-                                                          points[self.KEYPOINTS['left_knee']],
-                                                          points[self.KEYPOINTS['left_ankle']])
-        features['elbow_angle'] = self.angle_between_points(points[self.KEYPOINTS['left_shoulder']],
-                                                           points[self.KEYPOINTS['left_elbow']],
-                                                           points[self.KEYPOINTS['left_wrist']])
-        features['hip_angle'] = self.angle_between_points(points[self.KEYPOINTS['left_shoulder']],
-                                                         points[self.KEYPOINTS['left_hip']],
-                                                         points[self.KEYPOINTS['left_knee']])
-        return features
-
+        points_sequence = np.asarray(points_sequence)[..., :3]
+        if points_sequence.dtype.kind != "f":
+            points_sequence = points_sequence.astype(np.float32)
+        elif not inplace:
+            points_sequence = points_sequence.copy()
+        left_hip = points_sequence[:, self.KEYPOINTS['left_hip']]
+        right_hip = points_sequence[:, self.KEYPOINTS['right_hip']]
+        center = self.midpoint(left_hip, right_hip)
+        scale = self.distance(left_hip, right_hip)
+        scale[scale == 0] = 1.0
+        points_sequence -= center[:, None, :]
+        points_sequence /= scale[:, None, None]
+        return points_sequence
 
     # ===============================
     # Camera view detection
     # ===============================
-    def detect_view(self, points):
+    def view_score(self, points):
         """
-        Auto-detects if pose is viewed from 'front' or 'side'.
+        Scalar front/side score for one normalized pose (lower = more frontal).
         Uses combination of shoulder/hip symmetry, torso angle, and leg X displacement.
         """
         left_shoulder = points[self.KEYPOINTS['left_shoulder']]
@@ -258,15 +110,93 @@ class FeatureExtractor:
         leg_dx = abs((left_knee[0] - right_knee[0]) - (left_hip[0] - right_hip[0]))
 
         # Combine scores
-        score = symmetry_score + abs(torso_angle_xy) + leg_dx
+        return symmetry_score + abs(torso_angle_xy) + leg_dx
+
+    def view_scores(self, normalized_sequence):
+        """Batched view_score for a normalized (T, 33, 3) array."""
+        P = np.asarray(normalized_sequence)
+        k = self.KEYPOINTS
+        ls, rs = P[:, k['left_shoulder']], P[:, k['right_shoulder']]
+        lh, rh = P[:, k['left_hip']], P[:, k['right_hip']]
+        lk, rk = P[:, k['left_knee']], P[:, k['right_knee']]
+
+        center_x = (lh[:, 0] + rh[:, 0]) / 2
+        shoulder_sym = np.abs(ls[:, 0] - (2 * center_x - rs[:, 0]))
+        hip_sym = np.abs(lh[:, 0] - (2 * center_x - rh[:, 0]))
+        torso_vec = self.midpoint(ls, rs) - self.midpoint(lh, rh)
+        torso_angle_xy = np.degrees(np.arctan2(torso_vec[:, 0], -torso_vec[:, 1]))
+        leg_dx = np.abs((lk[:, 0] - rk[:, 0]) - (lh[:, 0] - rh[:, 0]))
+        return (shoulder_sym + hip_sym) / 2 + np.abs(torso_angle_xy) + leg_dx
 
+    def detect_view(self, points):
+        """
+        Auto-detects if pose is viewed from 'front' or 'side'.
+        Single-frame decision, see detect_sequence_view for whole clips.
+        """
         # Threshold empirically (можно подстраивать)
-        if score < 0.15:
+        if self.view_score(points) < self.VIEW_THRESHOLD:
             return "front"
         else:
             return "side"
 
+    def detect_view_segments(self, points_sequence, sample_every=5, margin=0.03, min_segment=3):
+        """
+        Per-frame camera view for a sequence, decided on sampled frames with hysteresis.
+
+        The state only switches to 'front' below VIEW_THRESHOLD - margin and back to
+        'side' above VIEW_THRESHOLD + margin, so noisy frames around the threshold
+        do not flip the view. Runs shorter than `min_segment` samples are merged
+        into the preceding segment.
+
+        Args:
+            points_sequence: sequence of raw (33, 3) poses
+            sample_every: classify every Nth frame only
+            margin: half-width of the hysteresis band around VIEW_THRESHOLD
+            min_segment: minimal stable run length, in sampled frames
 
+        Returns:
+            list[str]: view label for every frame of the sequence
+        """
+        n_frames = len(points_sequence)
+        if n_frames == 0:
+            return []
+        sample_every = max(int(sample_every), 1)
+        sampled_idx = np.arange(0, n_frames, sample_every)
+
+        scores = self.view_scores(self.normalize_sequence(np.asarray(points_sequence)[sampled_idx]))
+
+        states = []
+        state = None
+        for score in scores:
+            if state is None:
+                state = "front" if score < self.VIEW_THRESHOLD else "side"
+            elif state == "side" and score < self.VIEW_THRESHOLD - margin:
+                state = "front"
+            elif state == "front" and score > self.VIEW_THRESHOLD + margin:
+                state = "side"
+            states.append(state)
+
+        # absorb short runs into the previous stable segment
+        for start in range(1, len(states)):
+            if states[start] == states[start - 1]:
+                continue
+            end = start
+            while end < len(states) and states[end] == states[start]:
+                end += 1
+            if end - start < min_segment and end < len(states):
+                states[start:end] = [states[start - 1]] * (end - start)
+
+        return [states[min(i // sample_every, len(states) - 1)] for i in range(n_frames)]
+
+    def detect_sequence_view(self, points_sequence, sample_every=5, margin=0.03):
+        """
+        Single camera view for a whole clip: majority vote over hysteresis states.
+        Computed once per clip, so every frame gets the same feature schema.
+        """
+        views = self.detect_view_segments(points_sequence, sample_every=sample_every, margin=margin)
+        if not views:
+            return "side"
+        return "front" if views.count("front") > len(views) / 2 else "side"
 
     # ===============================
     # Unified feature builder
@@ -278,27 +208,135 @@ class FeatureExtractor:
             points: list of 33 (x,y,z)
             view: 'front' or 'side'
         """
-        points = self.normalize_pose(points)
-        features = {}
-
         if view == "auto":
-            view = self.detect_view(points)
-
-        # universal features
-        features.update(self.extract_joint_angles(points))
-        features.update(self.extract_symmetry_features(points))
-        features.update(self.extract_posture_features(points))
-        features.update(self.extract_balance_features(points))
-        features.update(self.extract_arm_lift_angle(points))
-
+            view = self.detect_view(self.normalize_pose(points))
+        matrix, names = self.build_feature_matrix(np.asarray(points)[None], view=view)
+        features = dict(zip(names, matrix[0].tolist()))
+        return matrix[0], features
+
+    def feature_names(self, view="side"):
+        """Column names of build_feature_matrix (same order as build_feature_vector)."""
+        names = [
+            # universal
+            'left_knee', 'right_knee', 'left_elbow', 'right_elbow', 'torso',
+            'shoulder_width', 'hip_width', 'shoulders_hips_ratio', 'shoulder_tilt', 'hip_tilt',
+            'torso_angle_from_vertical',
+            'balance_x', 'balance_y',
+            'left_arm_lift_angle', 'right_arm_lift_angle',
+        ]
         if view == "front":
-            features.update(self.extract_front_symmetry_features(points))
-            features.update(self.extract_front_alignment_features(points))
+            names += ['shoulder_x_sym', 'knee_x_sym', 'hip_x_sym', 'shoulder_y_tilt', 'hip_y_tilt',
+                      'body_tilt_angle']
         elif view == "side":
-            features.update(self.extract_side_arm_leg_angles(points))
-            features.update(self.extract_side_motion_features(points))
+            names += ['knee_angle', 'elbow_angle', 'hip_angle', 'squat_depth', 'back_tilt_angle']
         else:
             raise ValueError("Invalid view type. Use 'front' or 'side' or 'auto'.")
+        return names
+
+    def build_feature_matrix(self, points_sequence, view="side", inplace=False):
+        """
+        Batched feature builder: all frames of a (T, 33, 3) array at once.
+        All angles of a frame are computed with one fused triplet kernel call and
+        written straight into a preallocated matrix of the input float dtype.
+
+        Args:
+            points_sequence: (T, 33, 3) array of raw poses, or (T, 33, 4) with visibility
+            view: 'front', 'side' or 'auto' (detected once for the whole sequence)
+            inplace: normalize the input buffer in place instead of copying it
+
+        Returns:
+            tuple[np.ndarray, list[str]]: (T, F) feature matrix and its column names
+        """
+        if view == "auto":
+            view = self.detect_sequence_view(points_sequence)
+        names = self.feature_names(view)
+
+        P = self.normalize_sequence(points_sequence, inplace=inplace)
+        k = self.KEYPOINTS
+        ls, rs = P[:, k['left_shoulder']], P[:, k['right_shoulder']]
+        lh, rh = P[:, k['left_hip']], P[:, k['right_hip']]
+        lk, rk = P[:, k['left_knee']], P[:, k['right_knee']]
+        la, ra = P[:, k['left_ankle']], P[:, k['right_ankle']]
+
+        ang = gk.triplet_angles(P, np.array([
+            (k['left_hip'], k['left_knee'], k['left_ankle']),             # left_knee / knee_angle
+            (k['right_hip'], k['right_knee'], k['right_ankle']),          # right_knee
+            (k['left_shoulder'], k['left_elbow'], k['left_wrist']),       # left_elbow / elbow_angle / arm lift
+            (k['right_shoulder'], k['right_elbow'], k['right_wrist']),    # right_elbow / arm lift
+            (k['left_shoulder'], k['left_hip'], k['left_knee']),          # hip_angle / back_tilt_angle
+        ]))
+        neck = self.midpoint(ls, rs)
+        mid_hip = self.midpoint(lh, rh)
+        torso = self.angle_between_points(neck, lh, lk)
+        torso_vertical = self.angle_between_points(neck, mid_hip, mid_hip + np.array([0, -1, 0], dtype=P.dtype))
+
+        out = np.empty((len(P), len(names)), dtype=P.dtype)
+        out[:, 0:4] = ang[:, 0:4]
+        out[:, 4] = torso
+        out[:, 5] = self.distance(ls, rs)
+        out[:, 6] = self.distance(lh, rh)
+        np.divide(out[:, 5], out[:, 6], out=out[:, 7], where=out[:, 6] > 0)
+        out[:, 7][out[:, 6] <= 0] = 0
+        out[:, 8] = np.abs(ls[:, 1] - rs[:, 1])
+        out[:, 9] = np.abs(lh[:, 1] - rh[:, 1])
+        out[:, 10] = torso_vertical
+        base_center = self.midpoint(la, ra)
+        out[:, 11] = np.abs(base_center[:, 0] - mid_hip[:, 0])
+        out[:, 12] = np.abs(base_center[:, 1] - mid_hip[:, 1])
+        out[:, 13:15] = ang[:, 2:4]
 
-        feature_vector = np.array([v for k, v in features.items() if k != 'detected_view'])
-        return feature_vector, features
+        if view == "front":
+            center_x = mid_hip[:, 0]
+            out[:, 15] = np.abs(ls[:, 0] - (2 * center_x - rs[:, 0]))
+            out[:, 16] = np.abs(lk[:, 0] - (2 * center_x - rk[:, 0]))
+            out[:, 17] = np.abs(lh[:, 0] - (2 * center_x - rh[:, 0]))
+            out[:, 18] = out[:, 8]
+            out[:, 19] = out[:, 9]
+            out[:, 20] = torso_vertical
+        else:
+            out[:, 15] = ang[:, 0]
+            out[:, 16] = ang[:, 2]
+            out[:, 17] = ang[:, 4]
+            out[:, 18] = lh[:, 1] - lk[:, 1]
+            out[:, 19] = ang[:, 4]
+
+        return out, names
+
+    def joint_confidence(self, points_sequence, joints):
+        """
+        Per-frame confidence that the given joints are visible: the minimum over
+        `joints` of the landmark visibility (4th channel). A bare name like "knee"
+        stands for the better-visible side (left_knee / right_knee), so a side-view
+        frame with the far limb occluded still counts.
+
+        Returns:
+            np.ndarray: (T,) confidences in [0, 1] (ones without a visibility channel)
+        """
+        points_sequence = np.asarray(points_sequence)
+        if points_sequence.shape[-1] < 4 or not joints:
+            return np.ones(len(points_sequence), dtype=np.float32)
+        visibility = points_sequence[..., 3]
+        per_joint = []
+        for joint in joints:
+            if joint in self.KEYPOINTS:
+                per_joint.append(visibility[:, self.KEYPOINTS[joint]])
+            else:
+                per_joint.append(np.maximum(visibility[:, self.KEYPOINTS[f"left_{joint}"]],
+                                            visibility[:, self.KEYPOINTS[f"right_{joint}"]]))
+        return np.min(per_joint, axis=0)
+
+    @staticmethod
+    def rows_to_dicts(matrix, names):
+        """Per-frame feature dicts (plain Python floats) from a feature matrix."""
+        return [dict(zip(names, row)) for row in matrix.tolist()]
+
+    def build_feature_sequence(self, points_sequence, view="auto"):
+        """
+        Builds feature dicts for a whole sequence with one camera view.
+        With view='auto' the view is detected once per clip (detect_sequence_view)
+        instead of per frame, so all dicts share the same keys.
+        """
+        if len(points_sequence) == 0:
+            return []
+        matrix, names = self.build_feature_matrix(np.asarray(points_sequence), view=view)
+        return self.rows_to_dicts(matrix, names)
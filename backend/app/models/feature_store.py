@@ -0,0 +1,139 @@
+"""
+Versioned, memory-mappable store of labelled feature matrices.
+
+A store is a directory with a schema.json and one .npy file per pose label:
+
+    schema.json       {"format_version", "extractor_version", "view", "feature_names",
+                       "dtype", "layout", "poses": {label: {"file", "rows", "exercise"}}}
+    squats_down.npy   (rows, F) float32, column-major
+
+The schema names every column, so consumers select columns by name and can check
+that the store was built by the extractor version and view they expect. Matrices
+are stored column-major and opened with np.load(mmap_mode="r"), so reading a few
+columns of a few poses touches only those pages. Nothing is unpickled.
+"""
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+SCHEMA_FILE = "schema.json"
+
+
+class FeatureStore:
+    """Read / append access to one store directory (one camera view, one feature schema)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, SCHEMA_FILE)) as f:
+            self.schema = json.load(f)
+        if self.schema.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store format {self.schema.get('format_version')} in {path}")
+        self.names = list(self.schema["feature_names"])
+
+    @classmethod
+    def create(cls, path, feature_names, view, extractor_version, dtype="float32"):
+        """
+        Creates an empty store. An existing store in `path` is reset: its schema and
+        all its .npy matrices are deleted, so no column files of an earlier schema stay.
+
+        Raises:
+            ValueError: `path` is a non-empty directory that is not a feature store
+        """
+        os.makedirs(path, exist_ok=True)
+        entries = os.listdir(path)
+        if entries and SCHEMA_FILE not in entries:
+            raise ValueError(f"{path} is not empty and not a feature store; refusing to create one there")
+        for name in entries:
+            if name == SCHEMA_FILE or name.endswith((".npy", ".npy.tmp")):
+                os.remove(os.path.join(path, name))
+        schema = {
+            "format_version": FORMAT_VERSION,
+            "extractor_version": str(extractor_version),
+            "view": view,
+            "feature_names": list(feature_names),
+            "dtype": dtype,
+            "layout": "column_major",
+            "poses": {},
+        }
+        _write_json(os.path.join(path, SCHEMA_FILE), schema)
+        return cls(path)
+
+    @property
+    def view(self):
+        return self.schema["view"]
+
+    @property
+    def extractor_version(self):
+        return self.schema["extractor_version"]
+
+    @property
+    def poses(self):
+        return list(self.schema["poses"])
+
+    def rows(self, pose=None):
+        """Rows of one pose (all poses by default)."""
+        poses = self.schema["poses"]
+        if pose is not None:
+            return poses[pose]["rows"]
+        return sum(p["rows"] for p in poses.values())
+
+    def exercise(self, pose):
+        return self.schema["poses"][pose].get("exercise")
+
+    def require(self, extractor_version=None, view=None, names=None):
+        """
+        Raises:
+            ValueError: the store does not match the expected extractor version, view or columns
+        """
+        if extractor_version is not None and self.extractor_version != str(extractor_version):
+            raise ValueError(f"Feature store {self.path} was built by extractor version "
+                             f"{self.extractor_version}, expected {extractor_version}")
+        if view is not None and self.view != view:
+            raise ValueError(f"Feature store {self.path} holds {self.view}-view features, expected {view}")
+        if names is not None:
+            missing = [n for n in names if n not in self.names]
+            if missing:
+                raise ValueError(f"Feature store {self.path} lacks columns: {', '.join(missing)}")
+        return self
+
+    def column_indices(self, names):
+        return [self.names.index(n) for n in names]
+
+    def add(self, pose, matrix, exercise=None):
+        """Writes (or replaces) the matrix of one pose label."""
+        matrix = np.asarray(matrix, dtype=self.schema["dtype"])
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.names):
+            raise ValueError(f"Expected a (N, {len(self.names)}) matrix for {pose}, got {matrix.shape}")
+        filename = f"{pose}.npy"
+        tmp = os.path.join(self.path, f".{filename}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.asfortranarray(matrix))
+        os.replace(tmp, os.path.join(self.path, filename))
+        self.schema["poses"][pose] = {"file": filename, "rows": int(len(matrix)), "exercise": exercise}
+        _write_json(os.path.join(self.path, SCHEMA_FILE), self.schema)
+
+    def load(self, pose, columns=None):
+        """
+        (rows, F) read-only memory map of a pose, or (rows, len(columns)) with the
+        named columns only (a copy of just those columns).
+        """
+        matrix = np.load(os.path.join(self.path, self.schema["poses"][pose]["file"]), mmap_mode="r")
+        if columns is None:
+            return matrix
+        return np.stack([matrix[:, j] for j in self.column_indices(columns)], axis=1)
+
+    def iter_chunks(self, poses=None, columns=None, chunk_rows=65536):
+        """Yields (pose, chunk) row chunks of the selected poses and columns."""
+        for pose in poses or self.poses:
+            matrix = self.load(pose, columns)
+            for start in range(0, len(matrix), chunk_rows):
+                yield pose, matrix[start:start + chunk_rows]
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
@@ -0,0 +1,151 @@
+"""
+Fused geometric kernels for pose features.
+
+Every routine works on batches: points are (..., 3) arrays and results keep the
+leading shape. A pure-NumPy implementation is always available; if `numba` is
+installed, JIT-compiled loops are picked at import time (set
+GEOMETRY_BACKEND=numpy to force the NumPy path).
+"""
+import os
+import numpy as np
+
+try:
+    if os.environ.get("GEOMETRY_BACKEND", "auto") == "numpy":
+        raise ImportError("numba disabled by GEOMETRY_BACKEND")
+    from numba import njit
+except ImportError:
+    njit = None
+
+BACKEND = "numba" if njit is not None else "numpy"
+
+
+# ===============================
+# Pure NumPy implementation
+# ===============================
+def _dot(u, v):
+    return np.einsum("...i,...i->...", u, v)
+
+
+def _angles_numpy(a, b, c):
+    ba = a - b
+    bc = c - b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = _dot(ba, bc) / np.sqrt(_dot(ba, ba) * _dot(bc, bc))
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def _triplet_angles_numpy(points, triplets):
+    return _angles_numpy(points[..., triplets[:, 0], :],
+                         points[..., triplets[:, 1], :],
+                         points[..., triplets[:, 2], :])
+
+
+def _distances_numpy(p1, p2):
+    d = p1 - p2
+    return np.sqrt(_dot(d, d))
+
+
+# ===============================
+# Numba implementation
+# ===============================
+if njit is not None:
+    @njit(cache=True, error_model="numpy")
+    def _angles_jit(a, b, c):
+        n = a.shape[0]
+        out = np.empty(n, dtype=a.dtype)
+        for i in range(n):
+            dot = 0.0
+            nba = 0.0
+            nbc = 0.0
+            for j in range(3):
+                ba = a[i, j] - b[i, j]
+                bc = c[i, j] - b[i, j]
+                dot += ba * bc
+                nba += ba * ba
+                nbc += bc * bc
+            cosine = min(max(dot / np.sqrt(nba * nbc), -1.0), 1.0)
+            out[i] = np.degrees(np.arccos(cosine))
+        return out
+
+    @njit(cache=True, error_model="numpy")
+    def _triplet_angles_jit(points, triplets):
+        n_frames = points.shape[0]
+        n_triplets = triplets.shape[0]
+        out = np.empty((n_frames, n_triplets), dtype=points.dtype)
+        for t in range(n_frames):
+            for k in range(n_triplets):
+                ia, ib, ic = triplets[k, 0], triplets[k, 1], triplets[k, 2]
+                dot = 0.0
+                nba = 0.0
+                nbc = 0.0
+                for j in range(3):
+                    ba = points[t, ia, j] - points[t, ib, j]
+                    bc = points[t, ic, j] - points[t, ib, j]
+                    dot += ba * bc
+                    nba += ba * ba
+                    nbc += bc * bc
+                cosine = min(max(dot / np.sqrt(nba * nbc), -1.0), 1.0)
+                out[t, k] = np.degrees(np.arccos(cosine))
+        return out
+
+    @njit(cache=True)
+    def _distances_jit(p1, p2):
+        n = p1.shape[0]
+        out = np.empty(n, dtype=p1.dtype)
+        for i in range(n):
+            s = 0.0
+            for j in range(3):
+                d = p1[i, j] - p2[i, j]
+                s += d * d
+            out[i] = np.sqrt(s)
+        return out
+
+
+def _as_rows(*arrays):
+    """Broadcast (..., 3) inputs and flatten them to contiguous (N, 3) rows."""
+    arrays = [np.asarray(x) for x in arrays]
+    arrays = np.broadcast_arrays(*[x.astype(np.result_type(x.dtype, np.float32), copy=False) for x in arrays])
+    shape = arrays[0].shape[:-1]
+    return shape, [np.ascontiguousarray(x).reshape(-1, 3) for x in arrays]
+
+
+# ===============================
+# Public API
+# ===============================
+def angles(a, b, c):
+    """Angle (degrees) at b for a-b-c; a, b, c are broadcastable (..., 3) arrays."""
+    if njit is None:
+        return _angles_numpy(np.asarray(a), np.asarray(b), np.asarray(c))
+    shape, (a, b, c) = _as_rows(a, b, c)
+    return _angles_jit(a, b, c).reshape(shape)[()]
+
+
+def triplet_angles(points, triplets):
+    """
+    Angles for many (a, b, c) index triplets at once.
+
+    Args:
+        points: (T, N, 3) array of poses
+        triplets: (K, 3) int array of point indices, angle is taken at the middle one
+
+    Returns:
+        np.ndarray: (T, K) angles in degrees
+    """
+    points = np.asarray(points)
+    triplets = np.asarray(triplets, dtype=np.intp)
+    if njit is None:
+        return _triplet_angles_numpy(points, triplets)
+    return _triplet_angles_jit(np.ascontiguousarray(points), triplets)
+
+
+def distances(p1, p2):
+    """Euclidean distance between broadcastable (..., 3) point arrays."""
+    if njit is None:
+        return _distances_numpy(np.asarray(p1), np.asarray(p2))
+    shape, (p1, p2) = _as_rows(p1, p2)
+    return _distances_jit(p1, p2).reshape(shape)[()]
+
+
+def midpoints(p1, p2):
+    """Midpoint of broadcastable (..., 3) point arrays."""
+    return (np.asarray(p1) + np.asarray(p2)) * 0.5
@@ -0,0 +1,119 @@
+"""
+k-nearest-neighbour index of labelled reference poses (dataset frames).
+
+Reference feature vectors are stored per camera view, standardized with the
+view's own mean / scale, and searched with one KD-tree per (view, exercise)
+plus one over all exercises of the view. A batched query returns, for every
+frame, the closest reference pose and the features that deviate from it the
+most. That turns a score into a concrete correction.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+VIEWS = ("side", "front")
+
+
+class ReferencePoseIndex:
+    """Standardized reference poses of both camera views with their KD-trees."""
+
+    def __init__(self, views):
+        """
+        Args:
+            views: {view: {"vectors": (N, F), "labels": (N,) pose labels such as
+                   "squats_down", "exercises": (N,) exercise keys, "names": (F,) feature names}}
+        """
+        self.views = {}
+        for view, data in views.items():
+            vectors = np.asarray(data["vectors"], dtype=np.float64)
+            mean = vectors.mean(axis=0)
+            scale = vectors.std(axis=0)
+            scale[scale == 0] = 1.0
+            exercises = np.asarray(data["exercises"]).astype(str)
+            entry = {
+                "vectors": vectors.astype(np.float32),
+                "labels": np.asarray(data["labels"]).astype(str),
+                "exercises": exercises,
+                "names": [str(n) for n in data["names"]],
+                "mean": mean,
+                "scale": scale,
+            }
+            standardized = (vectors - mean) / scale
+            # one tree over the whole view and one per exercise (rows of that exercise)
+            entry["trees"] = {None: (cKDTree(standardized), np.arange(len(vectors)))}
+            for exercise in np.unique(exercises):
+                rows = np.flatnonzero(exercises == exercise)
+                entry["trees"][str(exercise)] = (cKDTree(standardized[rows]), rows)
+            self.views[view] = entry
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            views = {}
+            for view in VIEWS:
+                if f"{view}_vectors" in data:
+                    views[view] = {key: data[f"{view}_{key}"] for key in ("vectors", "labels", "exercises", "names")}
+        return cls(views)
+
+    def save(self, path):
+        arrays = {}
+        for view, entry in self.views.items():
+            arrays[f"{view}_vectors"] = entry["vectors"]
+            arrays[f"{view}_labels"] = entry["labels"]
+            arrays[f"{view}_exercises"] = entry["exercises"]
+            arrays[f"{view}_names"] = np.asarray(entry["names"])
+        np.savez_compressed(path, **arrays)
+
+    def _standardize(self, entry, matrix, names):
+        """(T, F) query rows in the index column order, standardized like the references."""
+        columns = [names.index(n) for n in entry["names"]]
+        rows = np.nan_to_num(np.asarray(matrix, dtype=np.float64)[:, columns])
+        return rows, (rows - entry["mean"]) / entry["scale"]
+
+    def query(self, matrix, names, view, exercise=None, k=1):
+        """
+        Batched k-NN search of feature rows.
+
+        Args:
+            matrix: (T, F) feature matrix (extra columns such as temporal ones are ignored)
+            names: its column names
+            view: camera view the matrix was built with
+            exercise: restrict the search to references of this exercise (None = all)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray] | None: (T, k) standardized distances and
+            (T, k) reference row indices; None if the index lacks this view / exercise
+        """
+        entry = self.views.get(view)
+        if entry is None or exercise not in entry["trees"]:
+            return None
+        tree, rows = entry["trees"][exercise]
+        _, standardized = self._standardize(entry, matrix, names)
+        distances, idx = tree.query(standardized, k=min(k, len(rows)))
+        distances, idx = distances.reshape(len(standardized), -1), idx.reshape(len(standardized), -1)
+        return distances, rows[idx]
+
+    def corrections(self, matrix, names, view, exercise, top=3):
+        """
+        Closest reference pose of `exercise` for every row and its largest deviations.
+
+        Returns:
+            list[dict] | None: per row {"reference", "distance", "deltas": [{"feature", "delta"}]},
+            deltas in feature units (degrees for angles), sorted by standardized size
+        """
+        found = self.query(matrix, names, view, exercise=exercise, k=1)
+        if found is None:
+            return None
+        distances, nearest = found[0][:, 0], found[1][:, 0]
+        entry = self.views[view]
+        rows, _ = self._standardize(entry, matrix, names)
+        deltas = rows - entry["vectors"][nearest]
+        order = np.argsort(-np.abs(deltas / entry["scale"]), axis=1)[:, :top]
+        out = []
+        for i, ref in enumerate(nearest):
+            out.append({
+                "reference": str(entry["labels"][ref]),
+                "distance": round(float(distances[i]), 2),
+                "deltas": [{"feature": entry["names"][j], "delta": round(float(deltas[i, j]), 1)}
+                           for j in order[i]],
+            })
+        return out
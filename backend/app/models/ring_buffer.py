@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO of rows (frames) with zero-copy views of the newest rows.
+
+    Every row is stored twice, at `i` and `i + capacity`, so the last n rows are
+    always one contiguous slice of the backing array, whatever the write position.
+    Memory stays 2 * capacity rows for sessions of any length.
+    """
+
+    def __init__(self, capacity, row_shape=(), dtype=np.float32):
+        self.capacity = max(int(capacity), 1)
+        self._data = np.zeros((2 * self.capacity,) + tuple(row_shape), dtype=dtype)
+        self._head = 0    # next write position in [0, capacity)
+        self.total = 0    # rows appended since creation
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def first_index(self):
+        """Absolute index (counted since creation) of the oldest row still held."""
+        return self.total - len(self)
+
+    def extend(self, rows):
+        """Appends rows (n, *row_shape); only the newest `capacity` are kept."""
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        n = len(rows)
+        if n == 0:
+            return
+        self.total += n
+        if n > self.capacity:
+            self._head = (self._head + n - self.capacity) % self.capacity
+            rows = rows[-self.capacity:]
+            n = self.capacity
+        pos = (self._head + np.arange(n)) % self.capacity
+        self._data[pos] = rows
+        self._data[pos + self.capacity] = rows
+        self._head = (self._head + n) % self.capacity
+
+    def append(self, row):
+        self.extend(np.asarray(row, dtype=self._data.dtype)[None])
+
+    def last(self, n=None):
+        """
+        Contiguous view of the newest `n` rows (all held rows by default), oldest first.
+        The view is overwritten by later writes; copy it to keep it.
+        """
+        size = len(self)
+        n = size if n is None else min(int(n), size)
+        start = (self._head - n) % self.capacity
+        return self._data[start:start + n]
+
+    def clear(self):
+        self._head = 0
+        self.total = 0
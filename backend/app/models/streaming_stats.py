@@ -0,0 +1,210 @@
+"""
+Single-pass, mergeable per-feature statistics of (N, F) feature chunks.
+
+RunningStats keeps count, mean / variance (Welford, combined chunk-wise with
+Chan's parallel update), min / max and a quantile sketch of every column. Memory
+does not depend on the number of rows, so a scaler can be fitted over feature
+stores far larger than RAM. Statistics of separate shards merge into the same
+result as one pass over all rows (quantiles within the sketch's error).
+
+QuantileSketch is a KLL-style sketch: a stack of compactors where level h holds
+items of weight 2**h. All features are compacted together (one shared sort order
+per column, one shared random offset), so it is vectorized over columns.
+"""
+import numpy as np
+
+
+class QuantileSketch:
+    """Mergeable approximate quantiles of every column of (N, F) chunks."""
+
+    def __init__(self, n_features, k=200, seed=0):
+        """
+        Args:
+            n_features: number of columns
+            k: capacity of the top compactor (rank error ~ 1/k)
+        """
+        self.n_features = n_features
+        self.k = k
+        self.levels = [np.empty((0, n_features))]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64).reshape(-1, self.n_features)
+        self.levels[0] = np.concatenate([self.levels[0], chunk])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty((0, self.n_features)))
+                items = np.sort(items, axis=0)
+                # an odd item out stays on this level
+                n = len(items) - len(items) % 2
+                promoted = items[self._rng.integers(2):n:2]
+                self.levels[level] = items[n:]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty((0, self.n_features)))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """(len(qs), F) approximate quantiles (NaN before any update)."""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        values = np.concatenate(self.levels)
+        if len(values) == 0:
+            return np.full((len(qs), self.n_features), np.nan)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        cum = np.cumsum(weights[order], axis=0)                     # (M, F)
+        targets = qs[:, None] * cum[-1][None, :]                    # (Q, F)
+        idx = np.empty((len(qs), self.n_features), dtype=np.int64)
+        for j in range(self.n_features):
+            idx[:, j] = np.searchsorted(cum[:, j], targets[:, j])
+        idx = np.minimum(idx, len(values) - 1)
+        return np.take_along_axis(sorted_values, idx, axis=0)
+
+    def state(self, prefix="sketch"):
+        out = {f"{prefix}_k": np.int64(self.k), f"{prefix}_levels": np.int64(len(self.levels))}
+        for h, items in enumerate(self.levels):
+            out[f"{prefix}_level_{h}"] = items
+        return out
+
+    @classmethod
+    def from_state(cls, state, n_features, prefix="sketch"):
+        sketch = cls(n_features, k=int(state[f"{prefix}_k"]))
+        sketch.levels = [np.asarray(state[f"{prefix}_level_{h}"], dtype=np.float64)
+                         for h in range(int(state[f"{prefix}_levels"]))]
+        return sketch
+
+
+class RunningStats:
+    """Count, mean, variance, min, max and quantiles of every feature column."""
+
+    def __init__(self, n_features, names=None, sketch_k=200):
+        self.n_features = n_features
+        self.names = list(names) if names is not None else None
+        self.count = 0
+        self.skipped = 0          # rows with non-finite values
+        self.mean = np.zeros(n_features)
+        self._m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self.sketch = QuantileSketch(n_features, k=sketch_k) if sketch_k else None
+
+    def update(self, chunk):
+        """Adds the finite rows of an (N, F) chunk (e.g. a memory-mapped slice)."""
+        chunk = np.asarray(chunk, dtype=np.float64).reshape(-1, self.n_features)
+        finite = np.isfinite(chunk).all(axis=1)
+        if not finite.all():
+            self.skipped += int((~finite).sum())
+            chunk = chunk[finite]
+        n = len(chunk)
+        if n == 0:
+            return self
+        chunk_mean = chunk.mean(axis=0)
+        centered = chunk - chunk_mean
+        self._combine(n, chunk_mean, np.einsum("ij,ij->j", centered, centered))
+        np.minimum(self.min, chunk.min(axis=0), out=self.min)
+        np.maximum(self.max, chunk.max(axis=0), out=self.max)
+        if self.sketch is not None:
+            self.sketch.update(chunk)
+        return self
+
+    def _combine(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self._m2 = self._m2 + m2 + delta * delta * (self.count * n / total)
+        self.count = total
+
+    def merge(self, other):
+        """
+        Folds the statistics of another shard into this one.
+
+        Raises:
+            ValueError: the shards have different widths, or both are named and their
+                        columns differ (other names or another order)
+        """
+        if other.n_features != self.n_features:
+            raise ValueError(f"Cannot merge stats of {other.n_features} features into {self.n_features}")
+        if self.names is not None and other.names is not None and list(other.names) != list(self.names):
+            differ = [f"{a} != {b}" for a, b in zip(self.names, other.names) if a != b]
+            raise ValueError(f"Cannot merge stats of different feature columns ({', '.join(differ[:3])})")
+        if self.names is None and other.names is not None:
+            self.names = list(other.names)
+        self.skipped += other.skipped
+        if other.count:
+            self._combine(other.count, other.mean, other._m2)
+            np.minimum(self.min, other.min, out=self.min)
+            np.maximum(self.max, other.max, out=self.max)
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+
+    def variance(self, ddof=0):
+        if self.count - ddof <= 0:
+            return np.full(self.n_features, np.nan)
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.variance(ddof))
+
+    def quantiles(self, qs):
+        if self.sketch is None:
+            raise ValueError("Quantiles need a sketch (sketch_k > 0)")
+        return self.sketch.quantiles(qs)
+
+    def scaler(self):
+        """
+        Standardization parameters {"mean", "scale"}, with the same convention as
+        sklearn's StandardScaler (population std, 1 for constant columns).
+        """
+        scale = self.std()
+        scale[~(scale > 0)] = 1.0
+        return {"mean": self.mean.astype(np.float32), "scale": scale.astype(np.float32)}
+
+    def save_scaler(self, path, quantiles=(0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)):
+        """Writes feature_scaler.npz (mean, scale) plus names, count, min / max and quantiles."""
+        arrays = dict(self.scaler(), count=np.int64(self.count), min=self.min, max=self.max)
+        if self.names is not None:
+            arrays["names"] = np.asarray(self.names)
+        if self.sketch is not None and quantiles:
+            arrays["quantile_levels"] = np.asarray(quantiles)
+            arrays["quantiles"] = self.quantiles(quantiles)
+        np.savez(path, **arrays)
+
+    def save(self, path):
+        """Writes the full (mergeable) state of this shard."""
+        state = {"count": np.int64(self.count), "skipped": np.int64(self.skipped), "mean": self.mean,
+                 "m2": self._m2, "min": self.min, "max": self.max}
+        if self.names is not None:
+            state["names"] = np.asarray(self.names)
+        if self.sketch is not None:
+            state.update(self.sketch.state())
+        np.savez(path, **state)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state:
+            mean = state["mean"]
+            stats = cls(len(mean), names=state["names"].tolist() if "names" in state else None, sketch_k=0)
+            stats.count, stats.skipped = int(state["count"]), int(state["skipped"])
+            stats.mean, stats._m2 = mean.astype(np.float64), state["m2"].astype(np.float64)
+            stats.min, stats.max = state["min"].astype(np.float64), state["max"].astype(np.float64)
+            if "sketch_k" in state:
+                stats.sketch = QuantileSketch.from_state(state, len(mean))
+        return stats
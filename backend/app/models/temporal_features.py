@@ -0,0 +1,189 @@
+import numpy as np
+from scipy.signal import find_peaks
+
+
+class TemporalFeatureExtractor:
+    """
+    Sequence-level features computed in bulk from per-frame angle columns:
+    angular velocity/acceleration, rep segmentation, eccentric/concentric tempo
+    and time-under-tension. Everything is vectorized over time (O(T)).
+    """
+
+    # per-frame angle features that get velocity / acceleration columns
+    ANGLE_KEYS = (
+        "left_knee", "right_knee", "left_elbow", "right_elbow", "torso",
+        "torso_angle_from_vertical", "left_arm_lift_angle", "right_arm_lift_angle",
+        "knee_angle", "elbow_angle", "hip_angle", "back_tilt_angle", "body_tilt_angle",
+    )
+
+    def __init__(self, fps=30.0, smooth_window=5, min_rep_amplitude=20.0, still_velocity=10.0):
+        """
+        Args:
+            fps: frame rate used when no timestamps are given
+            smooth_window: rolling-mean window (frames) applied to velocities
+            min_rep_amplitude: minimal angle excursion (degrees) counted as a rep
+            still_velocity: |velocity| (deg/s) below which the joint is considered paused
+        """
+        self.fps = fps
+        self.smooth_window = smooth_window
+        self.min_rep_amplitude = min_rep_amplitude
+        self.still_velocity = still_velocity
+
+    # ===============================
+    # Columnar helpers
+    # ===============================
+    @staticmethod
+    def feature_columns(feature_sequence, keys=None):
+        """Turns a list of feature dicts into {key: (T,) float array}."""
+        if not feature_sequence:
+            return {}
+        keys = keys or [k for k in feature_sequence[0] if k in TemporalFeatureExtractor.ANGLE_KEYS]
+        return {k: np.array([f.get(k, np.nan) for f in feature_sequence], dtype=np.float64) for k in keys}
+
+    def timestamps(self, n_frames, timestamps=None):
+        if timestamps is not None:
+            return np.asarray(timestamps, dtype=np.float64)
+        return np.arange(n_frames, dtype=np.float64) / self.fps
+
+    @staticmethod
+    def rolling_mean(values, window):
+        """Centered rolling mean along axis 0 via cumulative sums (edges use shorter windows)."""
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if window <= 1 or n == 0:
+            return values
+        half = window // 2
+        csum = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+        idx = np.arange(n)
+        lo = np.clip(idx - half, 0, n)
+        hi = np.clip(idx + half + 1, 0, n)
+        counts = (hi - lo).reshape((-1,) + (1,) * (values.ndim - 1))
+        return (csum[hi] - csum[lo]) / counts
+
+    # ===============================
+    # Kinematics
+    # ===============================
+    def kinematics(self, angles, timestamps=None):
+        """
+        Angular velocity and acceleration of (T,) or (T, K) angle columns.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: velocity (deg/s) and acceleration (deg/s^2)
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        if len(angles) < 2:
+            zeros = np.zeros_like(angles)
+            return zeros, zeros
+        t = self.timestamps(len(angles), timestamps)
+        velocity = self.rolling_mean(np.gradient(angles, t, axis=0), self.smooth_window)
+        acceleration = np.gradient(velocity, t, axis=0)
+        return velocity, acceleration
+
+    def compute(self, columns, timestamps=None):
+        """
+        Velocity / acceleration columns for every angle column.
+
+        Args:
+            columns: {name: (T,) array}, e.g. from feature_columns
+            timestamps: optional (T,) frame times in seconds (non-uniform is fine)
+
+        Returns:
+            dict: {f"{name}_velocity": (T,), f"{name}_acceleration": (T,)}
+        """
+        names = [k for k in columns if k in self.ANGLE_KEYS]
+        if not names:
+            return {}
+        angles = np.column_stack([columns[k] for k in names])
+        velocity, acceleration = self.kinematics(angles, timestamps)
+        out = {}
+        for i, name in enumerate(names):
+            out[f"{name}_velocity"] = velocity[:, i]
+            out[f"{name}_acceleration"] = acceleration[:, i]
+        return out
+
+    def extend_matrix(self, matrix, names, timestamps=None):
+        """
+        Appends velocity / acceleration columns to a (T, F) feature matrix.
+
+        Returns:
+            tuple[np.ndarray, list[str]]: (T, F + 2K) matrix in the input dtype and its names
+        """
+        temporal = self.compute(dict(zip(names, np.asarray(matrix).T)), timestamps)
+        if not temporal:
+            return matrix, list(names)
+        out = np.empty((len(matrix), len(names) + len(temporal)), dtype=matrix.dtype)
+        out[:, :len(names)] = matrix
+        for i, column in enumerate(temporal.values(), start=len(names)):
+            out[:, i] = column
+        return out, list(names) + list(temporal)
+
+    # ===============================
+    # Reps and tempo
+    # ===============================
+    def segment_reps(self, signal):
+        """
+        Splits a primary-angle signal into reps: extended -> flexed -> extended.
+
+        Returns:
+            np.ndarray: int array (R, 3) with (start, bottom, end) frame indices
+        """
+        signal = np.asarray(signal, dtype=np.float64)
+        if signal.size < 3 or np.all(np.isnan(signal)):
+            return np.zeros((0, 3), dtype=int)
+        signal = np.where(np.isnan(signal), np.nanmean(signal), signal)
+
+        # pad with the minimum so a clip that starts/ends extended still yields edge tops
+        low = signal.min()
+        tops, _ = find_peaks(np.concatenate([[low], signal, [low]]), prominence=self.min_rep_amplitude)
+        tops = tops - 1
+        bottoms, _ = find_peaks(-signal, prominence=self.min_rep_amplitude)
+        if len(tops) < 2 or len(bottoms) == 0:
+            return np.zeros((0, 3), dtype=int)
+
+        # first bottom after every top; keep pairs where it comes before the next top
+        j = np.searchsorted(bottoms, tops[:-1])
+        ok = j < len(bottoms)
+        starts, ends, j = tops[:-1][ok], tops[1:][ok], j[ok]
+        mids = bottoms[j]
+        keep = mids < ends
+        return np.column_stack([starts[keep], mids[keep], ends[keep]])
+
+    def tempo(self, signal, timestamps=None, eccentric_sign=-1):
+        """
+        Eccentric/concentric tempo and time-under-tension of a primary-angle signal.
+
+        Args:
+            signal: (T,) primary joint angle
+            timestamps: optional (T,) frame times in seconds
+            eccentric_sign: -1 if the angle decreases during the eccentric (lowering)
+                            phase (squat, push-up), +1 if it increases (pull-up)
+
+        Returns:
+            dict: reps, mean eccentric / concentric durations and total time under tension (s)
+        """
+        signal = np.asarray(signal, dtype=np.float64)
+        reps = self.segment_reps(signal)
+        if len(reps) == 0:
+            return {"reps": 0, "eccentric_s": None, "concentric_s": None, "time_under_tension_s": 0.0}
+
+        t = self.timestamps(len(signal), timestamps)
+        first_half = t[reps[:, 1]] - t[reps[:, 0]]
+        second_half = t[reps[:, 2]] - t[reps[:, 1]]
+        # reps start at the angle maximum, so the first half is where the angle decreases
+        eccentric, concentric = (first_half, second_half) if eccentric_sign < 0 else (second_half, first_half)
+
+        # time under tension: moving (not paused) time inside reps
+        velocity, _ = self.kinematics(signal, t)
+        marks = np.zeros(len(signal) + 1)
+        np.add.at(marks, reps[:, 0], 1)
+        np.add.at(marks, reps[:, 2], -1)
+        inside = np.cumsum(marks)[:-1] > 0
+        moving = (np.abs(velocity) > self.still_velocity) & inside
+        tut = float(np.sum(np.diff(t) * moving[:-1]))
+
+        return {
+            "reps": int(len(reps)),
+            "eccentric_s": round(float(np.mean(eccentric)), 2),
+            "concentric_s": round(float(np.mean(concentric)), 2),
+            "time_under_tension_s": round(tut, 2),
+        }
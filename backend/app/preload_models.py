@@ -1,6 +1,9 @@
 import mediapipe as mp
 
-mp.solutions.pose.Pose(
-    static_image_mode=False,
-    model_complexity=2,
-)
\ No newline at end of file
+# Instantiate every model complexity once (lite / full / heavy, one per quality tier)
+# so the model files are downloaded into the image at build time
+for model_complexity in (0, 1, 2):
+    mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=model_complexity,
+    ).close()
@@ -0,0 +1,35 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from config import settings
+from services import profiler
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Checks X-Admin-Token; the admin routes are disabled unless ADMIN_TOKEN is configured."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin routes are disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+def list_profiles():
+    """Stored profiles of slow assessment requests (newest first)."""
+    return {
+        "enabled": settings.profile_enabled,
+        "sample_rate": settings.profile_sample_rate,
+        "min_seconds": settings.profile_min_seconds,
+        "profiles": profiler.list_profiles(),
+    }
+
+@router.get("/profiles/{name}")
+def get_profile(name: str):
+    """Downloads one profile in the folded-stacks format (flamegraph.pl / speedscope)."""
+    path = profiler.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -1,6 +1,86 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from services.assessment_service import AssessmentService
+import asyncio
+import json
+import os
+import threading
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from config import settings
+from services import lifecycle
+from services.metrics import BATCH_CLIPS, LIVE_SESSIONS, QUEUE_DEPTH, REQUESTS
+from services.profiler import maybe_profile
+from services.quality import resolve_tier
+
+
+def _get_service():
+    # heavy pipeline import is deferred to the first request / warmup hook
+    from services.assessment_service import get_assessment_service
+
+    return get_assessment_service()
+
+
+def _run_assessment(file, exercise_type, quality=None, profile=False):
+    """Runs the blocking pipeline (on a threadpool thread, so the event loop stays free)."""
+    service = _get_service()
+    with maybe_profile(f"{exercise_type or 'auto'}_{file.filename}", requested=profile):
+        return service.assess_uploaded_video(file, exercise_type, quality=quality)
+
+
+def _resolve_quality(quality):
+    """
+    Serving tier of a request, resolved before the request is added to the queue
+    depth so that its own clips never degrade it.
+    """
+    try:
+        return resolve_tier(quality)
+    except ValueError as e:
+        REQUESTS.inc(status="invalid")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _save_uploads(files):
+    service = _get_service()
+    paths = []
+    try:
+        for file in files:
+            paths.append(service.save_upload(file))
+    except Exception:
+        for path in paths:
+            os.remove(path)
+        raise
+    return paths
+
+
+class _SpooledStreamingResponse(StreamingResponse):
+    """
+    Streams the assessment of clips spooled to disk. However the response ends, the
+    files of clips never handed to the pipeline are removed, also when the client
+    disconnects before the body starts and the generator never runs. A clip is
+    handed over by setting clip["claimed"]; _run_clip then removes its file.
+    """
+
+    def __init__(self, content, clips, **kwargs):
+        super().__init__(content, **kwargs)
+        self.clips = clips
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            for clip in self.clips:
+                if not clip["claimed"] and os.path.exists(clip["path"]):
+                    os.remove(clip["path"])
+
+
+def _run_clip(path, exercise_type, filename, quality=None, on_event=None):
+    """Assesses one spooled clip and removes its temporary file."""
+    try:
+        with maybe_profile(f"{exercise_type or 'auto'}_{filename}"):
+            return _get_service().assess_video(path, exercise_type, on_event=on_event, quality=quality)
+    finally:
+        os.remove(path)
+
 
 router = APIRouter(
     prefix="/assessment",
@@ -10,20 +90,303 @@ router = APIRouter(
 
 @router.post("/")
 async def assess_video(
-    exercise_type: str = Form(...),
-    file: UploadFile = File(...)
+    exercise_type: Optional[str] = Form(default=None),
+    file: UploadFile = File(...),
+    quality: Optional[str] = Form(default=None),
+    x_profile: Optional[str] = Header(default=None)
 ):
     """
     Uploads a video, processes it through the rule-based and ML pipeline,
     and returns the assessment result as JSON.
+    Without `exercise_type` (or with "auto") the exercise is recognized from the video;
+    clips with several exercises are assessed per segment.
+    `quality` is fast, balanced, accurate or auto (default: QUALITY setting); it is
+    lowered automatically while the server is busy.
+    With profiling enabled (PROFILE_ENABLED), `X-Profile: 1` forces a profile of the request.
     """
+    quality = _resolve_quality(quality)
+    QUEUE_DEPTH.inc()
     try:
-        service = AssessmentService()
-        result = service.assess_uploaded_video(file, exercise_type)
+        result = await run_in_threadpool(_run_assessment, file, exercise_type, quality, x_profile == "1")
+        REQUESTS.inc(status="ok")
+        lifecycle.mark_ready()
 
         return JSONResponse(content=result)
 
     except ValueError as e:
+        REQUESTS.inc(status="invalid")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
\ No newline at end of file
+        REQUESTS.inc(status="error")
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    finally:
+        QUEUE_DEPTH.dec()
+
+
+@router.post("/stream")
+async def assess_video_stream(
+    exercise_type: Optional[str] = Form(default=None),
+    file: UploadFile = File(...),
+    quality: Optional[str] = Form(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Same pipeline as POST /assessment/, but streams events while the video is processed:
+
+        {"event": "progress", "frames_decoded": 120, "total_frames": 300, "poses_detected": 118, "percent": 40.0}
+        {"event": "rep", "rep": 1, "start_s": 0.4, "bottom_s": 1.5, "end_s": 2.6, "score": 85.0, "feedback": [...]}
+        {"event": "result", "result": {...}}      (or {"event": "error", "status": 400, "detail": "..."})
+
+    Rep scores are a preview computed on raw landmarks; the final result is authoritative.
+    Rep events are only sent when `exercise_type` is given (not recognized automatically).
+    Sent as Server-Sent Events with `Accept: text/event-stream`, NDJSON otherwise.
+    Closing the connection cancels the assessment.
+    """
+    sse = "text/event-stream" in (accept or "")
+    quality = _resolve_quality(quality)
+    try:
+        path = (await run_in_threadpool(_save_uploads, [file]))[0]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    clip = {"filename": file.filename, "exercise_type": exercise_type, "path": path, "claimed": False}
+    return _SpooledStreamingResponse(
+        _stream_assessment(clip, quality, sse), [clip],
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _format_event(event, sse):
+    if sse:
+        return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    return json.dumps(event) + "\n"
+
+
+async def _stream_assessment(clip, quality, sse):
+    from services.assessment_service import AssessmentCancelled
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def put(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    def on_event(event):
+        # runs on the pipeline thread; stops the pipeline once the client is gone
+        if cancelled.is_set():
+            raise AssessmentCancelled()
+        put(event)
+
+    def run():
+        try:
+            result = _run_clip(clip["path"], clip["exercise_type"], clip["filename"], quality=quality,
+                               on_event=on_event)
+            REQUESTS.inc(status="ok")
+            lifecycle.mark_ready()
+            put({"event": "result", "result": result})
+        except AssessmentCancelled:
+            REQUESTS.inc(status="cancelled")
+        except ValueError as e:
+            REQUESTS.inc(status="invalid")
+            put({"event": "error", "status": 400, "detail": str(e)})
+        except Exception as e:
+            REQUESTS.inc(status="error")
+            put({"event": "error", "status": 500, "detail": f"Internal error: {str(e)}"})
+        finally:
+            QUEUE_DEPTH.dec()
+            put(None)
+
+    # counted until the pipeline thread returns, which also covers a client that left
+    QUEUE_DEPTH.inc()
+    clip["claimed"] = True
+    asyncio.ensure_future(run_in_threadpool(run))
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield _format_event(event, sse)
+    finally:
+        # client disconnected (or stream done): the pipeline thread stops at its next event
+        cancelled.set()
+
+
+@router.post("/batch")
+async def assess_batch(
+    files: List[UploadFile] = File(...),
+    exercise_types: List[str] = Form(default=[]),
+    quality: Optional[str] = Form(default=None),
+):
+    """
+    Assesses several clips in one request and streams one NDJSON line per clip
+    as soon as it finishes (completion order, not upload order):
+
+        {"index": 0, "filename": "a.mp4", "exercise_type": "squat", "status": "ok", "result": {...}}
+
+    `exercise_types` is repeated once per file, or given once for all files
+    ("auto" or omitted: recognized per clip); `quality` applies to every clip.
+    Clips run concurrently up to the worker's pose pool size and reuse its warmed
+    detectors. A final {"done": true, ...} line summarizes the batch.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded.")
+    if len(files) > settings.batch_max_clips:
+        raise HTTPException(status_code=400,
+                            detail=f"Too many clips: {len(files)} (max {settings.batch_max_clips}).")
+    if not exercise_types:
+        exercise_types = ["auto"]
+    if len(exercise_types) == 1:
+        exercise_types = exercise_types * len(files)
+    if len(exercise_types) != len(files):
+        raise HTTPException(status_code=400,
+                            detail="Provide one exercise_type per file, or a single one for all files.")
+
+    # one tier for the whole batch, resolved before its clips are queued
+    quality = _resolve_quality(quality)
+    # uploads are closed once this handler returns, so spool them to disk first
+    try:
+        paths = await run_in_threadpool(_save_uploads, files)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    clips = [
+        {"index": i, "filename": f.filename, "exercise_type": ex, "path": path, "claimed": False}
+        for i, (f, ex, path) in enumerate(zip(files, exercise_types, paths))
+    ]
+    return _SpooledStreamingResponse(_stream_batch(clips, quality), clips, media_type="application/x-ndjson")
+
+
+def _clip_finished(call):
+    """Done callback of a clip's pipeline call: the clip leaves the queue once its thread returns."""
+    QUEUE_DEPTH.dec()
+    if not call.cancelled():
+        call.exception()  # retrieved here when the request was cancelled and nobody awaits it
+
+
+async def _stream_batch(clips, quality=None):
+    # more clips in flight than pooled detectors would only block threadpool threads
+    slots = asyncio.Semaphore(settings.pose_pool_size)
+
+    async def run(clip):
+        record = {k: clip[k] for k in ("index", "filename", "exercise_type")}
+        try:
+            async with slots:
+                clip["claimed"] = True
+                call = asyncio.ensure_future(run_in_threadpool(
+                    _run_clip, clip["path"], clip["exercise_type"], clip["filename"], quality))
+                call.add_done_callback(_clip_finished)
+                # cancelling the request does not stop the thread: keep the call (and its queue slot) alive
+                record["result"] = await asyncio.shield(call)
+            record["status"] = "ok"
+        except ValueError as e:
+            record.update(status="invalid", error=str(e))
+        except Exception as e:
+            record.update(status="error", error=f"Internal error: {str(e)}")
+        BATCH_CLIPS.inc(status=record["status"])
+        return record
+
+    QUEUE_DEPTH.inc(len(clips))
+    tasks = [asyncio.ensure_future(run(clip)) for clip in clips]
+    counts = {"ok": 0, "invalid": 0, "error": 0}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            counts[record["status"]] += 1
+            yield json.dumps(record) + "\n"
+        REQUESTS.inc(status="ok" if counts["ok"] else "error")
+        lifecycle.mark_ready()
+        yield json.dumps({"done": True, "clips": len(clips), **counts}) + "\n"
+    finally:
+        # client went away: drop clips that have not started yet (their files are
+        # removed by _SpooledStreamingResponse); started ones leave the queue when done
+        for task in tasks:
+            task.cancel()
+        QUEUE_DEPTH.dec(sum(not clip["claimed"] for clip in clips))
+
+
+def _live_frames(message):
+    """
+    (n, 33, 4) float32 landmark frames of a live-session message (binary float32 or
+    JSON), or None for the {"event": "end"} message.
+    """
+    import numpy as np
+
+    if message.get("bytes") is not None:
+        frames = np.frombuffer(message["bytes"], dtype=np.float32)
+    else:
+        data = json.loads(message.get("text") or "{}")
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object ({"landmarks": [...]} or {"event": "end"})')
+        if data.get("event") == "end":
+            return None
+        frames = np.asarray(data.get("landmarks", []), dtype=np.float32)
+    if frames.size == 0 or frames.size % (33 * 4):
+        raise ValueError("Expected landmark frames of 33 x (x, y, z, visibility) values")
+    frames = frames.reshape(-1, 33, 4)
+    if len(frames) > settings.live_max_frames_per_message:
+        raise ValueError(f"At most {settings.live_max_frames_per_message} frames per message")
+    return frames
+
+
+@router.websocket("/live")
+async def assess_live(websocket: WebSocket, exercise_type: str, fps: float = 30.0, window_every: float = 2.0):
+    """
+    Live assessment of landmarks detected on the client (e.g. MediaPipe in the browser).
+
+    Query: ?exercise_type=squat&fps=30&window_every=2. The client sends landmark frames,
+    as binary float32 (n x 33 x 4, x / y / z / visibility) or as JSON {"landmarks": [...]},
+    and {"event": "end"} to finish. The server sends
+
+        {"event": "rep", "rep": 1, "start_s": ..., "end_s": ..., "score": 85.0, "feedback": [...]}
+        {"event": "window", "result": {...}}       every `window_every` seconds of frames
+        {"event": "summary", "reps": 6, "result": {...}}   after "end", then closes
+
+    and {"event": "error", "detail": "..."} for a rejected message. Memory and per-frame
+    cost are bounded however long the session runs (services/live_session.py).
+    """
+    from services.live_session import LiveSession
+
+    if not (fps > 0 and window_every > 0):
+        # rejected before the handshake completes (policy violation)
+        await websocket.close(code=1008, reason="fps and window_every must be positive")
+        return
+    await websocket.accept()
+    try:
+        session = LiveSession(exercise_type, fps=fps, min_visibility=settings.min_joint_visibility)
+    except ValueError as e:
+        await websocket.send_json({"event": "error", "detail": str(e)})
+        await websocket.close(code=1008)
+        return
+
+    LIVE_SESSIONS.inc()
+    window_frames = max(int(round(window_every * fps)), 1)
+    next_window = window_frames
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                frames = _live_frames(message)
+            except (ValueError, TypeError) as e:
+                await websocket.send_json({"event": "error", "detail": str(e)})
+                continue
+            if frames is None:
+                for rep in await run_in_threadpool(session.finish):
+                    await websocket.send_json({"event": "rep", **rep})
+                result = await run_in_threadpool(session.window)
+                await websocket.send_json({"event": "summary", "reps": session.reps, "result": result})
+                await websocket.close()
+                break
+            # featurization and rep scanning run off the event loop
+            for rep in await run_in_threadpool(session.push, frames):
+                await websocket.send_json({"event": "rep", **rep})
+            if session.frames >= next_window:
+                next_window = session.frames + window_frames
+                result = await run_in_threadpool(session.window)
+                if result is not None:
+                    await websocket.send_json({"event": "window", "result": result})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        LIVE_SESSIONS.dec()
@@ -1,7 +1,33 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from services import lifecycle
 
 router = APIRouter(prefix="/api", tags=["Health"])
 
 @router.get("/health")
 def health_check():
-    return {"status": "safe and sound!"}
+    """Liveness and readiness in one report (ready = heavy models loaded)."""
+    state = lifecycle.status()
+    return {
+        "status": "safe and sound!",
+        "live": True,
+        "ready": state["ready"],
+        "startup": {
+            "app_loaded_seconds": state["app_loaded_seconds"],
+            "cold_start_seconds": state["cold_start_seconds"],
+            "warmup_seconds": state["warmup_seconds"],
+            "error": state["error"],
+        },
+    }
+
+@router.get("/health/live")
+def liveness():
+    """Liveness probe: the process is up and serving."""
+    return {"live": True}
+
+@router.get("/health/ready")
+def readiness():
+    """Readiness probe: 503 until warmup (or the first request) has loaded the pipeline."""
+    if not lifecycle.is_ready():
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True}
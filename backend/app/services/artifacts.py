@@ -0,0 +1,116 @@
+"""
+Read-only model artifacts shared by all requests (and, under gunicorn, by all workers).
+
+Artifacts are registered by name with a loader. preload() is called in the gunicorn
+master before workers fork (see gunicorn.conf.py), so the loaded arrays live in
+pages shared copy-on-write by every worker; arrays are marked read-only so nothing
+writes to (and un-shares) them. Without preloading, get() loads lazily.
+"""
+import logging
+import os
+import threading
+
+import numpy as np
+
+from config import settings
+from models.autoencoder import DenseAutoencoder
+from models.dtw import TemplateIndex
+from models.reference_index import ReferencePoseIndex
+
+logger = logging.getLogger(__name__)
+
+_loaders = {}
+_cache = {}
+_lock = threading.Lock()
+
+
+def register(name):
+    """Decorator registering `loader(artifacts_dir) -> object | None` under `name`."""
+    def decorator(loader):
+        _loaders[name] = loader
+        return loader
+    return decorator
+
+
+def _freeze(value):
+    """Marks numpy arrays (also inside dicts, lists and model / index objects) read-only."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    elif isinstance(value, (TemplateIndex, ReferencePoseIndex, DenseAutoencoder)):
+        _freeze(vars(value))
+    return value
+
+
+def get(name):
+    """Returns the artifact `name` (None if its files are not present)."""
+    if name in _cache:
+        return _cache[name]
+    with _lock:
+        if name not in _cache:
+            if name not in _loaders:
+                raise KeyError(f"Unknown artifact: {name}")
+            try:
+                _cache[name] = _freeze(_loaders[name](settings.artifacts_dir))
+            except Exception:
+                logger.exception("Could not load artifact %s", name)
+                _cache[name] = None
+        return _cache[name]
+
+
+def preload():
+    """Loads every registered artifact now (call before forking workers)."""
+    loaded = {name: get(name) is not None for name in _loaders}
+    logger.info("Preloaded artifacts from %s: %s", settings.artifacts_dir, loaded)
+    return loaded
+
+
+def loaded():
+    return {name: _cache.get(name) is not None for name in _loaders}
+
+
+# ===============================
+# Artifact loaders
+# ===============================
+@register("dtw_templates")
+def load_dtw_templates(artifacts_dir):
+    """Reference-rep index for DTW template matching (scripts/build_dtw_templates.py)."""
+    path = os.path.join(artifacts_dir, "dtw_templates.npz")
+    if os.path.exists(path):
+        return TemplateIndex.load(path)
+    return None
+
+
+@register("reference_poses")
+def load_reference_poses(artifacts_dir):
+    """k-NN index of labelled dataset poses (scripts/build_reference_index.py)."""
+    path = os.path.join(artifacts_dir, "reference_poses.npz")
+    if os.path.exists(path):
+        return ReferencePoseIndex.load(path)
+    return None
+
+
+@register("autoencoder")
+def load_autoencoder(artifacts_dir):
+    """NumPy autoencoders per camera view {view: DenseAutoencoder} (scripts/train_autoencoder.py)."""
+    return _load_autoencoders(artifacts_dir, "autoencoder_{view}.npz")
+
+
+@register("window_autoencoder")
+def load_window_autoencoder(artifacts_dir):
+    """Sequence-window autoencoders per camera view (train_autoencoder.py --window)."""
+    return _load_autoencoders(artifacts_dir, "autoencoder_{view}_window.npz")
+
+
+def _load_autoencoders(artifacts_dir, pattern):
+    models = {}
+    for view in ("side", "front"):
+        path = os.path.join(artifacts_dir, pattern.format(view=view))
+        if os.path.exists(path):
+            models[view] = DenseAutoencoder.load(path)
+    return models or None
@@ -1,77 +1,372 @@
 import os
+import logging
+import threading
 import numpy as np
 from fastapi import UploadFile
+import shutil
 import tempfile
-from services.mediapipe_extractor import extract_landmarks_from_video
+from services.mediapipe_extractor import extract_landmarks_from_video, get_video_fps
+from services.landmark_smoothing import smooth_landmark_sequence
+from services.rep_tracker import LiveRepTracker
 from models.feature_extractor import FeatureExtractor
 from models.estimator import ExerciseEvaluator
-# from app.ml.autoencoder_validator import AutoencoderValidator  # will be added later
+from models.exercise_classifier import UNKNOWN_EXERCISE, ExerciseClassifier
+from models.temporal_features import TemporalFeatureExtractor
+from services import artifacts
+from services.metrics import STAGE_LATENCY
+from services.quality import QualityTier, resolve_tier
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# exercise_type value asking for automatic exercise recognition (same as omitting it)
+AUTO_EXERCISE = "auto"
+
+
+class AssessmentCancelled(Exception):
+    """Raised from a progress callback to stop an assessment early (e.g. client went away)."""
+
 
 class AssessmentService:
     """Main service for handling video technique assessment pipeline."""
 
     def __init__(self):
         self.extractor = FeatureExtractor()
-        self.estimator = ExerciseEvaluator()
-        # self.validator = AutoencoderValidator()  # TODO: add ML validation later
 
-    def assess_uploaded_video(self, file: UploadFile, exercise_type: str):
-        """Process uploaded video in memory (temporary file)."""
+    @staticmethod
+    def save_upload(file: UploadFile) -> str:
+        """Copies an upload to a temporary .mp4 file; the caller removes it."""
         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
-            tmp.write(file.file.read())
-            tmp_path = tmp.name
+            shutil.copyfileobj(file.file, tmp)
+            return tmp.name
+
+    @staticmethod
+    def _progress_reporter(on_event, tracker):
+        """Adapts extractor progress callbacks to progress / rep events."""
+        def on_progress(frames_decoded, total_frames, poses_detected, landmarks_so_far):
+            on_event({
+                "event": "progress",
+                "frames_decoded": frames_decoded,
+                "total_frames": total_frames,
+                "poses_detected": poses_detected,
+                "percent": round(min(frames_decoded / total_frames, 1.0) * 100, 1) if total_frames > 0 else None,
+            })
+            if tracker is not None:
+                for rep in tracker.update(landmarks_so_far):
+                    on_event({"event": "rep", **rep})
+        return on_progress
+
+    @staticmethod
+    def match_templates(exercise_type, feature_matrix, feature_names, reps, timestamps):
+        """
+        DTW similarity of every rep to the closest reference rep of the exercise
+        (None without a template index for it, see models/dtw.py).
+        """
+        index = artifacts.get("dtw_templates")
+        if index is None or len(reps) == 0 or not index.count(exercise_type):
+            return None
+        trajectory = index.trajectory(feature_matrix, feature_names)
+        out = []
+        for i, (start, _, end) in enumerate(reps, start=1):
+            match = index.match(trajectory[start:end + 1], exercise_type)
+            out.append({
+                "rep": i,
+                "start_s": round(float(timestamps[start]), 2),
+                "end_s": round(float(timestamps[end]), 2),
+                "similarity": round(index.similarity(match["distance_deg"]), 1),
+                "distance_deg": round(match["distance_deg"], 1),
+            })
+        return {"similarity": round(float(np.mean([r["similarity"] for r in out])), 1), "reps": out}
+
+    @staticmethod
+    def pose_corrections(exercise_type, view, feature_matrix, feature_names, reps, timestamps):
+        """
+        Closest reference pose and largest feature deviations at the top and the
+        bottom of every rep (None without a reference pose index, see models/reference_index.py).
+        """
+        index = artifacts.get("reference_poses")
+        if index is None or len(reps) == 0:
+            return None
+        # one batched k-NN query for the top and bottom frames of all reps
+        keyframes = reps[:, :2].ravel()
+        found = index.corrections(feature_matrix[keyframes], feature_names, view, exercise_type)
+        if found is None:
+            return None
+        out = []
+        for i, (start, bottom, _) in enumerate(reps):
+            out.append({
+                "rep": i + 1,
+                "top": {"time_s": round(float(timestamps[start]), 2), **found[2 * i]},
+                "bottom": {"time_s": round(float(timestamps[bottom]), 2), **found[2 * i + 1]},
+            })
+        return out
+
+    @staticmethod
+    def validate_motion(view, feature_matrix, feature_names, timestamps):
+        """
+        Autoencoder anomaly check of the clip (None without a model for the view).
+        The window model scores sliding windows of frames in one batched pass, so it
+        also flags bad tempo and jerky motion; per-frame models only flag odd poses.
+
+        Returns:
+            dict: share of frames within the model's threshold (0-100) and the
+            time ranges of anomalous frames
+        """
+        mode = settings.ml_validation
+        models = artifacts.get("window_autoencoder") if mode == "window" else None
+        model = (models or {}).get(view)
+        if model is None and mode in ("window", "frame"):
+            model = (artifacts.get("autoencoder") or {}).get(view)
+        if model is None or len(feature_matrix) == 0:
+            return None
+        if model.extractor_version not in (None, FeatureExtractor.VERSION):
+            logger.warning("Skipping autoencoder validation: model built for feature extractor %s, running %s",
+                           model.extractor_version, FeatureExtractor.VERSION)
+            return None
+        # window models resample the clip by its timestamps (dropped frames included)
+        errors = model.score_clip(feature_matrix, feature_names, timestamps,
+                                  stride=min(max(settings.ml_window_stride, 1), model.window))
+        anomalous = errors > model.threshold
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], anomalous.astype(np.int8), [0]])))
+        return {
+            "confidence": round(float(np.mean(~anomalous)) * 100, 1),
+            "anomalies": [{"start_s": round(float(timestamps[start]), 2),
+                           "end_s": round(float(timestamps[end - 1]), 2),
+                           "peak_error": round(float(errors[start:end].max()), 3)}
+                          for start, end in zip(edges[::2], edges[1::2])],
+        }
+
+    def detect_exercises(self, landmarks_array, valid, fps):
+        """
+        Recognizes the exercise(s) of a clip from a few sampled frames (k-NN votes
+        against the reference pose index, see models/exercise_classifier.py).
+
+        Returns:
+            list[tuple[int, int, str, float]]: (first_frame, end_frame, exercise, confidence)
+            segments covering the clip in order; exercise is UNKNOWN_EXERCISE where no
+            exercise gets EXERCISE_MIN_CONFIDENCE of the votes
+        """
+        index = artifacts.get("reference_poses")
+        if index is None:
+            raise ValueError("exercise_type is required: automatic exercise recognition is not available.")
+        frames = np.flatnonzero(valid)
+        if len(frames) == 0:
+            return []
+        # ~5 frames per second are enough to tell exercises apart
+        frames = frames[::max(int(round(fps / settings.exercise_sample_fps)), 1)]
+        points = landmarks_array[frames]  # fancy indexing copies, so the clip stays unnormalized
+        view = self.extractor.detect_sequence_view(points)
+        matrix, names = self.extractor.build_feature_matrix(points, view=view)
+        classifier = ExerciseClassifier(index, min_segment_seconds=settings.exercise_min_segment_seconds,
+                                        min_confidence=settings.exercise_min_confidence)
+        segments = classifier.segment(matrix, names, view, frames / fps)
+        out = []
+        for i, (start, end, exercise, confidence) in enumerate(segments):
+            first = 0 if i == 0 else int(frames[start])
+            last = len(landmarks_array) if i == len(segments) - 1 else int(frames[end])
+            out.append((first, last, exercise, confidence))
+        return out
+
+    def assess_uploaded_video(self, file: UploadFile, exercise_type: str = None, quality: str = None):
+        """Process uploaded video in memory (temporary file)."""
+        tmp_path = self.save_upload(file)
         try:
-            result = self.assess_video(tmp_path, exercise_type)
+            result = self.assess_video(tmp_path, exercise_type, quality=quality)
         finally:
             os.remove(tmp_path)  # cleanup!
 
         return result    
 
-    def assess_video(self, video_path: str, exercise_type: str) -> dict:
+    def assess_video(self, video_path: str, exercise_type: str = None, on_event=None, quality: str = None) -> dict:
         """
         Run the full analysis pipeline:
-        1. Extract keypoints with MediaPipe
-        2. Build feature sequence
-        3. Evaluate with rule-based evaluator
-        4. Validate with autoencoder (optional)
+        1. Extract keypoints with MediaPipe (+ gap filling, smoothing)
+        2. Recognize the exercise(s) when `exercise_type` is not given
+        3. Per exercise segment: visibility filtering, feature sequence, rule-based
+           evaluation and comparison with reference reps / poses (see _assess_segment)
+
+        With `on_event`, progress is reported while the video is decoded, in the same pass:
+        on_event({"event": "progress", ...}) every few frames and
+        on_event({"event": "rep", ...}) with a preliminary score whenever a rep completes
+        (rep events need a known `exercise_type`).
+        The callback may raise AssessmentCancelled to stop the pipeline.
+
+        `quality` picks the pose model / frame sampling tier (services/quality.py): a tier
+        name, or a QualityTier the caller already resolved. The tier actually served
+        (it degrades under load) is returned as "quality".
+
+        Without `exercise_type` (or with "auto") the exercise is recognized from the
+        video. A clip with several exercises is assessed per segment and returned as
+        {"exercise": "mixed", "segments": [...]} with a duration-weighted score
+        (None when no segment could be scored). Segments in which no exercise is
+        recognized confidently are returned as {"exercise": "unknown", "error": ...}.
         """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video not found: {video_path}")
+        if exercise_type == AUTO_EXERCISE:
+            exercise_type = None
+        # evaluators keep a running score while they evaluate, so each call gets its own
+        estimator = ExerciseEvaluator()
+        if exercise_type is not None and exercise_type not in estimator.evaluators:
+            raise ValueError(f"Unsupported exercise type: {exercise_type}")
+
+        tier = quality if isinstance(quality, QualityTier) else resolve_tier(quality)
 
         # === STEP 1: Extract pose landmarks ===
-        print("Extracting landmarks from video...")
-        landmarks_array = extract_landmarks_from_video(video_path)
-        print(type(landmarks_array))
-        print("ss")
-        print(f"landmarks_array shape: {None if landmarks_array is None else len(landmarks_array)}")
+        logger.info("Extracting landmarks from video (quality: %s)...", tier.name)
+        with STAGE_LATENCY.time(stage="extraction"):
+            # rate of the frames actually processed
+            fps = get_video_fps(video_path) / tier.sample_rate
+            on_progress = tracker = None
+            if on_event is not None:
+                if exercise_type is not None:
+                    tracker = LiveRepTracker(self.extractor, estimator.evaluators[exercise_type], fps=fps,
+                                             min_visibility=settings.min_joint_visibility)
+                on_progress = self._progress_reporter(on_event, tracker)
+            landmarks_array, detected = extract_landmarks_from_video(
+                video_path, on_progress=on_progress, sample_rate=tier.sample_rate,
+                model_complexity=tier.model_complexity, escalate_complexity=tier.escalate_complexity,
+                min_visibility=settings.auto_min_visibility, return_mask=True)
+            if tracker is not None:
+                for rep in tracker.finish():
+                    on_event({"event": "rep", **rep})
+        logger.debug("landmarks_array shape: %s", None if landmarks_array is None else landmarks_array.shape)
         if landmarks_array is None or len(landmarks_array) == 0:
             return {"error": "No pose detected in video."}
 
-        # === STEP 2: Extract features from landmarks ===
-        print("Building feature sequence...")
-        feature_sequence = []
-        for frame_data in landmarks_array:
-            print(type(frame_data))
-            print(frame_data.shape)
-            _, feat_dict = self.extractor.build_feature_vector(frame_data, view="auto")
-            feature_sequence.append(feat_dict)
-
-        # === STEP 3: Rule-based evaluation ===
-        print("Running rule-based assessment...")
-        result = self.estimator.evaluate(exercise_type, feature_sequence)
-
-        # === STEP 4: Autoencoder validation (optional) ===
-        # print("Validating with autoencoder...")
-        # ml_validation = self.validator.validate(feature_sequence)
-        # result["ml_confidence"] = ml_validation["confidence"]
-
-        # === STEP 5: Final combined result ===
-        print("Assessment complete")
+        # Fill short detection gaps and smooth jitter
+        with STAGE_LATENCY.time(stage="smoothing"):
+            landmarks_array, valid = smooth_landmark_sequence(landmarks_array, detected=detected)
+
+        # === STEP 2: Exercise recognition ===
+        if exercise_type is not None:
+            segments = [(0, len(landmarks_array), exercise_type, None)]
+        else:
+            with STAGE_LATENCY.time(stage="exercise_recognition"):
+                segments = self.detect_exercises(landmarks_array, valid, fps)
+            if not segments:
+                return {"error": "No pose detected in video."}
+            logger.info("Recognized exercises: %s", [(ex, round(c, 2)) for _, _, ex, c in segments])
+
+        # === STEP 3: Assessment of every exercise segment ===
+        results = []
+        for first, end, exercise, confidence in segments:
+            if exercise == UNKNOWN_EXERCISE:
+                result = {"exercise": exercise, "error": "Could not recognize the exercise; "
+                                                         "please choose the exercise type."}
+            else:
+                result = self._assess_segment(estimator, exercise, landmarks_array[first:end],
+                                              valid[first:end], fps, first_frame=first)
+            result["quality"] = tier.name
+            if confidence is not None:
+                result["recognition_confidence"] = round(confidence, 2)
+            results.append(result)
+
+        logger.info("Assessment complete")
+        if len(results) == 1:
+            return results[0]
+        return self._combine_segments(results, segments, fps, tier)
+
+    def _assess_segment(self, estimator, exercise_type, landmarks_array, valid, fps, first_frame=0):
+        """
+        Assesses a run of (smoothed) frames of one exercise.
+        `first_frame` is the index of landmarks_array[0] in the clip (for timestamps).
+        """
+        evaluator = estimator.evaluators[exercise_type]
+        # skip frames whose required joints are occluded / low-confidence before featurizing them
+        confidence = self.extractor.joint_confidence(landmarks_array, evaluator.REQUIRED_JOINTS)
+        keep = valid & (confidence >= settings.min_joint_visibility)
+        if not keep.all():
+            landmarks_array = landmarks_array[keep]
+        weights = confidence[keep]
+        # keep real frame times so temporal features stay correct across dropped frames
+        timestamps = (np.flatnonzero(keep) + first_frame) / fps
+        logger.info("Frames kept after gap filling: %d (%d below joint visibility %.2f)",
+                    len(landmarks_array), int(valid.sum() - keep.sum()), settings.min_joint_visibility)
+        if len(landmarks_array) == 0:
+            if valid.any():
+                return {"exercise": exercise_type, "error": "Required joints are not visible in the video."}
+            return {"exercise": exercise_type, "error": "No pose detected in video."}
+
+        # === Extract features from landmarks ===
+        logger.info("Building feature sequence...")
+        with STAGE_LATENCY.time(stage="featurization"):
+            # camera view is resolved once per clip so every frame has the same keys
+            view = self.extractor.detect_sequence_view(landmarks_array)
+            # float32 (T, F) matrix; x, y, z of the landmark buffer are normalized in place
+            feature_matrix, feature_names = self.extractor.build_feature_matrix(
+                landmarks_array, view=view, inplace=True)
+            # angular velocity / acceleration columns, computed in bulk over the sequence
+            feature_matrix, feature_names = TemporalFeatureExtractor(fps=fps).extend_matrix(
+                feature_matrix, feature_names, timestamps)
+            feature_sequence = self.extractor.rows_to_dicts(feature_matrix, feature_names)
+        logger.info("Detected camera view: %s", view)
+
+        # === Rule-based evaluation ===
+        logger.info("Running rule-based assessment...")
+        with STAGE_LATENCY.time(stage="rule_evaluation"):
+            # frame scores are weighted by joint confidence
+            result = estimator.evaluate(exercise_type, feature_sequence, fps=fps, timestamps=timestamps,
+                                        weights=weights)
+
+        # === Comparison with reference reps / poses ===
+        with STAGE_LATENCY.time(stage="reference_matching"):
+            column = evaluator.primary_column(feature_names)
+            reps = (TemporalFeatureExtractor(fps=fps).segment_reps(feature_matrix[:, column])
+                    if column is not None else np.zeros((0, 3), dtype=int))
+            template_match = self.match_templates(exercise_type, feature_matrix, feature_names, reps, timestamps)
+            corrections = self.pose_corrections(exercise_type, view, feature_matrix, feature_names, reps,
+                                                timestamps)
+
+        # === Autoencoder validation (optional) ===
+        logger.info("Validating with autoencoder...")
+        with STAGE_LATENCY.time(stage="validation"):
+            ml_validation = self.validate_motion(view, feature_matrix, feature_names, timestamps)
+
+        # === Final combined result ===
         return {
             "exercise": exercise_type,
+            "view": view,
             "score": result["score"],
             "feedback": result["feedback"],
             "frame_score": result.get("frame_score"),
             "phase_score": result.get("phase_score"),
-            # "ml_confidence": result.get("ml_confidence", None),
+            "tempo": result.get("tempo"),
+            "template_match": template_match,
+            "corrections": corrections,
+            "ml_confidence": ml_validation["confidence"] if ml_validation else None,
+            "anomalies": ml_validation["anomalies"] if ml_validation else None,
         }
+
+    @staticmethod
+    def _combine_segments(results, segments, fps, tier):
+        """Result of a mixed-exercise clip: per-segment results and a duration-weighted score."""
+        for result, (first, end, _, _) in zip(results, segments):
+            result["start_s"] = round(first / fps, 2)
+            result["end_s"] = round(end / fps, 2)
+        scored = [(r["score"], end - first) for r, (first, end, _, _) in zip(results, segments) if "score" in r]
+        score = None
+        if scored:
+            scores, durations = zip(*scored)
+            score = round(float(np.average(scores, weights=durations)), 1)
+        return {
+            "exercise": "mixed",
+            "quality": tier.name,
+            "score": score,
+            "feedback": list(dict.fromkeys(f for r in results for f in r.get("feedback", []))),
+            "segments": results,
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_assessment_service():
+    """Process-wide service instance (safe to share: it holds no per-request state)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = AssessmentService()
+    return _service
@@ -0,0 +1,67 @@
+"""
+Preallocated, growable float32 buffer for per-frame landmarks.
+
+The extractor writes every processed frame straight into the next row instead
+of building one small array per frame and stacking them at the end. The buffer
+is sized from the container's frame count and doubles if that count was too low.
+"""
+import numpy as np
+
+
+class LandmarkBuffer:
+    """(capacity, 33, channels) float32 rows plus a bool mask of detected frames."""
+
+    def __init__(self, capacity, n_landmarks=33, channels=4):
+        capacity = max(int(capacity), 1)
+        self._data = np.zeros((capacity, n_landmarks, channels), dtype=np.float32)
+        self._detected = np.zeros(capacity, dtype=bool)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        capacity = len(self._data) * 2
+        data = np.zeros((capacity,) + self._data.shape[1:], dtype=np.float32)
+        data[:self.size] = self._data[:self.size]
+        detected = np.zeros(capacity, dtype=bool)
+        detected[:self.size] = self._detected[:self.size]
+        self._data, self._detected = data, detected
+
+    def next_row(self, detected=True):
+        """
+        Claims the next frame's row for the caller to fill in place.
+
+        Returns:
+            np.ndarray: the (33, channels) row (a view into the buffer)
+        """
+        if self.size == len(self._data):
+            self._grow()
+        row = self._data[self.size]
+        self._detected[self.size] = detected
+        self.size += 1
+        return row
+
+    def append(self, values=None):
+        """
+        Writes the next frame: `values` is anything assignable to a (33, channels)
+        row (e.g. a nested list), or None for a frame without a detected pose.
+
+        Returns:
+            np.ndarray: the written row (a view into the buffer)
+        """
+        row = self.next_row(detected=values is not None)
+        if values is not None:
+            row[...] = values
+        # rows of missing frames stay zero (the buffer is zero-initialized)
+        return row
+
+    @property
+    def landmarks(self):
+        """Contiguous (T, 33, channels) view of the written frames."""
+        return self._data[:self.size]
+
+    @property
+    def detected(self):
+        """(T,) bool view: True for frames with a detected pose."""
+        return self._detected[:self.size]
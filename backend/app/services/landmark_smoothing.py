@@ -0,0 +1,101 @@
+import numpy as np
+from scipy.signal import savgol_filter
+
+
+def detected_frame_mask(landmarks):
+    """
+    Boolean mask of frames with a detected pose.
+
+    Args:
+        landmarks (np.ndarray): shape = (T, 33, C); frames without detection are all zeros.
+
+    Returns:
+        np.ndarray: bool mask, shape = (T,)
+    """
+    landmarks = np.asarray(landmarks)
+    if landmarks.shape[0] == 0:
+        return np.zeros(0, dtype=bool)
+    return np.any(landmarks.reshape(len(landmarks), -1) != 0, axis=1)
+
+
+def fill_gaps(landmarks, valid, max_gap=5):
+    """
+    Linearly interpolates runs of missing frames between two detected frames, in place.
+
+    Gaps longer than `max_gap` frames (and leading/trailing gaps) are filled by
+    holding the nearest detected frame (the first half of a long gap holds the frame
+    before it, the second half the frame after it), so that a temporal filter can
+    run over the whole array, but they stay marked as invalid.
+
+    Args:
+        landmarks (np.ndarray): float array, shape = (T, 33, C); modified in place
+        valid (np.ndarray): bool mask of detected frames, shape = (T,)
+        max_gap (int): longest gap (in frames) that is interpolated
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: filled landmarks and the updated valid mask
+    """
+    n_frames = len(landmarks)
+    if n_frames == 0 or not valid.any() or valid.all():
+        return landmarks, valid
+
+    idx = np.arange(n_frames)
+    prev_idx = np.maximum.accumulate(np.where(valid, idx, -1))
+    next_idx = np.minimum.accumulate(np.where(valid, idx, n_frames)[::-1])[::-1]
+
+    has_prev = prev_idx >= 0
+    has_next = next_idx < n_frames
+    gap_len = next_idx - prev_idx - 1
+    fillable = ~valid & has_prev & has_next & (gap_len <= max_gap)
+
+    # only missing rows are written; hold the nearest detection where one side is missing
+    missing = np.flatnonzero(~valid)
+    left = np.where(has_prev, prev_idx, next_idx)[missing]
+    right = np.where(has_next, next_idx, prev_idx)[missing]
+    span = np.maximum(right - left, 1)
+    weight = (missing - left) / span
+    # long interior gaps hold the nearer detection too (weight 0 or 1) instead of a made-up motion
+    weight = np.where(fillable[missing], weight, np.floor(weight + 0.5))
+    weight = weight.astype(landmarks.dtype)[:, None, None]
+
+    landmarks[missing] = landmarks[left] * (1 - weight) + landmarks[right] * weight
+    return landmarks, valid | fillable
+
+
+def smooth_landmark_sequence(landmarks, max_gap=5, window_length=7, polyorder=2, detected=None):
+    """
+    Vectorized post-processing of a landmark sequence:
+    1. mask frames without a detected pose
+    2. interpolate short gaps (up to `max_gap` frames)
+    3. Savitzky–Golay filter along the time axis
+
+    Args:
+        landmarks (np.ndarray): shape = (T, 33, 3) or (T, 33, 4) with visibility as the
+                                4th channel; a float32 array is gap-filled in place
+        max_gap (int): longest gap (in frames) that is interpolated
+        window_length (int): Savitzky–Golay window (odd, in frames)
+        polyorder (int): Savitzky–Golay polynomial order
+        detected (np.ndarray): optional (T,) mask of detected frames (e.g. from the
+                               extractor); computed from the zero rows otherwise
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: smoothed float32 landmarks (same shape) and bool
+                                       mask (T,) of frames that are safe to featurize
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    valid = detected_frame_mask(landmarks) if detected is None else np.asarray(detected, dtype=bool)
+    if not valid.any():
+        return landmarks, valid
+
+    filled, valid = fill_gaps(landmarks, valid, max_gap=max_gap)
+
+    # the filter needs at least one full window of frames
+    window_length = min(window_length, len(filled) - (len(filled) + 1) % 2)
+    if window_length > polyorder:
+        # float32 in, float32 out
+        filled = savgol_filter(filled, window_length, polyorder, axis=0)
+        if filled.shape[-1] > 3:
+            # the polynomial fit may overshoot; visibility is a probability
+            np.clip(filled[..., 3], 0.0, 1.0, out=filled[..., 3])
+
+    return filled, valid
@@ -0,0 +1,99 @@
+"""
+Process lifecycle: cold-start timing, warmup of heavy dependencies and readiness.
+
+Importing this module is cheap on purpose. mediapipe, cv2, scipy and the
+assessment service are only imported by warm_up() (startup hook) or on the
+first request, so the app answers liveness probes right after the process starts.
+"""
+import time
+
+# reference point for cold-start measurement (this module is imported first by main.py)
+PROCESS_START = time.perf_counter()
+
+import logging
+import threading
+
+from config import settings
+from services.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STARTUP_SECONDS = REGISTRY.gauge(
+    "startup_seconds",
+    "Seconds from process start until the app was importable / ready.",
+    labelnames=("phase",),
+)
+
+_lock = threading.Lock()
+_state = {
+    "ready": False,
+    "warming_up": False,
+    "app_loaded_seconds": None,
+    "cold_start_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
+
+
+def mark_app_loaded():
+    """Called once the FastAPI app object is built."""
+    elapsed = time.perf_counter() - PROCESS_START
+    _state["app_loaded_seconds"] = round(elapsed, 3)
+    STARTUP_SECONDS.set(elapsed, phase="app_loaded")
+
+
+def warm_up():
+    """
+    Imports the heavy pipeline modules and initializes a pose model once, so the
+    first real request does not pay for it. Safe to call more than once.
+    """
+    with _lock:
+        if _state["ready"] or _state["warming_up"]:
+            return
+        _state["warming_up"] = True
+
+    start = time.perf_counter()
+    try:
+        from services import artifacts
+        from services.assessment_service import get_assessment_service
+        from services.mediapipe_extractor import warm_up_pose
+        from services.quality import tier_complexities
+
+        artifacts.preload()  # no-op for artifacts already preloaded by the gunicorn master
+        get_assessment_service()
+        warm_up_pose(tier_complexities(settings.warmup_qualities))
+    except Exception as e:  # keep serving; readiness reports the failure
+        logger.exception("Warmup failed")
+        _state["error"] = str(e)
+    else:
+        now = time.perf_counter()
+        _state["ready"] = True
+        _state["warmup_seconds"] = round(now - start, 3)
+        _state["cold_start_seconds"] = round(now - PROCESS_START, 3)
+        STARTUP_SECONDS.set(now - PROCESS_START, phase="ready")
+        logger.info("Warmup done in %.2f s (cold start %.2f s)", now - start, now - PROCESS_START)
+    finally:
+        _state["warming_up"] = False
+
+
+def start_background_warmup():
+    """Runs warm_up() in a daemon thread so startup does not block liveness."""
+    thread = threading.Thread(target=warm_up, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def mark_ready():
+    """Marks the process ready after a successful request (covers disabled warmup)."""
+    if not _state["ready"]:
+        _state["ready"] = True
+        _state["cold_start_seconds"] = round(time.perf_counter() - PROCESS_START, 3)
+        STARTUP_SECONDS.set(_state["cold_start_seconds"], phase="ready")
+
+
+def is_ready():
+    return _state["ready"]
+
+
+def status():
+    return dict(_state)
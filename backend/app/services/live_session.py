@@ -0,0 +1,87 @@
+"""
+Bounded-memory assessment of live or arbitrarily long landmark streams.
+
+A LiveSession keeps the last `history_seconds` of feature rows in ring buffers;
+landmarks are featurized and dropped. Reps are reported as they complete, via
+LiveRepTracker, which only re-scans the new tail plus one rep of overlap. window() assesses the last N
+seconds with the regular evaluate_unified. Memory and per-frame cost therefore
+stay constant however long the session runs.
+"""
+import numpy as np
+
+from models.estimator import ExerciseEvaluator
+from models.feature_extractor import FeatureExtractor
+from services.rep_tracker import LiveRepTracker
+
+
+class LiveSession:
+    """State of one live stream of (33, 4) landmark frames of a single exercise."""
+
+    def __init__(self, exercise_type, fps=30.0, window_seconds=10.0, history_seconds=60.0,
+                 min_visibility=0.5):
+        """
+        Args:
+            exercise_type: key of ExerciseEvaluator.evaluators
+            fps: frame rate of the pushed frames
+            window_seconds: default length of window()
+            history_seconds: feature rows kept (bounds memory)
+            min_visibility: frames whose required joints are less visible are not scored
+        """
+        if not fps > 0:
+            raise ValueError(f"fps must be positive, got {fps}")
+        estimator = ExerciseEvaluator()
+        if exercise_type not in estimator.evaluators:
+            raise ValueError(f"Unsupported exercise type: {exercise_type}")
+        self.exercise_type = exercise_type
+        self.evaluator = estimator.evaluators[exercise_type]
+        self.extractor = FeatureExtractor()
+        self.fps = fps
+        self.window_seconds = window_seconds
+
+        self.frames = 0  # pushed since the session started
+        self.tracker = LiveRepTracker(self.extractor, self.evaluator, fps=fps,
+                                      min_visibility=min_visibility, history_seconds=history_seconds)
+        self.reps = 0
+
+    def push(self, landmarks):
+        """
+        Adds one (33, 4) frame or a block of (n, 33, 4) frames (all zeros = no pose).
+
+        Returns:
+            list[dict]: reps completed by these frames (see LiveRepTracker)
+        """
+        rows = np.asarray(landmarks, dtype=np.float32)
+        if rows.ndim == 2:
+            rows = rows[None]
+        reps = self.tracker.push(rows, first_frame=self.frames)
+        self.frames += len(rows)
+        self.reps += len(reps)
+        return reps
+
+    def window(self, seconds=None, every_n=5):
+        """
+        Rolling assessment (score, phase analysis, tempo) of the last `seconds`.
+        Only the window is evaluated, so the cost does not depend on the session length.
+        """
+        features = self.tracker.features
+        if features is None or len(features) == 0:
+            return None
+        n = int(round((seconds or self.window_seconds) * self.fps))
+        matrix = features.last(n)
+        timestamps = self.tracker.frame_index.last(len(matrix)) / self.fps
+        rows = self.extractor.rows_to_dicts(matrix, self.tracker.names)
+        result = self.evaluator.evaluate_unified(rows, every_n=every_n, fps=self.fps, timestamps=timestamps)
+        result.update({
+            "exercise": self.exercise_type,
+            "view": self.tracker.view,
+            "window_start_s": round(float(timestamps[0]), 2),
+            "window_end_s": round(float(timestamps[-1]), 2),
+            "session_reps": self.reps,
+        })
+        return result
+
+    def finish(self):
+        """Reports the reps still pending at the end of the stream."""
+        reps = self.tracker.finish()
+        self.reps += len(reps)
+        return reps
@@ -1,7 +1,14 @@
+import logging
 import mediapipe as mp
 import cv2
-import numpy as np
 import os
+from config import settings
+from services import metrics
+from services.landmark_buffer import LandmarkBuffer
+from services.roi_tracker import RoiTracker
+from services.pose_pool import get_pose_pool
+
+logger = logging.getLogger(__name__)
 
 
 # === Initialization ===
@@ -19,7 +26,88 @@ KEYPOINT_NAMES = [
 ]
 
 
-def extract_landmarks_from_video(video_path, draw=False, sample_rate=1):
+def warm_up_pose(model_complexities=(2,)):
+    """Fills this process' pose pools and runs every detector once on a blank frame."""
+    for model_complexity in model_complexities:
+        get_pose_pool(model_complexity).warm_up()
+
+
+def get_video_fps(video_path, default=30.0):
+    """Frame rate reported by the container (falls back to `default` if unknown)."""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0
+    cap.release()
+    return fps if fps and fps > 0 else default
+
+
+def _process(pose, image_bgr):
+    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+    image_rgb.flags.writeable = False
+    return pose.process(image_rgb)
+
+
+class _VideoDetector:
+    """
+    A borrowed video-mode Pose graph and the image region its tracking state refers to.
+
+    MediaPipe tracks the pose ROI and smooths landmarks across frames in the
+    coordinates of the images it is fed. When the crop box moves, or the frame is
+    re-detected in full after a lost crop, the graph is reset first so that the old
+    state is not applied in a different coordinate frame.
+    """
+
+    def __init__(self, pose):
+        self.pose = pose
+        self.box = None  # region of the last processed image (None = full frame)
+
+    def reset(self):
+        """Drops the tracking state (e.g. after another detector handled the frames in between)."""
+        self.pose.reset()
+
+    def process(self, image, box):
+        if box != self.box:
+            self.pose.reset()
+            self.box = box
+        return _process(self.pose, image)
+
+
+def _write_landmarks(row, landmarks):
+    """Copies MediaPipe landmarks into a preallocated (33, 4) float32 row, without temporary lists."""
+    for i, lm in enumerate(landmarks):
+        row[i, 0] = lm.x
+        row[i, 1] = lm.y
+        row[i, 2] = lm.z
+        row[i, 3] = lm.visibility
+    return row
+
+
+def _detect(detector, frame, roi):
+    """Runs one detector on a frame, inside the tracked ROI if any; returns (results, box)."""
+    # Crop to the tracked athlete, then convert to RGB (only the crop is converted)
+    image, box = roi.crop(frame) if roi is not None else (frame, None)
+    results = detector.process(image, box)
+    if roi is not None:
+        if not results.pose_landmarks and box is not None:
+            # tracking lost inside the crop: detect again on the full frame (resets the graph)
+            roi.reset()
+            box = None
+            results = detector.process(frame, None)
+            metrics.ROI_FALLBACKS.inc()
+        if not results.pose_landmarks:
+            roi.reset()
+    return results, box
+
+
+def _mean_visibility(results):
+    if not results.pose_landmarks:
+        return 0.0
+    landmarks = results.pose_landmarks.landmark
+    return sum(lm.visibility for lm in landmarks) / len(landmarks)
+
+
+def extract_landmarks_from_video(video_path, draw=False, sample_rate=1, on_progress=None, progress_every=15,
+                                 roi_tracking=None, model_complexity=2, escalate_complexity=None,
+                                 min_visibility=0.6, recover_frames=15, return_mask=False):
     """
     Extract 3D pose landmarks from a video using MediaPipe Pose.
 
@@ -27,82 +115,142 @@ def extract_landmarks_from_video(video_path, draw=False, sample_rate=1):
         video_path (str): Path to the input video file.
         draw (bool): Whether to visualize landmarks on frames.
         sample_rate (int): Process every Nth frame (to speed up processing).
+        on_progress (callable): Optional `on_progress(frames_decoded, total_frames,
+                                poses_detected, landmarks_so_far)`, called every
+                                `progress_every` processed frames and once at the end.
+                                `landmarks_so_far` is a (n, 33, 4) view of the rows written
+                                so far (read-only, only valid during the call).
+                                Raising from it aborts the extraction.
+        progress_every (int): Processed frames between on_progress calls.
+        roi_tracking (bool): Crop each frame around the previous pose before inference
+                             (see services/roi_tracker.py). Defaults to settings.roi_tracking.
+        model_complexity (int): MediaPipe Pose model (0 lite, 1 full, 2 heavy).
+        escalate_complexity (int): If set, frames whose mean landmark visibility is below
+                                   `min_visibility` are re-run with this (heavier) model,
+                                   which then stays on until `recover_frames` frames
+                                   in a row are visible again. The detector taking
+                                   over is reset, so neither resumes from tracking
+                                   state of frames it did not see.
+        return_mask (bool): Also return the (T,) bool mask of frames with a detected pose.
 
     Returns:
-        list[np.ndarray]: A list of numpy arrays, each shape = (33, 3)
-                          representing (x, y, z) coordinates per frame.
+        np.ndarray: contiguous float32 array, shape = (T, 33, 4)
+                    representing (x, y, z, visibility) per landmark and frame
+                    (all zeros for frames without a detected pose),
+                    or (landmarks, detected_mask) with return_mask=True.
     """
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video not found: {video_path}")
 
-    # Initialize MediaPipe pose detector
-    pose = mp_pose.Pose(
-        model_complexity=2,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5,
-        static_image_mode=False
-    )
-
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise RuntimeError(f"Could not open video: {video_path}")
 
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     fps = cap.get(cv2.CAP_PROP_FPS)
-    print(f"Video loaded: {total_frames} frames @ {fps:.2f} FPS")
+    logger.info("Video loaded: %d frames @ %.2f FPS (model complexity %d)", total_frames, fps, model_complexity)
 
-    landmarks_sequence = []
+    # Borrow a warmed MediaPipe pose detector from this worker's pool
+    pose_pool = get_pose_pool(model_complexity)
+    pose = pose_pool.checkout()
+    detector = _VideoDetector(pose)
+    # heavier detector for low-visibility segments, borrowed on first use
+    heavy_pool = get_pose_pool(escalate_complexity) if escalate_complexity is not None else None
+    heavy = heavy_detector = None
+    escalated = False
+    visible_streak = 0
+    escalated_frames = 0
+
+    # ROI cropping is skipped when drawing: the drawn landmarks are crop-relative
+    if roi_tracking is None:
+        roi_tracking = settings.roi_tracking
+    roi = RoiTracker(padding=settings.roi_padding, max_side=settings.roi_max_side) \
+        if roi_tracking and not draw else None
+
+    # one preallocated float32 buffer for the whole clip (grows if the frame count was off)
+    buffer = LandmarkBuffer(total_frames // max(sample_rate, 1) + 1 if total_frames > 0 else 256)
     frame_count = 0
     detected_frames = 0
+    log_progress = logger.isEnabledFor(logging.DEBUG)
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame_count += 1
-
-        # Skip frames according to sample_rate
-        if frame_count % sample_rate != 0:
-            continue
-
-        # Convert to RGB
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image_rgb.flags.writeable = False
-        results = pose.process(image_rgb)
-        image_rgb.flags.writeable = True
-
-        if results.pose_landmarks:
-            detected_frames += 1
-            landmarks = np.array(
-                [[lm.x, lm.y, lm.z] for lm in results.pose_landmarks.landmark],
-                dtype=np.float32
-            )
-            landmarks_sequence.append(landmarks)
-
-            if draw:
-                mp_drawing.draw_landmarks(
-                    frame,
-                    results.pose_landmarks,
-                    mp_pose.POSE_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=1)
-                )
-                cv2.imshow("Pose Detection", frame)
-                if cv2.waitKey(1) & 0xFF == 27:  # ESC to stop
-                    break
-        else:
-            # Add zero frame if no pose detected
-            landmarks_sequence.append(np.zeros((33, 3), dtype=np.float32))
-
-        if frame_count % 50 == 0:
-            print(f"Processed {frame_count}/{total_frames} frames "
-                  f"({frame_count/total_frames*100:.1f}%)")
+    try:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame_count += 1
 
-    cap.release()
-    pose.close()
-    if draw:
-        cv2.destroyAllWindows()
+            # Skip frames according to sample_rate
+            if frame_count % sample_rate != 0:
+                continue
+
+            if escalated:
+                results, box = _detect(heavy_detector, frame, roi)
+                escalated_frames += 1
+                visible_streak = visible_streak + 1 if _mean_visibility(results) >= min_visibility else 0
+                if visible_streak >= recover_frames:
+                    escalated = False
+                    # the lite detector's state is from before the heavy segment
+                    detector.reset()
+            else:
+                results, box = _detect(detector, frame, roi)
+                if heavy_pool is not None and _mean_visibility(results) < min_visibility:
+                    # low-visibility segment: the heavy model takes over from this frame on
+                    if heavy is None:
+                        heavy = heavy_pool.checkout()
+                        heavy_detector = _VideoDetector(heavy)
+                    else:
+                        # stale state from the previous heavy segment
+                        heavy_detector.reset()
+                    results, box = _detect(heavy_detector, frame, roi)
+                    escalated, visible_streak = True, 0
+                    escalated_frames += 1
+
+            if results.pose_landmarks:
+                detected_frames += 1
+                landmarks = _write_landmarks(buffer.next_row(), results.pose_landmarks.landmark)
+                if roi is not None:
+                    roi.update(roi.to_frame(landmarks, box, frame.shape), frame.shape)
+
+                if draw:
+                    mp_drawing.draw_landmarks(
+                        frame,
+                        results.pose_landmarks,
+                        mp_pose.POSE_CONNECTIONS,
+                        mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+                        mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=1)
+                    )
+                    cv2.imshow("Pose Detection", frame)
+                    if cv2.waitKey(1) & 0xFF == 27:  # ESC to stop
+                        break
+            else:
+                # zero row if no pose detected
+                buffer.append(None)
+
+            if log_progress and frame_count % 50 == 0:
+                logger.debug("Processed %d/%d frames (%.1f%%)",
+                             frame_count, total_frames, frame_count / max(total_frames, 1) * 100)
+            if on_progress is not None and len(buffer) % progress_every == 0:
+                on_progress(frame_count, total_frames, detected_frames, buffer.landmarks)
+        if on_progress is not None:
+            on_progress(frame_count, total_frames, detected_frames, buffer.landmarks)
+    finally:
+        cap.release()
+        pose_pool.checkin(pose)
+        if heavy is not None:
+            heavy_pool.checkin(heavy)
+        if draw:
+            cv2.destroyAllWindows()
 
-    print(f"\nDone: {len(landmarks_sequence)} frames processed, "
-          f"{detected_frames} with detected pose landmarks.")
-    return landmarks_sequence
+    if escalated_frames:
+        metrics.ESCALATED_FRAMES.inc(escalated_frames)
+        logger.info("Heavy model used on %d low-visibility frames", escalated_frames)
+    metrics.FRAMES_PROCESSED.inc(len(buffer))
+    metrics.POSES_DETECTED.inc(detected_frames)
+    if len(buffer):
+        metrics.POSE_DETECTION_RATE.set(detected_frames / len(buffer))
+    logger.info("Done: %d frames processed, %d with detected pose landmarks.",
+                len(buffer), detected_frames)
+    if return_mask:
+        return buffer.landmarks, buffer.detected
+    return buffer.landmarks
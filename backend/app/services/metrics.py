@@ -0,0 +1,344 @@
+"""
+In-process metrics with Prometheus text exposition (served by routes/metrics.py).
+
+Only the three primitive types the service needs are implemented (counter, gauge,
+histogram); all of them are thread-safe and support a fixed set of label names.
+
+Under gunicorn every worker has its own registry. With METRICS_MULTIPROC_DIR set
+(gunicorn.conf.py sets it), each worker writes a snapshot of its metrics to
+<dir>/<pid>.json every METRICS_FLUSH_SECONDS, and /metrics, whichever worker
+answers it, merges the snapshots of all workers: counters and histograms are
+summed (exited workers included, so they never go down), gauges are reported
+per live worker with a "pid" label. Other workers' values are at most one flush
+interval old.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[n] for n in self.labelnames)
+
+    def snapshot(self):
+        """This process' samples as JSON-serializable [[label values], value] pairs."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, snapshots, live):
+        """
+        Samples of all processes from {pid: snapshot()}; `live` holds the running pids.
+        Returns (samples, labelnames).
+        """
+        total = {}
+        for items in snapshots.values():
+            for key, value in items:
+                key = tuple(key)
+                total[key] = self._add(total[key], value) if key in total else value
+        return total, self.labelnames
+
+    @staticmethod
+    def _add(a, b):
+        return a + b
+
+    def render(self, samples=None, labelnames=None):
+        """Text lines of this process' samples, or of the given merged ones."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        if samples is None:
+            with self._lock:
+                samples = dict(self._values)
+        labelnames = self.labelnames if labelnames is None else labelnames
+        for key, value in sorted(samples.items()):
+            lines.extend(self._render_sample(labelnames, key, value))
+        return lines
+
+    def _render_sample(self, labelnames, key, value):
+        return [f"{self.name}{_format_labels(labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        """Value in this process."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def merge(self, snapshots, live):
+        """Gauges do not add up across processes: one sample per live process, labelled by pid."""
+        samples = {}
+        for pid, items in snapshots.items():
+            if pid in live:
+                for key, value in items:
+                    samples[tuple(key) + (str(pid),)] = value
+        return samples, self.labelnames + ("pid",)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), {"counts": list(state["counts"]), "sum": state["sum"], "count": state["count"]}]
+                    for key, state in self._values.items()]
+
+    @staticmethod
+    def _add(a, b):
+        return {"counts": [x + y for x, y in zip(a["counts"], b["counts"])],
+                "sum": a["sum"] + b["sum"], "count": a["count"] + b["count"]}
+
+    def _render_sample(self, labelnames, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            le = [("le", _format_value(bound))]
+            lines.append(f"{self.name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        labels = _format_labels(labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format (0.0.4)."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                return self._metrics[metric.name]
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Text exposition of this process, or of all workers when a multiprocess directory is set."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        directory = os.environ.get("METRICS_MULTIPROC_DIR")
+        lines = []
+        if not directory:
+            for metric in metrics:
+                lines.extend(metric.render())
+            return "\n".join(lines) + "\n"
+
+        snapshots = _read_snapshots(directory)
+        snapshots[os.getpid()] = self.snapshot()  # this worker's values are always current
+        live = {pid for pid in snapshots if _alive(pid)}
+        for metric in metrics:
+            per_pid = {pid: snapshot.get(metric.name, []) for pid, snapshot in snapshots.items()}
+            lines.extend(metric.render(*metric.merge(per_pid, live)))
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def write_snapshot(self, directory=None):
+        """Writes this process' metrics to <directory>/<pid>.json (atomically)."""
+        directory = directory or os.environ.get("METRICS_MULTIPROC_DIR")
+        if not directory:
+            return
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def start_snapshot_writer(self, interval_s=5.0):
+        """Background thread writing this worker's snapshot every `interval_s` (multiprocess mode only)."""
+        if not os.environ.get("METRICS_MULTIPROC_DIR"):
+            return None
+
+        def run():
+            while True:
+                try:
+                    self.write_snapshot()
+                except OSError:
+                    logger.exception("Could not write the metrics snapshot")
+                time.sleep(interval_s)
+
+        thread = threading.Thread(target=run, name="metrics-snapshot", daemon=True)
+        thread.start()
+        return thread
+
+
+def _read_snapshots(directory):
+    snapshots = {}
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext != ".json" or not stem.isdigit():
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                snapshots[int(stem)] = json.load(f)
+        except (OSError, ValueError):
+            continue  # being replaced right now: skipped for this scrape
+    return snapshots
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+REGISTRY = MetricsRegistry()
+
+# === Assessment pipeline metrics ===
+STAGE_LATENCY = REGISTRY.histogram(
+    "assessment_stage_seconds",
+    "Latency of assessment pipeline stages.",
+    labelnames=("stage",),
+)
+REQUESTS = REGISTRY.counter(
+    "assessment_requests_total",
+    "Finished assessment requests by outcome.",
+    labelnames=("status",),
+)
+BATCH_CLIPS = REGISTRY.counter(
+    "assessment_batch_clips_total",
+    "Clips finished inside batch assessment requests by outcome.",
+    labelnames=("status",),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "assessment_queue_depth",
+    "Assessment requests accepted but not finished yet.",
+)
+LIVE_SESSIONS = REGISTRY.gauge(
+    "live_sessions_active",
+    "Open live assessment WebSocket sessions.",
+)
+FRAMES_PROCESSED = REGISTRY.counter(
+    "assessment_frames_processed_total",
+    "Video frames passed to the pose detector.",
+)
+POSES_DETECTED = REGISTRY.counter(
+    "assessment_poses_detected_total",
+    "Frames in which the pose detector found a person.",
+)
+ROI_FALLBACKS = REGISTRY.counter(
+    "roi_fallbacks_total",
+    "Frames re-detected on the full image after the pose was lost inside the ROI crop.",
+)
+ESCALATED_FRAMES = REGISTRY.counter(
+    "pose_escalated_frames_total",
+    "Frames the auto quality tier re-ran with the heavy model (low visibility).",
+)
+POSE_DETECTION_RATE = REGISTRY.gauge(
+    "assessment_pose_detection_ratio",
+    "Share of processed frames with a detected pose in the last video.",
+)
+POSE_DETECTORS_IN_USE = REGISTRY.gauge(
+    "pose_detectors_in_use",
+    "MediaPipe Pose instances currently processing a video.",
+)
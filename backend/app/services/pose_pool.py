@@ -0,0 +1,143 @@
+"""
+Per-process pool of warmed MediaPipe Pose detectors.
+
+Pose graphs are not fork-safe, so pools are created lazily inside each worker
+process and dropped in a child right after fork (os.register_at_fork).
+
+Detectors run in video mode: their tracking ROI and landmark smoothing carry over
+from frame to frame. A reused detector is reset on checkout, so nothing of the
+previous clip leaks into the first frames of the next one.
+"""
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from config import settings
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+POSE_POOL_SIZE = metrics.REGISTRY.gauge(
+    "pose_pool_size",
+    "MediaPipe Pose instances created in this worker's pool.",
+)
+
+
+class PosePool:
+    """
+    Bounded pool of Pose detectors with identical settings.
+    Instances are created on demand up to `size`; acquire() blocks when all are busy.
+    """
+
+    def __init__(self, size=1, model_complexity=2, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        self.size = max(int(size), 1)
+        self.pose_kwargs = {
+            "model_complexity": model_complexity,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+            "static_image_mode": False,
+        }
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create(self):
+        import mediapipe as mp
+
+        pose = mp.solutions.pose.Pose(**self.pose_kwargs)
+        POSE_POOL_SIZE.inc()
+        logger.info("Created pose detector %d/%d (complexity=%d)",
+                    self._created, self.size, self.pose_kwargs["model_complexity"])
+        return pose
+
+    def checkout(self, timeout=None):
+        """
+        Borrows a detector with fresh tracking state; the LIFO order keeps the most
+        recently used one hot.
+        """
+        try:
+            pose = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if not create:
+                pose = self._idle.get(timeout=timeout)
+            else:
+                try:
+                    pose = self._create()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                metrics.POSE_DETECTORS_IN_USE.inc()
+                return pose
+        # drop the previous clip's tracking ROI and smoothing state
+        pose.reset()
+        metrics.POSE_DETECTORS_IN_USE.inc()
+        return pose
+
+    def checkin(self, pose):
+        """Returns a detector taken with checkout()."""
+        metrics.POSE_DETECTORS_IN_USE.dec()
+        self._idle.put(pose)
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        pose = self.checkout(timeout)
+        try:
+            yield pose
+        finally:
+            self.checkin(pose)
+
+    def warm_up(self):
+        """Creates every detector up front and runs each once on a blank frame."""
+        import numpy as np
+
+        with self._lock:
+            missing = self.size - self._created
+            self._created = self.size
+        for _ in range(missing):
+            pose = self._create()
+            pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+            self._idle.put(pose)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pose_pool(model_complexity=2):
+    """Process-wide pool for one model complexity (created on first use)."""
+    pool = _pools.get(model_complexity)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(model_complexity)
+            if pool is None:
+                pool = PosePool(size=settings.pose_pool_size, model_complexity=model_complexity)
+                _pools[model_complexity] = pool
+    return pool
+
+
+def reset_after_fork():
+    """Forget pools inherited from the parent; the child builds its own detectors."""
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+    POSE_POOL_SIZE.set(0)
+    metrics.POSE_DETECTORS_IN_USE.set(0)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
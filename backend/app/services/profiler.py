@@ -0,0 +1,138 @@
+"""
+Low-overhead sampling profiler for slow assessment requests.
+
+A daemon thread periodically snapshots the stack of the profiled thread
+(sys._current_frames) and counts identical stacks. Profiles are stored in the
+"folded" format (`frame;frame;frame count` per line) that flamegraph.pl,
+speedscope and inferno read directly.
+"""
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".folded"
+_NAME_RE = re.compile(r"^[\w.\-]+\.folded$")
+
+
+class SamplingProfiler:
+    """Samples the call stack of one thread every `interval` seconds."""
+
+    def __init__(self, interval=0.005, thread_id=None, max_depth=128):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _frame_stack(self, frame):
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._frame_stack(frame)] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def folded(self):
+        """Profile in the folded-stacks format."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+def should_profile(requested=False):
+    """Opt-in decision: profiling must be enabled, then header or sampling rate selects the request."""
+    if not settings.profile_enabled:
+        return False
+    return requested or random.random() < settings.profile_sample_rate
+
+
+@contextmanager
+def maybe_profile(label, requested=False):
+    """
+    Profiles the enclosed block if selected by should_profile and stores the
+    profile when it took at least settings.profile_min_seconds.
+    """
+    if not should_profile(requested):
+        yield
+        return
+
+    profiler = SamplingProfiler(interval=settings.profile_interval_s).start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        elapsed = time.perf_counter() - start
+        if elapsed >= settings.profile_min_seconds and profiler.samples:
+            path = save_profile(profiler, label, elapsed)
+            logger.info("Stored profile of slow request (%.1f s): %s", elapsed, path)
+
+
+def save_profile(profiler, label, elapsed):
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    safe_label = re.sub(r"[^\w\-]", "_", label)[:40]
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}_{elapsed:.1f}s_{safe_label}{PROFILE_SUFFIX}"
+    path = os.path.join(settings.profile_dir, name)
+    with open(path, "w") as f:
+        f.write(profiler.folded())
+    _prune_profiles()
+    return path
+
+
+def _prune_profiles():
+    profiles = list_profiles()
+    for entry in profiles[settings.profile_max_files:]:
+        try:
+            os.remove(os.path.join(settings.profile_dir, entry["name"]))
+        except OSError:
+            pass
+
+
+def list_profiles():
+    """Stored profiles, newest first."""
+    if not os.path.isdir(settings.profile_dir):
+        return []
+    entries = []
+    for name in os.listdir(settings.profile_dir):
+        if not _NAME_RE.match(name):
+            continue
+        stat = os.stat(os.path.join(settings.profile_dir, name))
+        entries.append({"name": name, "size_bytes": stat.st_size, "created": stat.st_mtime})
+    return sorted(entries, key=lambda e: e["created"], reverse=True)
+
+
+def profile_path(name):
+    """Absolute path of a stored profile, or None for unknown / unsafe names."""
+    if not _NAME_RE.match(name):
+        return None
+    path = os.path.join(settings.profile_dir, name)
+    return path if os.path.isfile(path) else None
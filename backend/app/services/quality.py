@@ -0,0 +1,86 @@
+"""
+Quality / latency tiers of the pose extraction.
+
+    fast      MediaPipe complexity 0 (lite), every 2nd frame
+    balanced  complexity 1 (full), every frame
+    accurate  complexity 2 (heavy), every frame
+    auto      lite on every frame, escalating to heavy on low-visibility segments
+
+Each MediaPipe complexity has its own pose pool (services/pose_pool.py). Under load
+(assessment queue depth at QUALITY_DEGRADE_DEPTHS) requests are served one or more
+tiers cheaper than asked for. The tier is resolved once per request, before the
+request (or the clips of a batch) is added to the queue, so a request's own work
+never counts against it.
+"""
+import logging
+from typing import NamedTuple, Optional
+
+from config import settings
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QualityTier(NamedTuple):
+    name: str
+    model_complexity: int
+    sample_rate: int
+    # complexity used on low-visibility segments (None = no escalation)
+    escalate_complexity: Optional[int] = None
+
+
+TIERS = {
+    "fast": QualityTier("fast", model_complexity=0, sample_rate=2),
+    "balanced": QualityTier("balanced", model_complexity=1, sample_rate=1),
+    "accurate": QualityTier("accurate", model_complexity=2, sample_rate=1),
+    "auto": QualityTier("auto", model_complexity=0, sample_rate=1, escalate_complexity=2),
+}
+# next cheaper tier, one step of degradation
+CHEAPER = {"accurate": "balanced", "balanced": "fast", "auto": "fast", "fast": "fast"}
+
+TIER_REQUESTS = metrics.REGISTRY.counter(
+    "quality_tier_requests_total",
+    "Assessments by requested and served quality tier.",
+    labelnames=("requested", "served"),
+)
+
+
+def degrade_steps(queue_depth):
+    """Number of tiers to step down at the given queue depth."""
+    return sum(queue_depth >= depth for depth in settings.quality_degrade_depths)
+
+
+def resolve_tier(requested=None, queue_depth=None):
+    """
+    Tier that serves a request: the requested one (default settings.default_quality),
+    stepped down when the assessment queue is deep. Call it before the request is
+    counted in metrics.QUEUE_DEPTH.
+
+    Raises:
+        ValueError: unknown tier name
+    """
+    name = (requested or settings.default_quality).strip().lower()
+    if name not in TIERS:
+        raise ValueError(f"Unsupported quality tier: {name} (use one of {', '.join(TIERS)})")
+
+    if queue_depth is None:
+        queue_depth = metrics.QUEUE_DEPTH.get()
+    steps = degrade_steps(queue_depth)
+    served = name
+    for _ in range(steps):
+        served = CHEAPER[served]
+    if served != name:
+        logger.info("Queue depth %d: serving quality %s instead of %s", queue_depth, served, name)
+    TIER_REQUESTS.inc(requested=name, served=served)
+    return TIERS[served]
+
+
+def tier_complexities(names):
+    """MediaPipe complexities used by the given tiers (for warmup)."""
+    out = set()
+    for name in names:
+        tier = TIERS[name]
+        out.add(tier.model_complexity)
+        if tier.escalate_complexity is not None:
+            out.add(tier.escalate_complexity)
+    return sorted(out)
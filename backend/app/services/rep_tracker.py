@@ -0,0 +1,141 @@
+"""
+Preliminary rep-level scores while a video is still being decoded (or a live
+session is still running).
+
+LiveRepTracker consumes landmark rows as they arrive (see
+extract_landmarks_from_video(on_progress=...)). It featurizes only the new rows
+and reports every rep completed since the last update. Features live in
+fixed-size ring buffers. Rep segmentation only looks at the new tail plus an
+overlap long enough to hold one rep, so memory and per-frame cost do not grow
+with the length of the session. It works on raw (unsmoothed) landmarks, so its
+scores are a preview. The final result of the full pipeline is the
+authoritative one.
+"""
+import numpy as np
+
+from models.ring_buffer import RingBuffer
+from models.temporal_features import TemporalFeatureExtractor
+
+
+class LiveRepTracker:
+    """Incremental rep segmentation and per-rep scoring of one clip or live session."""
+
+    def __init__(self, extractor, evaluator, fps=30.0, min_view_frames=15, confirm_seconds=0.3,
+                 min_visibility=0.5, history_seconds=60.0, overlap_seconds=8.0):
+        """
+        Args:
+            extractor: FeatureExtractor used by the pipeline
+            evaluator: rule evaluator of the clip's exercise (BaseRuleEvaluator)
+            fps: frame rate of the clip
+            min_view_frames: detected frames collected before the camera view is fixed
+            confirm_seconds: a rep is reported once its closing top lies this far in the past
+            min_visibility: frames whose evaluator.REQUIRED_JOINTS are less visible are skipped
+            history_seconds: feature rows kept in the ring buffers (bounds memory)
+            overlap_seconds: already-scanned rows scanned again with every update; must
+                             hold the longest expected rep
+        """
+        self.extractor = extractor
+        self.evaluator = evaluator
+        self.fps = fps
+        self.min_view_frames = min_view_frames
+        self.min_visibility = min_visibility
+        self.confirm_frames = max(int(round(confirm_seconds * fps)), 3)
+        self.overlap_frames = max(int(round(overlap_seconds * fps)), self.confirm_frames + 1)
+        self.history_frames = max(int(round(history_seconds * fps)), 2 * self.overlap_frames)
+        self.temporal = TemporalFeatureExtractor(fps=fps)
+
+        self.view = None
+        self.names = None
+        self._consumed = 0
+        self._pending = []      # (n, 33, 4) blocks of detected rows waiting for the view to be fixed
+        self._pending_idx = []
+        self.features = None    # RingBuffer of feature rows, created once the schema is known
+        self.frame_index = RingBuffer(self.history_frames, dtype=np.int64)
+        self._new_rows = 0      # feature rows not scanned for reps yet
+        self._last_end = -1     # absolute feature row where the last reported rep ended
+        self._reported = 0
+
+    def update(self, landmarks_so_far):
+        """
+        Consumes the rows appended to a growing landmark array since the last call.
+
+        Returns:
+            list[dict]: newly completed reps {"rep", "start_s", "bottom_s", "end_s", "score", "feedback"}
+        """
+        reps = self.push(landmarks_so_far[self._consumed:], first_frame=self._consumed)
+        self._consumed = len(landmarks_so_far)
+        return reps
+
+    def push(self, rows, first_frame):
+        """Consumes a block of (n, 33, 4) landmark rows whose first row is frame `first_frame`."""
+        rows = np.asarray(rows)
+        if len(rows):
+            # all-zero rows are frames without a detected pose
+            detected = np.flatnonzero(rows.any(axis=(1, 2)))
+            if len(detected):
+                self._pending.append(rows[detected])  # fancy indexing copies out of the caller's buffer
+                self._pending_idx.extend((detected + first_frame).tolist())
+        if self.view is None and len(self._pending_idx) < self.min_view_frames:
+            return []
+        return self._flush()
+
+    def finish(self):
+        """Reports the remaining reps once the whole clip was decoded."""
+        return self._flush(final=True)
+
+    def _flush(self, final=False):
+        if self._pending:
+            points = np.concatenate(self._pending)
+            frames = np.asarray(self._pending_idx, dtype=np.int64)
+            self._pending, self._pending_idx = [], []
+            if self.view is None:
+                self.view = self.extractor.detect_sequence_view(points)
+            confident = self.extractor.joint_confidence(
+                points, self.evaluator.REQUIRED_JOINTS) >= self.min_visibility
+            if confident.any():
+                matrix, self.names = self.extractor.build_feature_matrix(points[confident], view=self.view)
+                if self.features is None:
+                    self.features = RingBuffer(self.history_frames, row_shape=(len(self.names),))
+                self.features.extend(matrix)
+                self.frame_index.extend(frames[confident])
+                self._new_rows += len(matrix)
+        if self.features is None or not (self._new_rows or final):
+            return []
+        return self._completed_reps(final)
+
+    def _completed_reps(self, final=False):
+        column = self.evaluator.primary_column(self.names)
+        if column is None:
+            return []
+        # only the new tail plus an overlap that holds the rep still in progress
+        window = self.features.last(self._new_rows + self.overlap_frames)
+        frames = self.frame_index.last(len(window))
+        base = self.features.total - len(window)   # absolute row of window[0]
+        self._new_rows = 0
+
+        reps = self.temporal.segment_reps(window[:, column])
+        if len(reps) == 0:
+            return []
+        keep = reps[:, 0] + base >= self._last_end
+        if base > 0:
+            # a top padded in at the cut-off window start is not a real one
+            keep &= reps[:, 0] > 0
+        if not final:
+            # the latest top may still move while the joint keeps extending
+            keep &= reps[:, 2] < len(window) - self.confirm_frames
+
+        out = []
+        for start, bottom, end in reps[keep]:
+            rows = self.extractor.rows_to_dicts(window[start:end + 1], self.names)
+            frame_res = self.evaluator.evaluate_sequence(rows, every_n=1)
+            self._reported += 1
+            self._last_end = int(end) + base
+            out.append({
+                "rep": self._reported,
+                "start_s": round(frames[start] / self.fps, 2),
+                "bottom_s": round(frames[bottom] / self.fps, 2),
+                "end_s": round(frames[end] / self.fps, 2),
+                "score": round(float(frame_res["mean_score"]), 1),
+                "feedback": frame_res["feedback"],
+            })
+        return out
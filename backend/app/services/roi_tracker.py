@@ -0,0 +1,100 @@
+"""
+Region-of-interest tracking for pose inference.
+
+The previous frame's landmarks give a padded bounding box around the athlete.
+The next frame is cropped to that box and downscaled before pose.process, so
+the detector sees the person at a larger relative size and converts and copies
+fewer pixels. When the pose is lost inside the crop, the frame is detected
+again on the full image.
+
+The box is kept fixed while the person stays well inside it. MediaPipe's own
+video-mode tracking and smoothing run in crop coordinates, so the extractor
+resets the pose graph whenever the box changes (or the full-frame fallback
+runs). A stable box keeps those resets rare.
+"""
+import cv2
+import numpy as np
+
+
+class RoiTracker:
+    """Stable padded bounding box of the athlete, in pixels of the full frame."""
+
+    def __init__(self, padding=0.25, max_side=512, max_coverage=0.6, min_side=48):
+        """
+        Args:
+            padding: box margin around the landmarks, as a fraction of the landmark box size
+            max_side: longer side (px) the crop is downscaled to before inference
+            max_coverage: use the full frame when the box would cover more of its area
+            min_side: smallest box side (px), guards against collapsed landmark boxes
+        """
+        self.padding = padding
+        self.max_side = max_side
+        self.max_coverage = max_coverage
+        self.min_side = min_side
+        self.box = None  # (x0, y0, x1, y1) in pixels, None = full frame
+
+    def reset(self):
+        self.box = None
+
+    def crop(self, frame):
+        """
+        Image to run inference on.
+
+        Returns:
+            tuple[np.ndarray, tuple | None]: the (possibly cropped and downscaled)
+            image and the box it was taken from (None for the full frame)
+        """
+        box = self.box
+        image = frame if box is None else frame[box[1]:box[3], box[0]:box[2]]
+        h, w = image.shape[:2]
+        scale = self.max_side / max(h, w)
+        if scale < 1:
+            image = cv2.resize(image, (max(int(w * scale), 1), max(int(h * scale), 1)),
+                               interpolation=cv2.INTER_AREA)
+        return image, box
+
+    @staticmethod
+    def to_frame(landmarks, box, frame_shape):
+        """
+        Maps normalized crop landmarks (x, y, z, ...) to normalized full-frame coordinates, in place.
+        MediaPipe scales z like x, so z follows the horizontal crop factor.
+        """
+        if box is None:
+            return landmarks
+        frame_h, frame_w = frame_shape[:2]
+        x0, y0, x1, y1 = box
+        sx = (x1 - x0) / frame_w
+        sy = (y1 - y0) / frame_h
+        landmarks[:, 0] = landmarks[:, 0] * sx + x0 / frame_w
+        landmarks[:, 1] = landmarks[:, 1] * sy + y0 / frame_h
+        landmarks[:, 2] *= sx
+        return landmarks
+
+    def update(self, landmarks, frame_shape):
+        """Moves the box for the next frame from full-frame normalized landmarks."""
+        frame_h, frame_w = frame_shape[:2]
+        xy = np.clip(landmarks[:, :2], 0.0, 1.0) * (frame_w, frame_h)
+        (lx0, ly0), (lx1, ly1) = xy.min(axis=0), xy.max(axis=0)
+
+        if self.box is not None:
+            # keep the box while the person stays inside it with half the margin left
+            x0, y0, x1, y1 = self.box
+            mx = (lx1 - lx0) * self.padding / 2
+            my = (ly1 - ly0) * self.padding / 2
+            inside = lx0 - mx >= x0 and ly0 - my >= y0 and lx1 + mx <= x1 and ly1 + my <= y1
+            # ...and still fills a reasonable part of it (the athlete did not walk away)
+            filled = (lx1 - lx0) * (ly1 - ly0) >= 0.25 * (x1 - x0) * (y1 - y0)
+            if inside and filled:
+                return self.box
+
+        pad_x = max((lx1 - lx0) * self.padding, self.min_side / 2)
+        pad_y = max((ly1 - ly0) * self.padding, self.min_side / 2)
+        x0 = int(max(lx0 - pad_x, 0))
+        y0 = int(max(ly0 - pad_y, 0))
+        x1 = int(min(np.ceil(lx1 + pad_x), frame_w))
+        y1 = int(min(np.ceil(ly1 + pad_y), frame_h))
+        if (x1 - x0) * (y1 - y0) > self.max_coverage * frame_w * frame_h:
+            self.box = None  # person fills the frame: cropping buys nothing
+        else:
+            self.box = (x0, y0, x1, y1)
+        return self.box
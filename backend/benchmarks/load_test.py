@@ -0,0 +1,125 @@
+"""
+Concurrent load test against a running backend (e.g. the gunicorn container).
+
+Posts the same video `--requests` times with `--concurrency` parallel clients and
+reports throughput and latency percentiles as JSON. Without --video a synthetic
+clip is rendered (needs cv2).
+
+Usage (from backend/):
+    python benchmarks/load_test.py --url http://localhost:8000/assessment/ \
+        --exercise squat --requests 40 --concurrency 8 --output load.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def multipart_body(fields, file_field, filename, payload):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        (f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+         "Content-Type: video/mp4\r\n\r\n").encode() + payload + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def post_once(url, body, content_type, timeout):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, TimeoutError) as e:
+        status = f"error: {e}"
+    return time.perf_counter() - start, status
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_load(url, video_bytes, filename, exercise, n_requests, concurrency, timeout):
+    body, content_type = multipart_body({"exercise_type": exercise}, "file", filename, video_bytes)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: post_once(url, body, content_type, timeout), range(n_requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(t for t, status in results if status == 200)
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "url": url,
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "statuses": statuses,
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "latency_s": {
+            "mean": statistics.fmean(latencies) if latencies else None,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test of /assessment/")
+    parser.add_argument("--url", default="http://localhost:8000/assessment/")
+    parser.add_argument("--video", help="video file to upload (default: synthetic clip)")
+    parser.add_argument("--exercise", default="squat")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    if args.video:
+        with open(args.video, "rb") as f:
+            video_bytes = f.read()
+        filename = os.path.basename(args.video)
+    else:
+        from synthetic import render_video, synthetic_landmarks
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "load_test.mp4")
+            render_video(path, synthetic_landmarks(args.exercise, n_frames=150))
+            with open(path, "rb") as f:
+                video_bytes = f.read()
+        filename = "load_test.mp4"
+
+    report = run_load(args.url, video_bytes, filename, args.exercise,
+                      args.requests, args.concurrency, args.timeout)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+End-to-end benchmark suite for the assessment pipeline.
+
+Times every stage separately on deterministic synthetic workloads and writes
+machine-readable JSON. With --baseline the medians are compared against a stored
+run and the script exits with code 1 on a regression.
+
+Usage (from backend/):
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --tolerance 0.25
+
+Stages whose dependencies are not installed (mediapipe, cv2, fastapi test client)
+are reported as skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import synthetic_landmarks, render_video  # noqa: E402
+
+
+def time_stage(fn, repeat=5, warmup=1):
+    """Runs fn() warmup + repeat times and returns timing stats in seconds."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+    }
+
+
+# ===============================
+# Stages
+# ===============================
+def bench_decode(ctx, repeat):
+    import cv2
+
+    def run():
+        cap = cv2.VideoCapture(ctx["video_path"])
+        frames = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+        cap.release()
+        ctx["frames"] = frames
+
+    return time_stage(run, repeat)
+
+
+def bench_pose_process(ctx, repeat):
+    import cv2
+    import mediapipe as mp
+
+    if "frames" not in ctx:
+        bench_decode(ctx, 1)
+    frames = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in ctx["frames"]]
+
+    def run():
+        with mp.solutions.pose.Pose(model_complexity=ctx["model_complexity"], static_image_mode=False) as pose:
+            for frame in frames:
+                pose.process(frame)
+
+    return time_stage(run, repeat, warmup=0)
+
+
+def bench_extraction(ctx, repeat, roi_tracking):
+    from services.mediapipe_extractor import extract_landmarks_from_video
+
+    return time_stage(lambda: extract_landmarks_from_video(ctx["video_path"], roi_tracking=roi_tracking),
+                      repeat, warmup=1)
+
+
+def bench_extraction_full_frame(ctx, repeat):
+    return bench_extraction(ctx, repeat, roi_tracking=False)
+
+
+def bench_extraction_roi(ctx, repeat):
+    return bench_extraction(ctx, repeat, roi_tracking=True)
+
+
+def bench_smoothing(ctx, repeat):
+    from services.landmark_smoothing import smooth_landmark_sequence
+
+    landmarks = ctx["landmarks"]
+    return time_stage(lambda: smooth_landmark_sequence(landmarks.copy()), repeat)
+
+
+def bench_build_feature_vector(ctx, repeat):
+    from models.feature_extractor import FeatureExtractor
+
+    extractor = FeatureExtractor()
+    landmarks = ctx["landmarks"]
+    return time_stage(lambda: [extractor.build_feature_vector(p, view="side") for p in landmarks], repeat)
+
+
+def bench_build_feature_matrix(ctx, repeat):
+    from models.feature_extractor import FeatureExtractor
+
+    extractor = FeatureExtractor()
+    landmarks = ctx["landmarks"]
+    return time_stage(lambda: extractor.build_feature_matrix(landmarks, view="side"), repeat)
+
+
+def bench_evaluate_unified(ctx, repeat):
+    from models.feature_extractor import FeatureExtractor
+    from models.estimator import ExerciseEvaluator
+
+    extractor = FeatureExtractor()
+    feature_sequence = extractor.build_feature_sequence(ctx["landmarks"], view="side")
+    evaluator = ExerciseEvaluator()
+    return time_stage(lambda: evaluator.evaluate(ctx["exercise"], feature_sequence), repeat)
+
+
+def bench_window_validation(ctx, repeat):
+    from models.autoencoder import DenseAutoencoder
+    from models.feature_extractor import FeatureExtractor
+    from services import artifacts
+
+    matrix, names = FeatureExtractor().build_feature_matrix(ctx["landmarks"], view="side")
+    model = (artifacts.get("window_autoencoder") or {}).get("side")
+    if model is None:  # same shape as the shipped model, random weights
+        f = matrix.shape[1]
+        model = DenseAutoencoder.initialize([8 * f, 128, 32, 8, 32, 128, 8 * f], np.zeros(f), np.ones(f), names,
+                                            np.random.default_rng(0), window=8, fps=30.0)
+    return time_stage(lambda: model.score_windows(matrix, names), repeat)
+
+
+def bench_endpoint(ctx, repeat):
+    from fastapi.testclient import TestClient
+
+    cwd = os.getcwd()
+    os.chdir(APP_DIR)
+    try:
+        from main import app
+        client = TestClient(app)
+        with open(ctx["video_path"], "rb") as f:
+            payload = f.read()
+
+        def run():
+            response = client.post(
+                "/assessment/",
+                data={"exercise_type": ctx["exercise"]},
+                files={"file": ("bench.mp4", payload, "video/mp4")},
+            )
+            response.raise_for_status()
+
+        return time_stage(run, repeat, warmup=0)
+    finally:
+        os.chdir(cwd)
+
+
+STAGES = {
+    "decode": bench_decode,
+    "pose_process": bench_pose_process,
+    "extraction_full_frame": bench_extraction_full_frame,
+    "extraction_roi": bench_extraction_roi,
+    "smoothing": bench_smoothing,
+    "build_feature_vector": bench_build_feature_vector,
+    "build_feature_matrix": bench_build_feature_matrix,
+    "evaluate_unified": bench_evaluate_unified,
+    "window_validation": bench_window_validation,
+    "endpoint": bench_endpoint,
+}
+VIDEO_STAGES = {"decode", "pose_process", "extraction_full_frame", "extraction_roi", "endpoint"}
+
+
+# ===============================
+# Baseline comparison
+# ===============================
+def compare_to_baseline(results, baseline, tolerance):
+    """Returns a list of regressions: stages whose median grew by more than tolerance."""
+    regressions = []
+    for name, base in baseline.get("stages", {}).items():
+        current = results["stages"].get(name, {})
+        if "median_s" not in base or "median_s" not in current:
+            continue
+        limit = base["median_s"] * (1 + base.get("tolerance", tolerance))
+        if current["median_s"] > limit:
+            regressions.append({
+                "stage": name,
+                "baseline_median_s": base["median_s"],
+                "median_s": current["median_s"],
+                "limit_s": limit,
+            })
+    return regressions
+
+
+def run(args):
+    ctx = {
+        "exercise": args.exercise,
+        "model_complexity": args.model_complexity,
+        "landmarks": synthetic_landmarks(args.exercise, n_frames=args.frames, fps=args.fps, seed=args.seed),
+    }
+    stages = args.stages or list(STAGES)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "exercise": args.exercise,
+            "frames": args.frames,
+            "fps": args.fps,
+            "seed": args.seed,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": {},
+    }
+    try:
+        from models import geometry_kernels
+        results["meta"]["geometry_backend"] = geometry_kernels.BACKEND
+    except ImportError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if VIDEO_STAGES & set(stages):
+            try:
+                ctx["video_path"] = render_video(os.path.join(tmp, "synthetic.mp4"), ctx["landmarks"], fps=args.fps)
+            except ImportError as e:
+                print(f"Cannot render synthetic video: {e}")
+
+        for name in stages:
+            if name in VIDEO_STAGES and "video_path" not in ctx:
+                results["stages"][name] = {"skipped": "no synthetic video (opencv missing)"}
+                continue
+            try:
+                stats = STAGES[name](ctx, args.repeat)
+            except ImportError as e:
+                results["stages"][name] = {"skipped": f"missing dependency: {e.name}"}
+                continue
+            stats["frames_per_s"] = args.frames / stats["median_s"] if stats["median_s"] > 0 else None
+            results["stages"][name] = stats
+            print(f"{name:22s} median {stats['median_s'] * 1000:9.2f} ms")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exercise", default="squat", choices=["squat", "pushup"])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--model-complexity", type=int, default=2)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES))
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this stored results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown of a stage median (default 0.25)")
+    parser.add_argument("--save-baseline", help="store the results as a new baseline")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        results["regressions"] = compare_to_baseline(results, baseline, args.tolerance)
+        for r in results["regressions"]:
+            print(f"REGRESSION {r['stage']}: {r['median_s'] * 1000:.2f} ms > limit {r['limit_s'] * 1000:.2f} ms")
+        exit_code = 1 if results["regressions"] else 0
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Deterministic synthetic workloads for benchmarks.
+
+- synthetic_landmarks: (T, 33, 3) MediaPipe-style landmark sequences of a stick
+  figure doing squats or push-ups (side view, normalized image coordinates)
+- render_video: draws such a sequence as a small stick-figure video with OpenCV
+"""
+import numpy as np
+
+# landmark indices (MediaPipe Pose)
+NOSE, L_EYE, R_EYE, L_EAR, R_EAR = 0, 2, 5, 7, 8
+L_SHOULDER, R_SHOULDER, L_ELBOW, R_ELBOW, L_WRIST, R_WRIST = 11, 12, 13, 14, 15, 16
+L_HIP, R_HIP, L_KNEE, R_KNEE, L_ANKLE, R_ANKLE = 23, 24, 25, 26, 27, 28
+L_HEEL, R_HEEL, L_FOOT, R_FOOT = 29, 30, 31, 32
+
+# bones drawn in rendered videos
+CONNECTIONS = [
+    (L_SHOULDER, R_SHOULDER), (L_SHOULDER, L_ELBOW), (L_ELBOW, L_WRIST),
+    (R_SHOULDER, R_ELBOW), (R_ELBOW, R_WRIST), (L_SHOULDER, L_HIP), (R_SHOULDER, R_HIP),
+    (L_HIP, R_HIP), (L_HIP, L_KNEE), (L_KNEE, L_ANKLE), (R_HIP, R_KNEE), (R_KNEE, R_ANKLE),
+    (L_ANKLE, L_HEEL), (L_HEEL, L_FOOT), (R_ANKLE, R_HEEL), (R_HEEL, R_FOOT),
+]
+
+EXERCISES = ("squat", "pushup")
+
+
+def _unit(angle):
+    """(T,) angle in radians -> (T, 2) unit vectors in image coordinates (y down)."""
+    return np.stack([np.sin(angle), -np.cos(angle)], axis=-1)
+
+
+def _squat_joints(phase):
+    """Side-view squat: knee flexion 0..100 degrees over a rep."""
+    flex = np.radians(100) * (1 - np.cos(phase)) / 2
+    ankle = np.broadcast_to([0.5, 0.85], phase.shape + (2,))
+    knee = ankle + 0.2 * _unit(flex / 2)
+    hip = knee + 0.2 * _unit(-flex / 2)
+    shoulder = hip + 0.28 * _unit(flex / 3)
+    elbow = shoulder + 0.14 * _unit(np.full_like(phase, np.radians(100)))
+    wrist = elbow + 0.13 * _unit(np.full_like(phase, np.radians(90)))
+    return ankle, knee, hip, shoulder, elbow, wrist
+
+
+def _pushup_joints(phase):
+    """Side-view push-up: body close to horizontal, elbows flexing 0..90 degrees."""
+    flex = np.radians(90) * (1 - np.cos(phase)) / 2
+    wrist = np.broadcast_to([0.7, 0.85], phase.shape + (2,))
+    shoulder_height = 0.26 * np.cos(flex / 2)
+    shoulder = np.stack([np.full_like(phase, 0.7), 0.85 - shoulder_height], axis=-1)
+    elbow = (wrist + shoulder) / 2 + np.stack([-0.1 * np.sin(flex / 2), np.zeros_like(phase)], axis=-1)
+    body = np.arcsin(np.clip(shoulder_height / 0.6, -1, 1))
+    hip = shoulder + 0.28 * np.stack([-np.cos(body), np.sin(body)], axis=-1)
+    knee = hip + 0.2 * np.stack([-np.cos(body), np.sin(body)], axis=-1)
+    ankle = knee + 0.2 * np.stack([-np.cos(body), np.sin(body)], axis=-1)
+    return ankle, knee, hip, shoulder, elbow, wrist
+
+
+def synthetic_landmarks(exercise="squat", n_frames=300, fps=30.0, rep_seconds=2.5,
+                        noise=0.002, seed=0):
+    """
+    Deterministic (T, 33, 3) float32 landmark sequence of a stick figure.
+
+    Args:
+        exercise: 'squat' or 'pushup'
+        n_frames: number of frames
+        fps: frame rate used to convert rep_seconds into frames
+        rep_seconds: duration of one repetition
+        noise: std of Gaussian jitter added to every coordinate
+        seed: RNG seed (same seed -> same sequence)
+    """
+    if exercise not in EXERCISES:
+        raise ValueError(f"Unsupported synthetic exercise: {exercise}")
+    rng = np.random.default_rng(seed)
+    phase = 2 * np.pi * np.arange(n_frames) / (rep_seconds * fps)
+    joints = _squat_joints(phase) if exercise == "squat" else _pushup_joints(phase)
+    ankle, knee, hip, shoulder, elbow, wrist = joints
+
+    out = np.zeros((n_frames, 33, 3), dtype=np.float32)
+    # left side is closer to the camera; right side is slightly offset in x and depth
+    for (li, ri), p in zip([(L_ANKLE, R_ANKLE), (L_KNEE, R_KNEE), (L_HIP, R_HIP),
+                            (L_SHOULDER, R_SHOULDER), (L_ELBOW, R_ELBOW), (L_WRIST, R_WRIST)], joints):
+        out[:, li, :2] = p
+        out[:, ri, :2] = p + [0.01, 0.0]
+        out[:, li, 2] = -0.1
+        out[:, ri, 2] = 0.1
+
+    head = shoulder + 0.08 * (shoulder - hip) / np.linalg.norm(shoulder - hip, axis=-1, keepdims=True)
+    for idx in range(11):
+        out[:, idx, :2] = head + [0.004 * (idx % 3), -0.004 * (idx % 2)]
+    out[:, [NOSE, L_EYE, R_EYE, L_EAR, R_EAR], 0] += [0.03, 0.02, 0.02, 0.0, 0.0]
+    # hands follow the wrists, feet sit on the floor
+    out[:, 17:23, :2] = np.repeat(wrist[:, None], 6, axis=1) + [0.02, 0.01]
+    out[:, [L_HEEL, R_HEEL], :2] = ankle[:, None] + [-0.03, 0.03]
+    out[:, [L_FOOT, R_FOOT], :2] = ankle[:, None] + [0.06, 0.03]
+
+    out += rng.normal(0, noise, out.shape).astype(np.float32)
+    return out
+
+
+def render_video(path, landmarks, size=(480, 360), fps=30.0):
+    """
+    Writes a stick-figure video of a landmark sequence (mp4v codec).
+
+    Pose detectors may or may not find a person in such frames; the video is meant
+    for timing decode / inference, not for accuracy.
+    """
+    import cv2
+
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer: {path}")
+    scale = np.array([width, height], dtype=np.float32)
+    try:
+        for frame_points in landmarks:
+            frame = np.full((height, width, 3), 200, dtype=np.uint8)
+            px = (frame_points[:, :2] * scale).astype(int)
+            for a, b in CONNECTIONS:
+                cv2.line(frame, tuple(px[a]), tuple(px[b]), (40, 40, 40), 6)
+            cv2.circle(frame, tuple(px[NOSE]), 14, (40, 40, 40), -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
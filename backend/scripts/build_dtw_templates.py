@@ -0,0 +1,122 @@
+"""
+Builds the DTW reference-rep index (dtw_templates.npz) used by template matching.
+
+The dataset holds single up / down poses, not rep sequences, so reference reps are
+synthesized in joint-angle space: start pose -> bottom pose -> start pose with a
+cosine profile, pairing random up and down poses of the same exercise and varying
+where the bottom falls. The start pose of an exercise is the label whose primary
+angle is larger, matching how reps are segmented (they start at the angle maximum).
+Recorded exemplars can be added as (T, 33, 3|4) landmark arrays named
+<exercise>*.npy; every rep segmented from them becomes a template as is.
+
+Usage (from backend/):
+    python scripts/build_dtw_templates.py
+    python scripts/build_dtw_templates.py --per-exercise 300 --exemplars recordings/
+"""
+import argparse
+import glob
+import os
+import sys
+
+import numpy as np
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, APP_DIR)
+
+from config import settings  # noqa: E402
+from dataset import DATASET_DIR, DATASET_EXERCISES, load_dataset  # noqa: E402
+from models.dtw import TemplateIndex  # noqa: E402
+from models.estimator import ExerciseEvaluator  # noqa: E402
+from models.feature_extractor import FeatureExtractor  # noqa: E402
+from models.temporal_features import TemporalFeatureExtractor  # noqa: E402
+
+
+def synthesize_reps(start_poses, bottom_poses, n_reps, length, rng):
+    """(n_reps, length, K) angle trajectories start -> bottom -> start."""
+    a = start_poses[rng.integers(len(start_poses), size=n_reps)]
+    b = bottom_poses[rng.integers(len(bottom_poses), size=n_reps)]
+    # bottom between 35% and 65% of the rep: slow / fast eccentric phases
+    bottom_at = rng.uniform(0.35, 0.65, size=(n_reps, 1))
+    t = np.linspace(0.0, 1.0, length)[None, :]
+    phase = np.where(t <= bottom_at, t / bottom_at * 0.5, 0.5 + (t - bottom_at) / (1 - bottom_at) * 0.5)
+    depth = (1 - np.cos(2 * np.pi * phase)) / 2
+    return a[:, None, :] + (b - a)[:, None, :] * depth[..., None]
+
+
+def dataset_templates(extractor, estimator, dataset_dir, per_exercise, length, rng):
+    points, labels = load_dataset(dataset_dir)
+    matrix, names = extractor.build_feature_matrix(points, view="side")
+    channels = [names.index(c) for c in TemplateIndex.CHANNELS]
+
+    trajectories, exercises = [], []
+    for prefix, exercise in DATASET_EXERCISES.items():
+        up, down = labels == f"{prefix}_up", labels == f"{prefix}_down"
+        if not up.any() or not down.any():
+            continue
+        column = estimator.evaluators[exercise].primary_column(names)
+        if np.nanmean(matrix[up, column]) >= np.nanmean(matrix[down, column]):
+            start, bottom = up, down
+        else:
+            start, bottom = down, up
+        angles = np.nan_to_num(matrix[:, channels].astype(np.float64))
+        reps = synthesize_reps(angles[start], angles[bottom], per_exercise, length, rng)
+        trajectories.extend(reps)
+        exercises.extend([exercise] * len(reps))
+        print(f"{exercise:13s} {int(start.sum())} start / {int(bottom.sum())} bottom poses -> {len(reps)} reps")
+    return trajectories, exercises
+
+
+def exemplar_templates(extractor, estimator, exemplar_dir):
+    temporal = TemporalFeatureExtractor()
+    trajectories, exercises = [], []
+    for path in sorted(glob.glob(os.path.join(exemplar_dir, "*.npy"))):
+        stem = os.path.basename(path)
+        exercise = next((e for e in estimator.evaluators if stem.startswith(e)), None)
+        if exercise is None:
+            print(f"skipping {stem}: no exercise prefix")
+            continue
+        points = np.load(path)
+        points = points[np.asarray(points).any(axis=(1, 2))]
+        matrix, names = extractor.build_feature_matrix(points, view="auto")
+        column = estimator.evaluators[exercise].primary_column(names)
+        if column is None:
+            continue
+        angles = np.nan_to_num(matrix[:, [names.index(c) for c in TemplateIndex.CHANNELS]].astype(np.float64))
+        reps = temporal.segment_reps(matrix[:, column])
+        for start, _, end in reps:
+            trajectories.append(angles[start:end + 1])
+            exercises.append(exercise)
+        print(f"{stem}: {len(reps)} reps ({exercise})")
+    return trajectories, exercises
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the DTW reference-rep index")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="directory with labels.csv and landmarks.csv")
+    parser.add_argument("--exemplars", help="directory of recorded <exercise>*.npy landmark sequences")
+    parser.add_argument("--per-exercise", type=int, default=200, help="synthesized reps per exercise")
+    parser.add_argument("--length", type=int, default=50, help="resampled rep length")
+    parser.add_argument("--band-ratio", type=float, default=0.1, help="Sakoe-Chiba band (fraction of length)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(settings.artifacts_dir, "dtw_templates.npz"))
+    args = parser.parse_args()
+
+    extractor, estimator = FeatureExtractor(), ExerciseEvaluator()
+    rng = np.random.default_rng(args.seed)
+    trajectories, exercises = dataset_templates(extractor, estimator, args.dataset, args.per_exercise,
+                                                args.length, rng)
+    if args.exemplars:
+        more, more_exercises = exemplar_templates(extractor, estimator, args.exemplars)
+        trajectories += more
+        exercises += more_exercises
+    if not trajectories:
+        sys.exit("No templates built")
+
+    index = TemplateIndex.from_trajectories(trajectories, exercises, length=args.length,
+                                            band_ratio=args.band_ratio)
+    index.save(args.output)
+    print(f"Saved {len(index.templates)} templates ({', '.join(index.exercises_indexed())}) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Builds the feature store (feature_vectors/store/<view>/) from the labelled dataset.
+
+Replaces the anonymous feature_vectors.pkl: every dataset pose is featurized with
+the backend FeatureExtractor, once per camera view. The matrices are written with
+their column names, view and extractor version (see models/feature_store.py).
+
+Usage (from backend/):
+    python scripts/build_feature_store.py
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, APP_DIR)
+
+from dataset import DATASET_DIR, exercise_of, load_dataset  # noqa: E402
+from models.feature_extractor import FeatureExtractor  # noqa: E402
+from models.feature_store import FeatureStore  # noqa: E402
+
+STORE_DIR = os.path.normpath(os.path.join(APP_DIR, "..", "..", "feature_vectors", "store"))
+VIEWS = ("side", "front")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the per-view feature store from the dataset")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="directory with labels.csv and landmarks.csv")
+    parser.add_argument("--output", default=STORE_DIR, help="store root (one sub-directory per view)")
+    args = parser.parse_args()
+
+    points, labels = load_dataset(args.dataset)
+    extractor = FeatureExtractor()
+    for view in VIEWS:
+        matrix, names = extractor.build_feature_matrix(points, view=view)
+        finite = np.isfinite(matrix).all(axis=1)
+        store = FeatureStore.create(os.path.join(args.output, view), names, view, FeatureExtractor.VERSION)
+        for pose in sorted(set(labels)):
+            rows = (labels == pose) & finite
+            store.add(pose, matrix[rows], exercise=exercise_of(pose))
+        print(f"{view}: {len(store.poses)} poses, {store.rows()} rows x {len(names)} features -> {store.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Builds the k-NN reference pose index (reference_poses.npz) used for per-rep corrections
+and exercise recognition.
+
+Reads the per-view feature store of the dataset poses (scripts/build_feature_store.py),
+which is built with the backend FeatureExtractor; the legacy feature_vectors.pkl
+columns do not line up with the backend feature schema.
+
+Usage (from backend/):
+    python scripts/build_feature_store.py
+    python scripts/build_reference_index.py
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, APP_DIR)
+
+from build_feature_store import STORE_DIR  # noqa: E402
+from config import settings  # noqa: E402
+from models.feature_extractor import FeatureExtractor  # noqa: E402
+from models.feature_store import FeatureStore  # noqa: E402
+from models.reference_index import VIEWS, ReferencePoseIndex  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the k-NN reference pose index")
+    parser.add_argument("--store", default=STORE_DIR, help="feature store root (one sub-directory per view)")
+    parser.add_argument("--output", default=os.path.join(settings.artifacts_dir, "reference_poses.npz"))
+    args = parser.parse_args()
+
+    views = {}
+    for view in VIEWS:
+        store = FeatureStore(os.path.join(args.store, view)).require(
+            extractor_version=FeatureExtractor.VERSION, view=view)
+        poses = [pose for pose in store.poses if store.exercise(pose)]
+        matrix = np.concatenate([store.load(pose) for pose in poses])
+        labels = np.repeat(poses, [store.rows(pose) for pose in poses])
+        exercises = np.repeat([store.exercise(pose) for pose in poses], [store.rows(pose) for pose in poses])
+        names = store.names
+        # aliases (e.g. knee_angle == left_knee in the side view) would count twice in distances
+        unique = [j for j in range(len(names))
+                  if not any(np.array_equal(matrix[:, j], matrix[:, i]) for i in range(j))]
+        views[view] = {"vectors": matrix[:, unique], "labels": labels,
+                       "exercises": exercises, "names": [names[j] for j in unique]}
+        print(f"{view}: {len(matrix)} poses x {len(unique)} features "
+              f"(dropped aliases {', '.join(n for j, n in enumerate(names) if j not in unique) or '-'})")
+
+    index = ReferencePoseIndex(views)
+    index.save(args.output)
+    print(f"Saved reference poses of {', '.join(sorted(set(exercises)))} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
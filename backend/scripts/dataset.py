@@ -0,0 +1,31 @@
+"""Loading of the labelled pose dataset (dataset/labels.csv + dataset/landmarks.csv)."""
+import os
+
+import numpy as np
+
+DATASET_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "dataset"))
+# dataset label prefix -> exercise key of ExerciseEvaluator
+DATASET_EXERCISES = {
+    "jumping_jacks": "jumping_jack",
+    "pullups": "pullup",
+    "pushups": "pushup",
+    "situp": "situp",
+    "squats": "squat",
+}
+
+
+def load_dataset(dataset_dir=DATASET_DIR):
+    """(N, 33, 3) dataset poses and their (N,) pose labels, joined on pose_id."""
+    with open(os.path.join(dataset_dir, "labels.csv")) as f:
+        next(f)
+        labels = dict(line.strip().split(",", 1) for line in f if line.strip())
+    data = np.loadtxt(os.path.join(dataset_dir, "landmarks.csv"), delimiter=",", skiprows=1)
+    pose_ids = data[:, 0].astype(int).astype(str)
+    keep = np.array([pid in labels for pid in pose_ids])
+    points = data[keep, 1:].reshape(-1, 33, 3)
+    return points, np.array([labels[pid] for pid in pose_ids[keep]])
+
+
+def exercise_of(label):
+    """Exercise key of a pose label such as "squats_down" (None if unknown)."""
+    return DATASET_EXERCISES.get(label.rsplit("_", 1)[0])
@@ -0,0 +1,133 @@
+"""
+Fits the feature scaler (feature_scaler.npz) in one streaming pass, without stacking
+all feature vectors in memory. Nothing in the backend loads it (services/artifacts.py
+has no loader for it): the served models (autoencoders, reference index) carry their
+own scalers. It is an offline artifact with per-column mean / scale, min / max and
+quantiles, for dataset analysis and external tools.
+
+Inputs are a feature store (scripts/build_feature_store.py; its column names are
+saved with the scaler), .npy feature matrices (or directories of them), memory-mapped
+and read in chunks of rows, and/or the legacy feature_vectors.pkl. With --workers the
+inputs are split into shards fitted in parallel and merged. --save-state writes the
+mergeable statistics of a run so shards fitted on different machines can be
+combined later with --merge.
+
+Shards are merged only if their column names match (statistics fitted from plain
+.npy matrices carry no names and are only checked by width).
+
+Usage (from backend/):
+    python scripts/fit_feature_scaler.py --store ../feature_vectors/store/side
+    python scripts/fit_feature_scaler.py features/*.npy --workers 4
+    python scripts/fit_feature_scaler.py --pickle ../feature_vectors/feature_vectors.pkl
+    python scripts/fit_feature_scaler.py shard_a/ --save-state a.npz    # on machine A
+    python scripts/fit_feature_scaler.py --merge a.npz b.npz            # combine shards
+"""
+import argparse
+import glob
+import os
+import pickle
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, APP_DIR)
+
+from config import settings  # noqa: E402
+from models.feature_store import FeatureStore  # noqa: E402
+from models.streaming_stats import RunningStats  # noqa: E402
+
+
+def expand_inputs(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.npy"))))
+        else:
+            paths.append(item)
+    return paths
+
+
+def iter_chunks(path, chunk_rows):
+    """Row chunks of a memory-mapped (N, F) matrix."""
+    matrix = np.load(path, mmap_mode="r")
+    for start in range(0, len(matrix), chunk_rows):
+        yield matrix[start:start + chunk_rows]
+
+
+def fit_shard(paths, chunk_rows=65536, sketch_k=200):
+    stats = None
+    for path in paths:
+        for chunk in iter_chunks(path, chunk_rows):
+            if stats is None:
+                stats = RunningStats(chunk.shape[1], sketch_k=sketch_k)
+            stats.update(chunk)
+    return stats
+
+
+def _fit_shard(args):
+    return fit_shard(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit feature_scaler.npz in one streaming pass")
+    parser.add_argument("inputs", nargs="*", help=".npy feature matrices or directories of them")
+    parser.add_argument("--store", help="feature store directory (one view)")
+    parser.add_argument("--columns", nargs="+", help="feature store columns to fit (default: all)")
+    parser.add_argument("--pickle", help="legacy feature_vectors.pkl ({pose: matrix})")
+    parser.add_argument("--merge", nargs="+", default=[], help="state files written with --save-state")
+    parser.add_argument("--workers", type=int, default=1, help="shards fitted in parallel")
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    parser.add_argument("--sketch-k", type=int, default=200, help="quantile sketch size (0 disables)")
+    parser.add_argument("--save-state", help="also write the mergeable statistics here")
+    parser.add_argument("--output", default=os.path.join(settings.artifacts_dir, "feature_scaler.npz"))
+    args = parser.parse_args()
+
+    shards = []
+    paths = expand_inputs(args.inputs)
+    if paths:
+        workers = max(min(args.workers, len(paths)), 1)
+        jobs = [(paths[i::workers], args.chunk_rows, args.sketch_k) for i in range(workers)]
+        if workers == 1:
+            shards.append(fit_shard(*jobs[0]))
+        else:
+            with Pool(workers) as pool:
+                shards.extend(pool.map(_fit_shard, jobs))
+    if args.store:
+        store = FeatureStore(args.store)
+        columns = args.columns or store.names
+        stats = RunningStats(len(columns), names=columns, sketch_k=args.sketch_k)
+        for _, chunk in store.iter_chunks(columns=columns, chunk_rows=args.chunk_rows):
+            stats.update(chunk)
+        shards.append(stats)
+    if args.pickle:
+        with open(args.pickle, "rb") as f:
+            matrices = pickle.load(f)
+        stats = None
+        for matrix in matrices.values():
+            stats = stats or RunningStats(np.shape(matrix)[1], sketch_k=args.sketch_k)
+            stats.update(matrix)
+        shards.append(stats)
+    shards.extend(RunningStats.load(path) for path in args.merge)
+
+    shards = [s for s in shards if s is not None]
+    if not shards:
+        sys.exit("No feature rows given")
+    stats = shards[0]
+    for shard in shards[1:]:
+        try:
+            stats.merge(shard)
+        except ValueError as e:
+            sys.exit(f"Cannot combine the inputs: {e}")
+
+    if args.save_state:
+        stats.save(args.save_state)
+        print(f"Saved mergeable statistics to {args.save_state}")
+    stats.save_scaler(args.output)
+    print(f"Fitted {stats.n_features} features over {stats.count} rows "
+          f"({stats.skipped} non-finite rows skipped); saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
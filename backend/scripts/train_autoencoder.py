@@ -0,0 +1,377 @@
+"""
+Trains the dense autoencoder on CPU from a feature store and exports it for serving.
+Runs are reproducible for a given --seed and --loader-threads.
+
+Replaces autoencoder/autoencoder.ipynb (TensorFlow, everything in RAM):
+- one streaming pass fits the standardization of the training rows (RunningStats)
+- every epoch, loader threads read shuffled row chunks of the memory-mapped store,
+  scale them on the fly and queue mini-batches while the main thread trains
+- with --augment, extra training batches are made on the fly from the dataset landmarks
+  of the training rows (mirror / rotation / scale / jitter, models/augmentation.py)
+- Adam + MSE in NumPy, early stopping on the validation loss (best weights restored)
+- exports autoencoder_<view>.npz (weights, scaler, column names, anomaly threshold)
+  and reconstruction_errors_<view>.npy over all rows
+
+With --window W a sequence-window model is trained instead: its input is W consecutive
+standardized frames. The store holds single poses, not clips, so the windows are cut
+from synthesized reps: feature-space motion between an up and a down pose of the same
+exercise (split-respecting) with a cosine depth profile, random rep duration, bottom
+position and pause, sampled at --window-fps. Its anomaly threshold is calibrated on
+the per-frame errors of synthesized clips, scored exactly as the service scores a
+clip. It is exported as autoencoder_<view>_window.npz with those errors.
+
+Training throughput (samples/s) and wall time are printed and written to --report.
+
+Usage (from backend/):
+    python scripts/train_autoencoder.py --store ../feature_vectors/store/side
+    python scripts/train_autoencoder.py --store ../feature_vectors/store/front --hidden 64 32 16 8
+    python scripts/train_autoencoder.py --store ../feature_vectors/store/side --augment 4096
+    python scripts/train_autoencoder.py --store ../feature_vectors/store/side --window 8 --hidden 128 32 8
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, APP_DIR)
+
+from config import settings  # noqa: E402
+from dataset import DATASET_DIR, load_dataset  # noqa: E402
+from models.augmentation import PoseAugmenter  # noqa: E402
+from models.autoencoder import Adam, DenseAutoencoder  # noqa: E402
+from models.feature_extractor import FeatureExtractor  # noqa: E402
+from models.feature_store import FeatureStore  # noqa: E402
+from models.streaming_stats import RunningStats  # noqa: E402
+
+_DONE = object()
+
+
+def validation_masks(store, val_fraction, seed):
+    """Deterministic per-pose row masks of the validation split."""
+    rng = np.random.default_rng(seed)
+    return {pose: rng.random(store.rows(pose)) < val_fraction for pose in store.poses}
+
+
+def iter_rows(store, poses, columns, masks, train, chunk_rows, rng=None):
+    """Raw (unscaled) row chunks of the train (or validation) split, chunk order shuffled with `rng`."""
+    idx = store.column_indices(columns)
+    chunks = [(pose, start) for pose in poses for start in range(0, store.rows(pose), chunk_rows)]
+    if rng is not None:
+        chunks = [chunks[i] for i in rng.permutation(len(chunks))]
+    for pose, start in chunks:
+        rows = np.asarray(store.load(pose)[start:start + chunk_rows][:, idx], dtype=np.float32)
+        keep = masks[pose][start:start + chunk_rows] != train
+        if keep.any():
+            yield rows[keep]
+
+
+def batch_producer(store, poses, columns, masks, model, batch_size, chunk_rows, shuffle_rows, seed, out):
+    """Loader thread: shuffled, standardized mini-batches of the given poses into the queue `out`."""
+    try:
+        rng = np.random.default_rng(seed)
+        pending, size = [], 0
+        for rows in iter_rows(store, poses, columns, masks, True, chunk_rows, rng):
+            pending.append(rows)
+            size += len(rows)
+            if size < shuffle_rows:
+                continue
+            buffer = model.standardize(np.concatenate(pending))[rng.permutation(size)]
+            full = size - size % batch_size
+            for start in range(0, full, batch_size):
+                out.put(buffer[start:start + batch_size])
+            pending, size = ([buffer[full:]], size - full) if full < size else ([], 0)
+        if size:
+            buffer = model.standardize(np.concatenate(pending))[rng.permutation(size)]
+            for start in range(0, size, batch_size):
+                out.put(buffer[start:start + batch_size])
+    except Exception as e:  # surfaced in the training thread
+        out.put(e)
+    finally:
+        out.put(_DONE)
+
+
+def training_landmarks(store, masks, dataset_dir):
+    """Dataset landmarks of the store's training rows (the validation poses are left out)."""
+    points, labels = load_dataset(dataset_dir)
+    train = []
+    for pose in store.poses:
+        rows = points[labels == pose]
+        if len(rows) != store.rows(pose):
+            raise ValueError(f"Dataset rows of {pose} do not match the feature store; rebuild the store")
+        train.append(rows[~masks[pose]])
+    return np.concatenate(train)
+
+
+def augment_producer(points, view, model, n_rows, batch_size, seed, out):
+    """Loader thread: standardized feature batches of freshly augmented training poses."""
+    try:
+        augmenter = PoseAugmenter(seed=seed)
+        batches = augmenter.feature_batches(points, FeatureExtractor(), view, batch_size=batch_size)
+        for _ in range(-(-n_rows // batch_size)):
+            matrix, names = next(batches)
+            out.put(model.standardize(matrix, names))
+    except Exception as e:
+        out.put(e)
+    finally:
+        out.put(_DONE)
+
+
+def motion_pairs(store, columns, masks, train):
+    """(up rows, down rows) raw feature matrices per exercise of a split: the end poses of synthesized reps."""
+    positions = {}
+    for pose in store.poses:
+        prefix, _, position = pose.rpartition("_")
+        positions.setdefault(prefix, {})[position] = store.load(pose, columns)[masks[pose] != train]
+    pairs = [(p["up"], p["down"]) for p in positions.values()
+             if len(p.get("up", ())) and len(p.get("down", ()))]
+    if not pairs:
+        raise ValueError(f"Feature store {store.path} has no <exercise>_up / <exercise>_down pose pairs")
+    return pairs
+
+
+def synthesize_windows(pairs, n, window, fps, rng):
+    """
+    (n, window, F) raw feature windows cut at a random phase from synthesized reps:
+    start pose -> other pose -> start pose with a cosine depth profile, 1-4 s per rep,
+    bottom between 35% and 65% of the movement and up to 30% of the rep held at the start.
+    """
+    which = rng.integers(len(pairs), size=n)
+    start = np.empty((n, pairs[0][0].shape[1]), dtype=np.float32)
+    other = np.empty_like(start)
+    for e, (up, down) in enumerate(pairs):
+        sel = np.flatnonzero(which == e)
+        a, b = up[rng.integers(len(up), size=len(sel))], down[rng.integers(len(down), size=len(sel))]
+        swap = (rng.random(len(sel)) < 0.5)[:, None]
+        start[sel], other[sel] = np.where(swap, b, a), np.where(swap, a, b)
+    frames_per_rep = rng.uniform(1.0, 4.0, size=(n, 1)) * fps
+    pause = rng.uniform(0.0, 0.3, size=(n, 1))
+    bottom_at = rng.uniform(0.35, 0.65, size=(n, 1))
+    t = (rng.random((n, 1)) + np.arange(window)[None, :] / frames_per_rep) % 1.0
+    move = np.clip((t - pause) / (1 - pause), 0.0, 1.0)
+    phase = np.where(move <= bottom_at, move / bottom_at * 0.5, 0.5 + (move - bottom_at) / (1 - bottom_at) * 0.5)
+    depth = ((1 - np.cos(2 * np.pi * phase)) / 2).astype(np.float32)
+    return start[:, None, :] + (other - start)[:, None, :] * depth[..., None]
+
+
+def window_inputs(model, windows, noise, rng):
+    """Standardized (n, window * F) model inputs, plus per-frame noise (in standard deviations)."""
+    n, window, f = windows.shape
+    x = model.standardize(windows.reshape(-1, f)).reshape(n, window * f)
+    if noise:
+        x += rng.normal(0.0, noise, x.shape).astype(np.float32)
+    return x
+
+
+def calibration_errors(model, pairs, n_clips, noise, rng, seconds=10.0):
+    """
+    Per-frame errors of synthesized clips, scored as the service scores a clip
+    (DenseAutoencoder.score_clip: overlap-averaged window errors), for the anomaly threshold.
+    """
+    frames = int(seconds * model.fps)
+    clips = synthesize_windows(pairs, n_clips, frames, model.fps, rng)
+    clips += rng.normal(0.0, noise, clips.shape).astype(np.float32) * model.scale
+    timestamps = np.arange(frames) / model.fps
+    return np.concatenate([model.score_clip(clip, model.feature_names, timestamps) for clip in clips])
+
+
+def window_producer(pairs, model, n_windows, args, seed, out):
+    """Loader thread: standardized window batches of freshly synthesized reps."""
+    try:
+        rng = np.random.default_rng(seed)
+        for start in range(0, n_windows, args.batch_size):
+            n = min(args.batch_size, n_windows - start)
+            windows = synthesize_windows(pairs, n, model.window, model.fps, rng)
+            out.put(window_inputs(model, windows, args.window_noise, rng))
+    except Exception as e:
+        out.put(e)
+    finally:
+        out.put(_DONE)
+
+
+def epoch_batches(store, columns, masks, model, args, epoch, augment_points=None, pairs=None):
+    """
+    Mini-batches of one epoch, produced by args.loader_threads threads over disjoint poses
+    (or, for a window model, over synthesized reps of the training `pairs`).
+    Threads are drained round-robin, so the batch order (and the trained model) is reproducible.
+    """
+    queues = []
+    for i in range(args.loader_threads):
+        out = queue.Queue(maxsize=max(args.prefetch // args.loader_threads, 1))
+        seed = args.seed * 1000 + epoch * 31 + i
+        if pairs is not None:
+            n_windows = args.windows_per_epoch // args.loader_threads
+            threading.Thread(target=window_producer, daemon=True,
+                             args=(pairs, model, n_windows, args, seed, out)).start()
+        else:
+            poses = store.poses[i::args.loader_threads]
+            threading.Thread(
+                target=batch_producer, daemon=True,
+                args=(store, poses, columns, masks, model, args.batch_size, args.chunk_rows,
+                      args.shuffle_rows, seed, out)).start()
+        queues.append(out)
+    if augment_points is not None and args.augment:
+        out = queue.Queue(maxsize=max(args.prefetch // args.loader_threads, 1))
+        threading.Thread(
+            target=augment_producer, daemon=True,
+            args=(augment_points, store.view, model, args.augment, args.batch_size,
+                  args.seed * 1000 + epoch * 31 + args.loader_threads, out)).start()
+        queues.append(out)
+    while queues:
+        for out in list(queues):
+            item = out.get()
+            if item is _DONE:
+                queues.remove(out)
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+
+
+def split_errors(store, columns, masks, model, train, chunk_rows):
+    """Reconstruction errors of every row of a split."""
+    errors = [model.reconstruction_errors(model.standardize(rows))
+              for rows in iter_rows(store, store.poses, columns, masks, train, chunk_rows)]
+    return np.concatenate(errors) if errors else np.zeros(0, dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the NumPy autoencoder from a feature store")
+    parser.add_argument("--store", required=True, help="feature store directory (one view)")
+    parser.add_argument("--columns", nargs="+", help="input features (default: all store columns)")
+    parser.add_argument("--hidden", type=int, nargs="+", default=[64, 32, 16, 8],
+                        help="encoder layer sizes; the decoder mirrors them")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--patience", type=int, default=15, help="epochs without val improvement before stopping")
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--loader-threads", type=int, default=2)
+    parser.add_argument("--prefetch", type=int, default=64, help="queued mini-batches")
+    parser.add_argument("--chunk-rows", type=int, default=4096)
+    parser.add_argument("--shuffle-rows", type=int, default=16384, help="rows shuffled together")
+    parser.add_argument("--augment", type=int, default=0, help="augmented training rows added per epoch")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="landmarks used for --augment")
+    parser.add_argument("--window", type=int, default=1, help="frames per input (> 1: sequence-window model)")
+    parser.add_argument("--window-fps", type=float, default=30.0, help="frame rate of the synthesized windows")
+    parser.add_argument("--windows-per-epoch", type=int, default=32768)
+    parser.add_argument("--window-noise", type=float, default=0.05,
+                        help="per-frame noise added to synthesized windows (standard deviations)")
+    parser.add_argument("--calibration-clips", type=int, default=256,
+                        help="synthesized 10 s clips whose per-frame errors set a window model's threshold")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="model file (default: <artifacts>/autoencoder_<view>.npz)")
+    parser.add_argument("--errors-output", help="default: <artifacts>/reconstruction_errors_<view>.npy")
+    parser.add_argument("--report", help="write training metrics as JSON")
+    args = parser.parse_args()
+    if args.window > 1 and args.augment:
+        parser.error("--augment applies to single-frame models only")
+
+    started = time.perf_counter()
+    store = FeatureStore(args.store)
+    columns = args.columns or store.names
+    store.require(names=columns)
+    masks = validation_masks(store, args.val_fraction, args.seed)
+
+    # standardization of the training rows, in one streaming pass
+    stats = RunningStats(len(columns), names=columns, sketch_k=0)
+    for rows in iter_rows(store, store.poses, columns, masks, True, args.chunk_rows):
+        stats.update(rows)
+    scaler = stats.scaler()
+    print(f"{store.view}: {stats.count} training rows, {store.rows() - stats.count} validation rows, "
+          f"{len(columns)} features")
+
+    inputs = len(columns) * args.window
+    sizes = [inputs] + args.hidden + args.hidden[-2::-1] + [inputs]
+    model = DenseAutoencoder.initialize(sizes, scaler["mean"], scaler["scale"], columns,
+                                        np.random.default_rng(args.seed), view=store.view,
+                                        extractor_version=store.extractor_version, window=args.window,
+                                        fps=args.window_fps if args.window > 1 else None)
+    optimizer = Adam(model.parameters(), lr=args.lr)
+    augment_points = training_landmarks(store, masks, args.dataset) if args.augment else None
+    train_pairs = val_inputs = None
+    if args.window > 1:
+        train_pairs = motion_pairs(store, columns, masks, True)
+        # fixed validation windows, synthesized from the validation poses only
+        rng = np.random.default_rng(args.seed + 1)
+        val_windows = synthesize_windows(motion_pairs(store, columns, masks, False),
+                                         max(args.windows_per_epoch // 4, 1), args.window, args.window_fps, rng)
+        val_inputs = window_inputs(model, val_windows, args.window_noise, rng)
+
+    best_val, best_params, best_epoch, history = np.inf, None, 0, []
+    train_seconds, train_samples = 0.0, 0
+    for epoch in range(1, args.epochs + 1):
+        epoch_start = time.perf_counter()
+        losses, samples = [], 0
+        for batch in epoch_batches(store, columns, masks, model, args, epoch, augment_points, train_pairs):
+            loss, grad_w, grad_b = model.gradients(batch)
+            optimizer.step(grad_w + grad_b)
+            losses.append(loss * len(batch))
+            samples += len(batch)
+        elapsed = time.perf_counter() - epoch_start
+        train_seconds += elapsed
+        train_samples += samples
+        if val_inputs is not None:
+            val_errors = model.reconstruction_errors(val_inputs)
+        else:
+            val_errors = split_errors(store, columns, masks, model, False, args.chunk_rows)
+        val_loss = float(val_errors.mean()) if len(val_errors) else float(np.sum(losses) / samples)
+        history.append({"epoch": epoch, "loss": float(np.sum(losses) / samples), "val_loss": val_loss,
+                        "samples_per_s": round(samples / elapsed, 1)})
+        if epoch == 1 or epoch % 10 == 0:
+            print(f"epoch {epoch:4d}  loss {history[-1]['loss']:.4f}  val {val_loss:.4f}  "
+                  f"{samples / elapsed:,.0f} samples/s")
+        if val_loss < best_val - 1e-5:
+            best_val, best_epoch = val_loss, epoch
+            best_params = [p.copy() for p in model.parameters()]
+        elif epoch - best_epoch >= args.patience:
+            print(f"early stop at epoch {epoch} (best {best_epoch}, val {best_val:.4f})")
+            break
+    for p, best in zip(model.parameters(), best_params):
+        p[...] = best
+
+    if val_inputs is not None:
+        # the service thresholds per-frame errors of whole clips, so calibrate on exactly those
+        rng = np.random.default_rng(args.seed + 2)
+        errors = np.concatenate([calibration_errors(model, pairs, args.calibration_clips // 2, args.window_noise, rng)
+                                 for pairs in (train_pairs, motion_pairs(store, columns, masks, False))])
+        suffix = f"{store.view}_window"
+    else:
+        errors = np.concatenate([split_errors(store, columns, masks, model, train, args.chunk_rows)
+                                 for train in (True, False)])
+        suffix = store.view
+    model.threshold = float(errors.mean() + 3 * errors.std())
+    output = args.output or os.path.join(settings.artifacts_dir, f"autoencoder_{suffix}.npz")
+    errors_output = args.errors_output or os.path.join(settings.artifacts_dir, f"reconstruction_errors_{suffix}.npy")
+    model.save(output)
+    np.save(errors_output, errors)
+
+    wall = time.perf_counter() - started
+    report = {
+        "view": store.view,
+        "layers": sizes,
+        "rows": int(store.rows()),
+        "augmented_rows_per_epoch": args.augment,
+        "window": args.window,
+        "epochs": len(history),
+        "best_epoch": best_epoch,
+        "val_loss": best_val,
+        "threshold": model.threshold,
+        "train_samples_per_s": round(train_samples / train_seconds, 1),
+        "wall_seconds": round(wall, 2),
+        "history": history,
+    }
+    print(f"Saved {output} and {errors_output}: val loss {best_val:.4f}, threshold {model.threshold:.4f}, "
+          f"{report['train_samples_per_s']:,.0f} samples/s, {wall:.1f} s wall")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
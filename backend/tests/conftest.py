@@ -0,0 +1,25 @@
+"""
+Regression tests of the backend: optimized paths against their straightforward
+reference implementations.
+
+    python -m pytest -q backend/tests
+
+Modules are imported the way the app imports them (backend/app on sys.path);
+the benchmark fixtures (backend/benchmarks/synthetic.py) provide landmark clips.
+"""
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(BACKEND_DIR, "app"), os.path.join(BACKEND_DIR, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def rng():
+    import numpy as np
+
+    return np.random.default_rng(0)
@@ -0,0 +1,28 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config import settings
+from routes import admin
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(admin.router)
+    return TestClient(app)
+
+
+def test_admin_routes_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_admin_routes_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.get("/admin/profiles", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200
+    assert "profiles" in response.json()
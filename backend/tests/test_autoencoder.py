@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from models.autoencoder import DenseAutoencoder
+
+NAMES = ["left_knee", "right_knee", "torso", "hip_angle"]
+
+
+@pytest.fixture
+def model(rng):
+    window, f = 8, len(NAMES)
+    return DenseAutoencoder.initialize([window * f, 16, 4, 16, window * f], np.zeros(f), np.ones(f), NAMES, rng,
+                                       window=window, fps=30.0)
+
+
+def naive_scores(model, matrix, stride):
+    """Window errors and per-frame errors with an explicit loop over windows."""
+    x = model.standardize(matrix, NAMES)
+    f = x.shape[1]
+    starts = range(0, len(x) - model.window + 1, stride)
+    total, count, window_errors = np.zeros(len(x)), np.zeros(len(x)), []
+    for s in starts:
+        window = x[s:s + model.window].reshape(1, -1)
+        diff = (model.forward(window) - window).reshape(model.window, f)
+        errors = (diff ** 2).sum(axis=1) / f
+        window_errors.append(errors.mean())
+        total[s:s + model.window] += errors
+        count[s:s + model.window] += 1
+    frame_errors = total / np.maximum(count, 1)
+    last = np.flatnonzero(count)[-1]
+    frame_errors[last + 1:] = frame_errors[last]
+    return np.array(window_errors), frame_errors
+
+
+def clip(rng, n):
+    t = np.arange(n) / 30.0
+    return np.column_stack([np.sin(t * k) for k in (1.0, 1.3, 0.7, 2.1)]) + rng.normal(0, 0.05, (n, 4))
+
+
+def test_windows_are_a_view(model, rng):
+    x = np.ascontiguousarray(clip(rng, 40), dtype=np.float32)
+    windows = model.windows(x, stride=3)
+    assert np.shares_memory(windows, x)
+    np.testing.assert_array_equal(windows[2], x[6:6 + model.window].ravel())
+
+
+@pytest.mark.parametrize("stride", [1, 3, 8])
+def test_score_windows_matches_loop(model, rng, stride):
+    matrix = clip(rng, 101)
+    window_errors, frame_errors = model.score_windows(matrix, NAMES, stride=stride)
+    expected_windows, expected_frames = naive_scores(model, matrix, stride)
+    np.testing.assert_allclose(window_errors, expected_windows, rtol=1e-5)
+    np.testing.assert_allclose(frame_errors, expected_frames, rtol=1e-5)
+
+
+def test_score_clip_of_a_uniform_clip_equals_score_windows(model, rng):
+    matrix = clip(rng, 90)
+    timestamps = np.arange(90) / 30.0
+    np.testing.assert_allclose(model.score_clip(matrix, NAMES, timestamps), model.score_windows(matrix, NAMES)[1],
+                               rtol=1e-5)
+
+
+def test_score_clip_resamples_by_timestamp(model):
+    # the same motion captured at 60 fps with a third of the frames dropped scores like the 30 fps clip
+    motion = lambda t: np.column_stack([np.sin(t * k) for k in (1.0, 1.3, 0.7, 2.1)])
+    t30 = np.arange(150) / 30.0
+    t60 = np.arange(299) / 60.0  # same first and last time
+    kept = np.sort(np.random.default_rng(1).choice(np.arange(1, 298), 200, replace=False))
+    t60 = t60[np.r_[0, kept, 298]]
+    errors30 = model.score_clip(motion(t30), NAMES, t30)
+    errors60 = model.score_clip(motion(t60), NAMES, t60)
+    # both clips are scored on the same 30 fps grid, mapped back to their own frames
+    np.testing.assert_allclose(errors60, np.interp(t60, t30, errors30), atol=1e-3 * errors30.max())
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+pytest.importorskip("mediapipe")  # routes.assessment imports the video pipeline
+pytest.importorskip("cv2")
+
+from routes import assessment
+from services.metrics import QUEUE_DEPTH
+
+
+@pytest.fixture
+def release(monkeypatch):
+    """Clips block on the pipeline thread until the event is set."""
+    event = threading.Event()
+
+    def run_clip(path, exercise_type, filename, quality=None, on_event=None):
+        try:
+            event.wait(5)
+            return {"exercise": exercise_type}
+        finally:
+            os.remove(path)
+
+    monkeypatch.setattr(assessment, "_run_clip", run_clip)
+    monkeypatch.setattr(assessment.settings, "pose_pool_size", 2)
+    yield event
+    event.set()
+
+
+def spooled_clips(tmp_path, n):
+    clips = []
+    for i in range(n):
+        path = tmp_path / f"clip{i}.mp4"
+        path.write_bytes(b"")
+        clips.append({"index": i, "filename": path.name, "exercise_type": "squat", "path": str(path),
+                      "claimed": False})
+    return clips
+
+
+def test_disconnect_before_the_body_removes_spooled_clips(tmp_path, release):
+    clips = spooled_clips(tmp_path, 3)
+    depth = QUEUE_DEPTH.get()
+    response = assessment._SpooledStreamingResponse(assessment._stream_batch(clips), clips)
+
+    async def send(message):
+        raise OSError("client disconnected")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send))
+    assert QUEUE_DEPTH.get() == depth
+    assert not any(os.path.exists(clip["path"]) for clip in clips)
+
+
+def test_running_clips_stay_queued_until_their_thread_returns(tmp_path, release):
+    clips = spooled_clips(tmp_path, 4)
+    depth = QUEUE_DEPTH.get()
+
+    async def disconnect_mid_batch():
+        stream = assessment._stream_batch(clips)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.2)
+        assert QUEUE_DEPTH.get() == depth + 4
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # two clips are still on pose detectors, the two waiting ones are dropped
+        assert QUEUE_DEPTH.get() == depth + 2
+        release.set()
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            if QUEUE_DEPTH.get() == depth:
+                break
+
+    asyncio.run(disconnect_mid_batch())
+    assert QUEUE_DEPTH.get() == depth
+    assert sum(os.path.exists(clip["path"]) for clip in clips) == 2  # unclaimed: the response removes them
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from models.dtw import TemplateIndex, banded_dtw, envelope, lb_keogh, resample
+
+
+def reference_dtw(query, template, band):
+    """Textbook O(L^2) banded DTW with squared-error cost."""
+    length = len(query)
+    acc = np.full((length + 1, length + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, length + 1):
+        for j in range(max(1, i - band), min(length, i + band) + 1):
+            cost = float(((query[i - 1] - template[j - 1]) ** 2).sum())
+            acc[i, j] = cost + min(acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])
+    return acc[length, length]
+
+
+def rep_trajectories(rng, n, channels=8):
+    """Noisy, time-warped angle curves of one rep (T varies per rep)."""
+    out = []
+    for _ in range(n):
+        t = np.linspace(0.0, 1.0, int(rng.integers(30, 90))) ** rng.uniform(0.7, 1.4)
+        depth = (1 - np.cos(2 * np.pi * t))[:, None] / 2
+        out.append(170 - rng.uniform(40, 100, channels) * depth + rng.normal(0, 3, (len(t), channels)))
+    return out
+
+
+def test_banded_dtw_matches_reference(rng):
+    query = rng.normal(size=(20, 3))
+    templates = rng.normal(size=(6, 20, 3))
+    expected = [reference_dtw(query, template, band=3) for template in templates]
+    np.testing.assert_allclose(banded_dtw(query, templates, band=3), expected, rtol=1e-9)
+
+
+def test_lb_keogh_is_a_lower_bound(rng):
+    query = rng.normal(size=(30, 4))
+    templates = rng.normal(size=(50, 30, 4))
+    upper, lower = envelope(templates, 3)
+    assert (lb_keogh(query, upper, lower) <= banded_dtw(query, templates, 3) + 1e-9).all()
+
+
+def test_pruned_match_equals_brute_force(rng):
+    exercises = np.repeat(["squat", "pushup"], 150)
+    index = TemplateIndex.from_trajectories(rep_trajectories(rng, len(exercises)), exercises)
+    pruned = 0
+    for trajectory in rep_trajectories(rng, 10):
+        for exercise in ("squat", "pushup"):
+            match = index.match(trajectory, exercise, batch=16)
+            sl = index._slices[exercise]
+            costs = banded_dtw(resample(trajectory, index.length), index.templates[sl], index.band)
+            assert match["template"] == sl.start + int(np.argmin(costs))
+            expected = np.sqrt(costs.min() / (index.length * len(index.channels)))
+            assert match["distance_deg"] == pytest.approx(expected, rel=1e-12)
+            pruned += match["pruned"]
+    assert pruned > 0
+    assert index.match(rep_trajectories(rng, 1)[0], "situp") is None
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from models.exercise_classifier import UNKNOWN_EXERCISE, ExerciseClassifier
+
+
+class FixedVotes(ExerciseClassifier):
+    """Classifier over given per-row votes instead of a reference index."""
+
+    def __init__(self, votes, **kwargs):
+        super().__init__(index=None, window_seconds=0.2, min_segment_seconds=1.0, **kwargs)
+        self.votes = np.asarray(votes, dtype=float)
+
+    def frame_votes(self, matrix, names, view):
+        return self.votes, ["pullup", "squat"]
+
+
+def votes(*runs):
+    return np.concatenate([np.tile(share, (n, 1)) for n, share in runs])
+
+
+def segment(classifier):
+    timestamps = np.arange(len(classifier.votes)) / 5.0
+    return classifier.segment(None, None, "side", timestamps)
+
+
+def test_confident_segments_keep_their_exercise():
+    classifier = FixedVotes(votes((20, [0.1, 0.9]), (20, [0.8, 0.2])), min_confidence=0.6)
+    assert [(s, e, ex) for s, e, ex, _ in segment(classifier)] == [(0, 20, "squat"), (20, 40, "pullup")]
+
+
+def test_weak_segments_are_unknown_and_merged():
+    classifier = FixedVotes(votes((20, [0.1, 0.9]), (20, [0.48, 0.3]), (20, [0.5, 0.45])), min_confidence=0.6)
+    (_, _, first, _), (start, end, exercise, confidence) = segment(classifier)
+    assert first == "squat"
+    assert (start, end, exercise) == (20, 60, UNKNOWN_EXERCISE)
+    assert confidence == pytest.approx(0.49)
+
+
+def test_classify_below_the_floor_is_unknown():
+    weak = FixedVotes(votes((30, [0.48, 0.42])), min_confidence=0.6)
+    assert weak.classify(None, None, "side") == (UNKNOWN_EXERCISE, pytest.approx(0.48))
+    # without a floor the top-1 label is returned, however weak
+    assert FixedVotes(weak.votes).classify(None, None, "side")[0] == "pullup"
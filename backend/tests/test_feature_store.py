@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from models.feature_store import FeatureStore
+
+
+def test_columns_round_trip(tmp_path, rng):
+    store = FeatureStore.create(str(tmp_path), ["a", "b", "c"], "side", "1")
+    matrix = rng.normal(size=(10, 3)).astype(np.float32)
+    store.add("squats_down", matrix, exercise="squat")
+    reopened = FeatureStore(str(tmp_path)).require(extractor_version="1", view="side", names=["c"])
+    np.testing.assert_array_equal(reopened.load("squats_down"), matrix)
+    np.testing.assert_array_equal(reopened.load("squats_down", columns=["c", "a"]), matrix[:, [2, 0]])
+    assert reopened.exercise("squats_down") == "squat" and reopened.rows() == 10
+
+
+def test_create_resets_an_existing_store(tmp_path):
+    store = FeatureStore.create(str(tmp_path), ["a", "b", "c"], "side", "1")
+    store.add("squats_down", np.zeros((4, 3)))
+    store.add("pushups_up", np.zeros((2, 3)))
+    store = FeatureStore.create(str(tmp_path), ["a", "b"], "side", "2")
+    store.add("squats_down", np.zeros((3, 2)))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["schema.json", "squats_down.npy"]
+    assert FeatureStore(str(tmp_path)).poses == ["squats_down"]
+
+
+def test_create_refuses_a_foreign_directory(tmp_path):
+    (tmp_path / "notes.txt").write_text("not a store")
+    with pytest.raises(ValueError, match="not a feature store"):
+        FeatureStore.create(str(tmp_path), ["a"], "side", "1")
+    assert (tmp_path / "notes.txt").exists()
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from models import geometry_kernels as gk
+from models.feature_extractor import FeatureExtractor
+from synthetic import synthetic_landmarks
+
+
+K = FeatureExtractor().KEYPOINTS
+# degrees; arccos near 0 deg (an upright torso) leaves ~1e-11 of float64 rounding
+ATOL = 1e-9
+
+
+def reference_angle(a, b, c):
+    ba, bc = np.asarray(a, float) - b, np.asarray(c, float) - b
+    cosine = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def test_angles_match_reference(rng):
+    a, b, c = rng.normal(size=(3, 500, 3))
+    expected = [reference_angle(*abc) for abc in zip(a, b, c)]
+    np.testing.assert_allclose(gk.angles(a, b, c), expected, atol=1e-9)
+    np.testing.assert_allclose(gk._angles_numpy(a, b, c), expected, atol=1e-9)
+
+
+def test_triplet_angles_match_angles(rng):
+    points = rng.normal(size=(40, 33, 3))
+    triplets = np.array([[11, 13, 15], [12, 14, 16], [23, 25, 27], [11, 23, 25]])
+    expected = np.stack([gk.angles(points[:, i], points[:, j], points[:, k]) for i, j, k in triplets], axis=1)
+    np.testing.assert_allclose(gk.triplet_angles(points, triplets), expected, atol=1e-12)
+    np.testing.assert_allclose(gk._triplet_angles_numpy(points, triplets), expected, atol=1e-12)
+
+
+def test_distances_match_norm(rng):
+    p1, p2 = rng.normal(size=(2, 100, 3))
+    np.testing.assert_allclose(gk.distances(p1, p2), np.linalg.norm(p1 - p2, axis=1), atol=1e-12)
+
+
+def reference_features(points, view):
+    """
+    Per-frame feature formulas of the extractor before it was batched (the former
+    extract_* methods), kept here as the reference for build_feature_matrix.
+    """
+    points = np.asarray(points, dtype=np.float64)[:, :3]
+    p = {name: points[i] for name, i in K.items()}
+    center = (p["left_hip"] + p["right_hip"]) / 2
+    scale = np.linalg.norm(p["left_hip"] - p["right_hip"]) or 1.0
+    p = {name: (point - center) / scale for name, point in p.items()}
+    neck = (p["left_shoulder"] + p["right_shoulder"]) / 2
+    mid_hip = (p["left_hip"] + p["right_hip"]) / 2
+    torso_vec = neck - mid_hip
+    cosine = np.dot(torso_vec, [0, -1, 0]) / np.linalg.norm(torso_vec)
+    vertical = np.degrees(np.arccos(np.clip(cosine, -1, 1)))
+    base_center = (p["left_ankle"] + p["right_ankle"]) / 2
+    shoulder_width = np.linalg.norm(p["left_shoulder"] - p["right_shoulder"])
+    hip_width = np.linalg.norm(p["left_hip"] - p["right_hip"])
+
+    f = {
+        "left_knee": reference_angle(p["left_hip"], p["left_knee"], p["left_ankle"]),
+        "right_knee": reference_angle(p["right_hip"], p["right_knee"], p["right_ankle"]),
+        "left_elbow": reference_angle(p["left_shoulder"], p["left_elbow"], p["left_wrist"]),
+        "right_elbow": reference_angle(p["right_shoulder"], p["right_elbow"], p["right_wrist"]),
+        "torso": reference_angle(neck, p["left_hip"], p["left_knee"]),
+        "shoulder_width": shoulder_width,
+        "hip_width": hip_width,
+        "shoulders_hips_ratio": shoulder_width / hip_width if hip_width > 0 else 0,
+        "shoulder_tilt": abs(p["left_shoulder"][1] - p["right_shoulder"][1]),
+        "hip_tilt": abs(p["left_hip"][1] - p["right_hip"][1]),
+        "torso_angle_from_vertical": vertical,
+        "balance_x": abs(base_center[0] - mid_hip[0]),
+        "balance_y": abs(base_center[1] - mid_hip[1]),
+    }
+    f["left_arm_lift_angle"] = f["left_elbow"]
+    f["right_arm_lift_angle"] = f["right_elbow"]
+    if view == "front":
+        center_x = (p["left_hip"][0] + p["right_hip"][0]) / 2
+        f.update({
+            "shoulder_x_sym": abs(p["left_shoulder"][0] - (2 * center_x - p["right_shoulder"][0])),
+            "knee_x_sym": abs(p["left_knee"][0] - (2 * center_x - p["right_knee"][0])),
+            "hip_x_sym": abs(p["left_hip"][0] - (2 * center_x - p["right_hip"][0])),
+            "shoulder_y_tilt": f["shoulder_tilt"],
+            "hip_y_tilt": f["hip_tilt"],
+            "body_tilt_angle": vertical,
+        })
+    else:
+        f.update({
+            "knee_angle": f["left_knee"],
+            "elbow_angle": f["left_elbow"],
+            "hip_angle": reference_angle(p["left_shoulder"], p["left_hip"], p["left_knee"]),
+            "squat_depth": p["left_hip"][1] - p["left_knee"][1],
+        })
+        f["back_tilt_angle"] = f["hip_angle"]
+    return f
+
+
+@pytest.mark.parametrize("view", ["side", "front"])
+def test_feature_matrix_matches_per_frame_reference(view, rng):
+    extractor = FeatureExtractor()
+    synthetic = synthetic_landmarks("squat", n_frames=40).astype(np.float64)
+    random = rng.uniform(0.0, 1.0, size=(40, 33, 4))
+    for points in (synthetic, random):
+        matrix, names = extractor.build_feature_matrix(points, view=view)
+        assert names == extractor.feature_names(view)
+        for t in range(len(points)):
+            expected = reference_features(points[t], view)
+            assert list(expected) == names
+            np.testing.assert_allclose(matrix[t], list(expected.values()), rtol=1e-12, atol=ATOL)
+
+
+def test_feature_matrix_without_hip_width():
+    points = synthetic_landmarks("squat", n_frames=5).astype(np.float64)
+    points[:, K["right_hip"]] = points[:, K["left_hip"]]
+    matrix, names = FeatureExtractor().build_feature_matrix(points, view="side")
+    for t in range(len(points)):
+        np.testing.assert_allclose(matrix[t], list(reference_features(points[t], "side").values()),
+                                   rtol=1e-12, atol=ATOL)
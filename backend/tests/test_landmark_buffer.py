@@ -0,0 +1,28 @@
+import numpy as np
+
+from services.landmark_buffer import LandmarkBuffer
+
+
+def test_rows_are_written_in_place_and_survive_growth():
+    buffer = LandmarkBuffer(2)
+    expected = []
+    for t in range(5):
+        if t == 2:
+            buffer.append(None)  # no pose detected
+            expected.append(np.zeros((33, 4), np.float32))
+            continue
+        row = buffer.next_row()
+        row[:, 0] = t
+        row[:, 3] = 0.5
+        expected.append(row.copy())
+    assert len(buffer) == 5
+    assert buffer.landmarks.dtype == np.float32 and buffer.landmarks.flags.c_contiguous
+    np.testing.assert_array_equal(buffer.landmarks, expected)
+    np.testing.assert_array_equal(buffer.detected, [True, True, False, True, True])
+
+
+def test_append_copies_nested_lists():
+    buffer = LandmarkBuffer(1)
+    row = buffer.append([(1.0, 2.0, 3.0, 0.9)] * 33)
+    assert np.shares_memory(row, buffer.landmarks)
+    np.testing.assert_allclose(buffer.landmarks[0, 5], [1.0, 2.0, 3.0, 0.9])
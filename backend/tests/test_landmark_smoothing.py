@@ -0,0 +1,31 @@
+import numpy as np
+
+from services.landmark_smoothing import fill_gaps
+
+
+def clip_with_gaps(n_frames, gaps):
+    landmarks = np.zeros((n_frames, 33, 4), np.float32)
+    landmarks[:, :, 0] = np.arange(n_frames, dtype=np.float32)[:, None] + 1
+    valid = np.ones(n_frames, dtype=bool)
+    for start, end in gaps:
+        landmarks[start:end] = 0
+        valid[start:end] = False
+    return landmarks, valid
+
+
+def test_short_gaps_are_interpolated_and_valid():
+    landmarks, valid = clip_with_gaps(20, [(5, 8)])
+    filled, filled_valid = fill_gaps(landmarks, valid, max_gap=5)
+    np.testing.assert_allclose(filled[:, 0, 0], np.arange(20) + 1)
+    assert filled_valid.all()
+
+
+def test_long_and_edge_gaps_hold_the_nearest_detection():
+    landmarks, valid = clip_with_gaps(40, [(0, 3), (10, 22), (35, 40)])
+    filled, filled_valid = fill_gaps(landmarks, valid, max_gap=5)
+    x = filled[:, 0, 0]
+    np.testing.assert_array_equal(x[:3], 4)              # leading gap: first detection (frame 3)
+    np.testing.assert_array_equal(x[10:16], 10)          # first half of the 12-frame gap: frame 9
+    np.testing.assert_array_equal(x[16:22], 23)          # second half: frame 22
+    np.testing.assert_array_equal(x[35:], 35)            # trailing gap: last detection (frame 34)
+    np.testing.assert_array_equal(filled_valid, valid)   # held frames stay invalid
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")  # routes.assessment imports the video pipeline
+pytest.importorskip("cv2")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from routes import assessment
+from synthetic import synthetic_landmarks
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(assessment.router)
+    return TestClient(app)
+
+
+def test_live_session_reports_reps_windows_and_summary(client):
+    points = synthetic_landmarks("squat", n_frames=600, fps=30.0, rep_seconds=2.5, noise=0.002, seed=0)
+    landmarks = np.concatenate([points, np.ones(points.shape[:-1] + (1,), points.dtype)], axis=-1)
+    landmarks = landmarks.astype(np.float32)
+    with client.websocket_connect("/assessment/live?exercise_type=squat&fps=30&window_every=2") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json()["event"] == "error"
+        for start in range(0, len(landmarks), 30):
+            ws.send_bytes(landmarks[start:start + 30].tobytes())
+        ws.send_text(json.dumps({"event": "end"}))
+        events = []
+        while not events or events[-1]["event"] != "summary":
+            events.append(ws.receive_json())
+    kinds = [event["event"] for event in events]
+    assert kinds.count("rep") == events[-1]["reps"] == 8
+    assert "window" in kinds
+
+
+def test_live_session_rejects_unknown_exercise(client):
+    with client.websocket_connect("/assessment/live?exercise_type=nope") as ws:
+        assert ws.receive_json()["event"] == "error"
+
+
+@pytest.mark.parametrize("query", ["fps=0", "fps=-30", "window_every=0"])
+def test_live_session_rejects_non_positive_rates(client, query):
+    with pytest.raises(WebSocketDisconnect) as disconnect:
+        with client.websocket_connect(f"/assessment/live?exercise_type=squat&{query}"):
+            pass
+    assert disconnect.value.code == 1008
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from models.estimator import ExerciseEvaluator
+from models.feature_extractor import FeatureExtractor
+from models.ring_buffer import RingBuffer
+from models.temporal_features import TemporalFeatureExtractor
+from services.live_session import LiveSession
+from synthetic import synthetic_landmarks
+
+FPS = 30.0
+
+
+def landmarks_with_visibility(exercise, n_frames):
+    points = synthetic_landmarks(exercise, n_frames=n_frames, fps=FPS, rep_seconds=2.5, noise=0.002, seed=0)
+    return np.concatenate([points, np.ones(points.shape[:-1] + (1,), points.dtype)], axis=-1).astype(np.float32)
+
+
+def full_scan_reps(exercise, landmarks):
+    extractor = FeatureExtractor()
+    points = landmarks[..., :3].copy()
+    view = extractor.detect_sequence_view(points)
+    matrix, names = extractor.build_feature_matrix(points, view=view)
+    column = ExerciseEvaluator().evaluators[exercise].primary_column(names)
+    return TemporalFeatureExtractor(fps=FPS).segment_reps(matrix[:, column])
+
+
+def test_ring_buffer_keeps_the_last_rows():
+    buffer = RingBuffer(5)
+    for block in np.array_split(np.arange(12, dtype=np.float32), 4):
+        buffer.extend(block)
+    assert len(buffer) == 5 and buffer.total == 12
+    np.testing.assert_array_equal(buffer.last(), np.arange(7, 12))
+    np.testing.assert_array_equal(buffer.last(2), [10, 11])
+
+
+@pytest.mark.parametrize("exercise", ["squat", "pushup"])
+def test_streamed_reps_match_full_scan(exercise):
+    # 2 minutes, twice the session history: the ring buffers wrap around
+    landmarks = landmarks_with_visibility(exercise, n_frames=3600)
+    session = LiveSession(exercise, fps=FPS, history_seconds=60.0)
+    streamed = []
+    for start in range(0, len(landmarks), 30):
+        streamed.extend(session.push(landmarks[start:start + 30]))
+    streamed.extend(session.finish())
+
+    expected = full_scan_reps(exercise, landmarks)
+    assert len(expected) == 48
+    assert [rep["rep"] for rep in streamed] == list(range(1, len(expected) + 1))
+    np.testing.assert_allclose([rep["end_s"] for rep in streamed], expected[:, 2] / FPS, atol=0.05)
+    assert session.reps == len(expected)
+    assert session.frames == len(landmarks)
+
+
+def test_window_covers_the_last_seconds():
+    landmarks = landmarks_with_visibility("squat", n_frames=900)
+    session = LiveSession("squat", fps=FPS, window_seconds=10.0)
+    session.push(landmarks)
+    result = session.window()
+    assert result["exercise"] == "squat"
+    assert result["window_end_s"] == pytest.approx(899 / FPS, abs=0.01)
+    assert result["window_end_s"] - result["window_start_s"] == pytest.approx(10.0, abs=0.1)
+
+
+def test_session_rejects_bad_parameters():
+    with pytest.raises(ValueError, match="fps"):
+        LiveSession("squat", fps=0)
+    with pytest.raises(ValueError, match="Unsupported exercise"):
+        LiveSession("nope")
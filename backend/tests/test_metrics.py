@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from services.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", labelnames=("status",))
+    depth = registry.gauge("queue_depth", "Queue depth.")
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.inc(status="ok")
+    depth.set(1)
+    latency.observe(0.5)
+    return registry
+
+
+@pytest.fixture
+def other_workers():
+    """Pids of a running and of an exited process."""
+    running = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    yield running.pid, exited.pid
+    running.kill()
+    running.wait()
+
+
+def samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_single_process_render(registry, monkeypatch):
+    monkeypatch.delenv("METRICS_MULTIPROC_DIR", raising=False)
+    rendered = samples(registry.render())
+    assert rendered['requests_total{status="ok"}'] == "1.0"
+    assert rendered["queue_depth"] == "1.0"
+    assert rendered['latency_seconds_bucket{le="1.0"}'] == "1"
+
+
+def test_multiprocess_render_merges_workers(registry, other_workers, tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+    snapshot = {
+        "requests_total": [[["ok"], 2], [["error"], 1]],
+        "queue_depth": [[[], 3]],
+        "latency_seconds": [[[], {"counts": [1, 0, 1], "sum": 5.05, "count": 2}]],
+    }
+    for pid in other_workers:
+        (tmp_path / f"{pid}.json").write_text(json.dumps(snapshot))
+    (tmp_path / f"{other_workers[0]}.json.tmp").write_text("{")  # a write in progress is ignored
+
+    rendered = samples(registry.render())
+    # counters and histograms: this worker + both others (an exited worker's counts stay)
+    assert rendered['requests_total{status="ok"}'] == "5.0"
+    assert rendered['requests_total{status="error"}'] == "2.0"
+    assert rendered['latency_seconds_bucket{le="0.1"}'] == "2"
+    assert rendered['latency_seconds_bucket{le="1.0"}'] == "3"
+    assert rendered['latency_seconds_bucket{le="+Inf"}'] == "5"
+    assert rendered["latency_seconds_count"] == "5"
+    # gauges: one sample per live worker
+    running, exited = other_workers
+    assert rendered[f'queue_depth{{pid="{os.getpid()}"}}'] == "1.0"
+    assert rendered[f'queue_depth{{pid="{running}"}}'] == "3.0"
+    assert f'queue_depth{{pid="{exited}"}}' not in rendered
+
+
+def test_write_snapshot_round_trips(registry, tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+    registry.write_snapshot()
+    with open(tmp_path / f"{os.getpid()}.json") as f:
+        assert json.load(f) == registry.snapshot()
+    # the file of this worker is replaced by its live values, not counted twice
+    assert samples(registry.render())['requests_total{status="ok"}'] == "1.0"
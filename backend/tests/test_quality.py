@@ -0,0 +1,34 @@
+import pytest
+
+from config import settings
+from services import metrics
+from services.quality import resolve_tier
+
+
+@pytest.fixture(autouse=True)
+def degrade_depths(monkeypatch):
+    monkeypatch.setattr(settings, "quality_degrade_depths", [4, 8])
+
+
+@pytest.mark.parametrize("depth, served", [(0, "accurate"), (3, "accurate"), (4, "balanced"), (9, "fast")])
+def test_tier_degrades_with_queue_depth(depth, served):
+    assert resolve_tier("accurate", queue_depth=depth).name == served
+
+
+def test_auto_tier_steps_down_to_fast():
+    assert resolve_tier("auto", queue_depth=0).escalate_complexity == 2
+    assert resolve_tier("auto", queue_depth=4).name == "fast"
+
+
+def test_queue_depth_defaults_to_the_gauge():
+    metrics.QUEUE_DEPTH.inc(8)
+    try:
+        assert resolve_tier("Balanced").name == "fast"
+    finally:
+        metrics.QUEUE_DEPTH.dec(8)
+    assert resolve_tier("balanced").name == "balanced"
+
+
+def test_unknown_tier():
+    with pytest.raises(ValueError, match="Unsupported quality tier"):
+        resolve_tier("ultra")
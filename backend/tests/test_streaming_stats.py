@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from models.streaming_stats import RunningStats
+
+
+def test_merged_shards_match_numpy(rng):
+    data = rng.normal(3.0, 2.0, size=(5000, 4))
+    data[17, 2] = np.nan  # non-finite rows are skipped
+    shards = [RunningStats(4).update(chunk) for chunk in np.array_split(data, 7)]
+    stats = shards[0]
+    for shard in shards[1:]:
+        stats.merge(shard)
+    finite = data[np.isfinite(data).all(axis=1)]
+    assert stats.count == len(finite) and stats.skipped == 1
+    np.testing.assert_allclose(stats.mean, finite.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats.std(), finite.std(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(stats.min, finite.min(axis=0))
+    np.testing.assert_allclose(stats.quantiles([0.5])[0], np.median(finite, axis=0), atol=0.1)
+
+
+def test_merge_rejects_other_columns(rng):
+    data = rng.normal(size=(10, 3))
+    stats = RunningStats(3, names=["a", "b", "c"]).update(data)
+    with pytest.raises(ValueError, match="b != c"):
+        stats.merge(RunningStats(3, names=["a", "c", "b"]).update(data))
+    with pytest.raises(ValueError, match="features"):
+        stats.merge(RunningStats(2, names=["a", "b"]).update(data[:, :2]))
+    # unnamed shards (plain .npy matrices) are checked by width only and take the names
+    unnamed = RunningStats(3).update(data).merge(stats)
+    assert unnamed.names == ["a", "b", "c"] and unnamed.count == 20
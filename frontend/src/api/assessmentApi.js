@@ -1,6 +1,7 @@
+// exercise "auto" (or none) lets the backend recognize the exercise
 export async function assessVideo(file, exercise) {
   const formData = new FormData()
-  formData.append("exercise_type", exercise)
+  if (exercise && exercise !== "auto") formData.append("exercise_type", exercise)
   formData.append("file", file)
 
   const response = await fetch("http://localhost:8000/assessment/", {
@@ -14,3 +15,57 @@ export async function assessVideo(file, exercise) {
 
   return await response.json()
 }
+
+// Streaming variant: reports progress and preliminary rep scores while the
+// backend processes the video, resolves with the final result.
+// Pass an AbortController signal to cancel (the backend stops the assessment).
+export async function assessVideoStream(file, exercise, { onProgress, onRep, signal } = {}) {
+  const formData = new FormData()
+  if (exercise && exercise !== "auto") formData.append("exercise_type", exercise)
+  formData.append("file", file)
+
+  const response = await fetch("http://localhost:8000/assessment/stream", {
+    method: "POST",
+    body: formData,
+    headers: { Accept: "application/x-ndjson" },
+    signal
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error("Failed to get assessment")
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+  let result = null
+
+  const handleLine = (line) => {
+    if (!line.trim()) return
+    const event = JSON.parse(line)
+    if (event.event === "progress") {
+      onProgress?.(event)
+    } else if (event.event === "rep") {
+      onRep?.(event)
+    } else if (event.event === "result") {
+      result = event.result
+    } else if (event.event === "error") {
+      throw new Error(event.detail || "Failed to get assessment")
+    }
+  }
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const lines = buffer.split("\n")
+    buffer = lines.pop()
+    lines.forEach(handleLine)
+  }
+  handleLine(buffer)
+
+  if (!result) {
+    throw new Error("Assessment stream ended without a result")
+  }
+  return result
+}
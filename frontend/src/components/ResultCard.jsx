@@ -1,6 +1,11 @@
 import "../TechniqueAssessment.css"
 import { useEffect, useState } from "react";
 
+// scores are null when nothing could be scored (e.g. an unrecognized exercise)
+const formatScore = (score) => (score == null ? "–" : score)
+
+const formatExercise = (exercise) => (exercise || "").replace(/_/g, " ")
+
 export default function ResultCard({ result, onClose }) {
 
   const [progress, setProgress] = useState(0);
@@ -8,13 +13,15 @@ export default function ResultCard({ result, onClose }) {
   useEffect(() => {
     if (result) {
       setTimeout(() => {
-        setProgress(result.score);
+        setProgress(result.score ?? 0);
       }, 200);
     }
   }, [result]);
 
   if (!result) return null
 
+  const feedback = result.feedback || []
+
   return (
     <>
       <div className="result-overlay" onClick={onClose} />
@@ -44,39 +51,62 @@ export default function ResultCard({ result, onClose }) {
             </svg>
 
             <div className="circle-center">
-              {Math.round(progress)}/100
+              {result.score == null ? "–" : `${Math.round(progress)}/100`}
             </div>
           </div>
 
+          {result.error && (
+            <p className="result-error">{result.error}</p>
+          )}
+
           <div className="result-section">
 
             <div className="result-sub-scores">
               <div className="sub-score">
                 <span className="label">Total Score: </span>
-                <strong>{result.score}</strong>
+                <strong>{formatScore(result.score)}</strong>
                 <span className="label"> out of 100</span>
               </div>
               <div className="sub-score">
                 <span>Frame Score: </span>
-                <strong>{result.frame_score}</strong>
+                <strong>{formatScore(result.frame_score)}</strong>
                 <span className="label"> out of 100</span>
               </div>
               <div className="sub-score">
                 <span>Phase Score: </span>
-                <strong>{result.phase_score}</strong>
+                <strong>{formatScore(result.phase_score)}</strong>
                 <span className="label"> out of 100</span>
               </div>
             </div>
           </div>
 
-          <h3 className="result-subtitle">Feedback</h3>
-          <div className="feedback-section">
-            <ul>
-              {result.feedback.map((f, i) => (
-                <li key={i}>{f}</li>
-              ))}
-            </ul>
-          </div>
+          {result.segments && (
+            <>
+              <h3 className="result-subtitle">Exercises</h3>
+              <ul className="result-segments">
+                {result.segments.map((segment, i) => (
+                  <li key={i} className="result-segment">
+                    <span className="segment-name">{formatExercise(segment.exercise)}</span>
+                    <span className="segment-time">{segment.start_s}s – {segment.end_s}s</span>
+                    <strong>{segment.error ? segment.error : `${formatScore(segment.score)}/100`}</strong>
+                  </li>
+                ))}
+              </ul>
+            </>
+          )}
+
+          {feedback.length > 0 && (
+            <>
+              <h3 className="result-subtitle">Feedback</h3>
+              <div className="feedback-section">
+                <ul>
+                  {feedback.map((f, i) => (
+                    <li key={i}>{f}</li>
+                  ))}
+                </ul>
+              </div>
+            </>
+          )}
         </div>
       </div>
     </>
@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect } from "react"
-import { assessVideo } from "../api/assessmentApi"
+import { assessVideoStream } from "../api/assessmentApi"
 import "../TechniqueAssessment.css"
 
 export default function UploadForm({ onResult }) {
@@ -10,6 +10,8 @@ export default function UploadForm({ onResult }) {
   const [loading, setLoading] = useState(false)
   const [uploadedFiles, setUploadedFiles] = useState([])
   const [previewVideo, setPreviewVideo] = useState(null)
+  const [progress, setProgress] = useState(null)
+  const [reps, setReps] = useState([])
 
   const openVideo = (file) => {
     setPreviewVideo(URL.createObjectURL(file))
@@ -33,7 +35,8 @@ export default function UploadForm({ onResult }) {
     { id: "pullup", label: "Pull-up", icon: "🏋️" },
     { id: "squat", label: "Squat", icon: "🦵" },
     { id: "situp", label: "Sit-up", icon: "🤸" },
-    { id: "jumping_jack", label: "Jumping Jack", icon: "⚡" }
+    { id: "jumping_jack", label: "Jumping Jack", icon: "⚡" },
+    { id: "auto", label: "Auto-detect", icon: "🔍" }
   ];
 
   const handleDrag = (e) => {
@@ -114,8 +117,13 @@ export default function UploadForm({ onResult }) {
     if (!file) return
 
     setLoading(true)
+    setProgress(null)
+    setReps([])
     try {
-      const result = await assessVideo(file, exercise)
+      const result = await assessVideoStream(file, exercise, {
+        onProgress: setProgress,
+        onRep: (rep) => setReps((prev) => [...prev, rep])
+      })
       onResult(result)
     } catch (err) {
       alert("Error: " + err.message)
@@ -222,8 +230,20 @@ export default function UploadForm({ onResult }) {
         disabled={loading || !file}
         onClick={handleUpload}
       >
-        {loading ? "Processing..." : "Assess Technique"}
+        {loading
+          ? `Processing...${progress?.percent != null ? ` ${Math.round(progress.percent)}%` : ""}`
+          : "Assess Technique"}
       </button>
+
+      {loading && reps.length > 0 && (
+        <ul className="live-reps">
+          {reps.map((rep) => (
+            <li key={rep.rep}>
+              Rep {rep.rep}: {rep.score} ({rep.start_s}s – {rep.end_s}s)
+            </li>
+          ))}
+        </ul>
+      )}
     </div>
   )
 }